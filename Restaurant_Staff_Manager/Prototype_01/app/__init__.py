@@ -1,7 +1,14 @@
-from flask import Flask
-from config import Config
-from flask_sqlalchemy import SQLAlchemy
-from flask_mail import Mail
+import sys
+import time
+
+# Baseline for the startup report: everything imported from here on counts.
+_import_started = time.perf_counter()
+_modules_before = set(sys.modules)
+
+from flask import Flask  # noqa: E402
+from config import Config  # noqa: E402
+from flask_sqlalchemy import SQLAlchemy  # noqa: E402
+from flask_mail import Mail  # noqa: E402
 
 
 db = SQLAlchemy()
@@ -9,10 +16,16 @@ mail = Mail()
 
 
 def create_app(config_class=Config):
+    create_started = time.perf_counter()
     app = Flask(__name__, instance_relative_config=True)
     app.config.from_object(config_class)
 
+    from app.utils import db_profiles
+
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = db_profiles.engine_options(app.config)
     db.init_app(app)
+    with app.app_context():
+        db_profiles.install(db.engine, app.config)
     mail.init_app(app)
 
     from app.routes import bp as main_blueprint
@@ -23,8 +36,22 @@ def create_app(config_class=Config):
 
     app.register_blueprint(admin_blueprint)
 
+    from app.api import bp as api_blueprint
+
+    app.register_blueprint(api_blueprint)
+
     from . import models
 
     print(f"Using database at: {app.config['SQLALCHEMY_DATABASE_URI']}")
 
+    from app.utils import startup
+
+    warm_seconds = startup.warm(app) if app.config["WARM_START"] else 0.0
+    startup.report(
+        app, _import_seconds, create_started, _modules_before, warm_seconds
+    )
+
     return app
+
+
+_import_seconds = time.perf_counter() - _import_started
@@ -1,11 +1,34 @@
-from flask import render_template, redirect, url_for, flash
+from flask import render_template, redirect, url_for, flash, request, jsonify
 from sqlalchemy import desc
 from sqlalchemy.exc import IntegrityError
 from app import db
 from app.admin import bp
-from app.forms import EmployeeForm, PerformanceLogForm
-from app.models import Employee, Shift, PerformanceLog
+from app.forms import (
+    EmployeeForm,
+    PerformanceLogForm,
+    PerformanceImportForm,
+    RosterImportForm,
+    TimeOffForm,
+    AvailabilityForm,
+    WEEKDAY_CHOICES,
+)
+from app.models import (
+    Employee,
+    Shift,
+    PerformanceLog,
+    PerformanceSummary,
+    TimeOff,
+    Availability,
+)
+from app.utils import (
+    performance,
+    performance_import,
+    roster_import,
+    schedule_version,
+)
+from sqlalchemy.orm import joinedload
 from datetime import timedelta
+import datetime
 
 
 @bp.route("/employees")
@@ -57,7 +80,10 @@ def edit_employee(employee_id):
             employee.email = form.email.data
             employee.hourly_rate = form.hourly_rate.data
             try:
+                # Names appear in calendar feeds, so they must refresh too.
+                schedule_version.bump()
                 db.session.commit()
+                schedule_version.invalidate()
                 flash(f'Employee "{employee.name}" updated successfully!', "success")
                 return redirect(url_for("admin.list_employees"))
             except IntegrityError:
@@ -110,6 +136,53 @@ def add_employee():
     )
 
 
+@bp.route("/employees/import", methods=["GET", "POST"])
+def import_roster():
+    """
+    Bulk-creates or updates employees (matched by email) from a CSV or JSON
+    upload. API clients can POST a JSON body instead and get a JSON report.
+    """
+    if request.is_json:
+        try:
+            records = roster_import.iter_json_records(request.get_json())
+            report = roster_import.import_roster(records)
+        except ValueError as e:
+            return jsonify(error=str(e)), 400
+        return jsonify(_roster_report_dict(report))
+
+    form = RosterImportForm()
+    report = None
+    if form.validate_on_submit():
+        try:
+            records = roster_import.read_roster_file(form.roster_file.data)
+            report = roster_import.import_roster(records)
+        except (ValueError, UnicodeDecodeError) as e:
+            # json.JSONDecodeError is a ValueError too
+            flash(f"Could not read the roster file: {e}", "danger")
+        except Exception as e:
+            db.session.rollback()
+            flash(f"Error importing roster: {e}", "danger")
+
+        if report is not None:
+            flash(
+                f"Roster imported: {report.created} added, {report.updated} updated, {len(report.conflicts)} rejected.",
+                "success" if not report.conflicts else "info",
+            )
+
+    return render_template(
+        "admin/import_roster.html", title="Import Roster", form=form, report=report
+    )
+
+
+def _roster_report_dict(report):
+    return {
+        "total_rows": report.total_rows,
+        "created": report.created,
+        "updated": report.updated,
+        "conflicts": [c._asdict() for c in report.conflicts],
+    }
+
+
 @bp.route("/employee/delete/<int:employee_id>", methods=["POST"])
 def delete_employee(employee_id):
     """Route for deleting an employee."""
@@ -131,8 +204,10 @@ def delete_employee(employee_id):
             )
         else:
             employee_name = employee.name
+            schedule_version.bump()
             db.session.delete(employee)
             db.session.commit()
+            schedule_version.invalidate()
             flash(f'Employee "{employee_name}" deleted successfully.', "success")
 
     except Exception as e:
@@ -150,14 +225,9 @@ def add_performance_log():
         log_date = form.log_date.data
 
         try:
-            start_of_month = log_date.replace(day=1)
-            next_month = start_of_month + timedelta(days=32)
-            start_of_next_month = next_month.replace(day=1)
-
             existing_log = PerformanceLog.query.filter(
                 PerformanceLog.employee_id == employee.id,
-                PerformanceLog.log_date >= start_of_month,
-                PerformanceLog.log_date < start_of_next_month,
+                PerformanceLog.log_month == log_date.replace(day=1),
             ).first()
 
             if existing_log:
@@ -183,6 +253,7 @@ def add_performance_log():
         )
         try:
             db.session.add(new_log)
+            performance.refresh_summaries([employee.id])
             db.session.commit()
             flash(
                 f"Performance logged successfully for {employee.name} on {log_date}.",
@@ -201,25 +272,229 @@ def add_performance_log():
     )
 
 
+@bp.route("/performance/import", methods=["GET", "POST"])
+def import_performance_logs():
+    """
+    Bulk-imports performance logs from a CSV upload and shows a per-row report.
+    With ?format=json the report is returned as JSON instead.
+    """
+    form = PerformanceImportForm()
+    report = None
+    if form.validate_on_submit():
+        try:
+            report = performance_import.import_performance_csv(form.csv_file.data)
+        except UnicodeDecodeError:
+            flash("The file is not valid UTF-8 text.", "danger")
+        except Exception as e:
+            db.session.rollback()
+            flash(f"Error importing performance logs: {e}", "danger")
+
+        if report is not None:
+            if request.args.get("format") == "json":
+                return jsonify(
+                    total_rows=report.total_rows,
+                    inserted=report.inserted,
+                    errors=[e._asdict() for e in report.errors],
+                )
+            category = "success" if not report.errors else "info"
+            flash(
+                f"Imported {report.inserted} of {report.total_rows} row(s); {len(report.errors)} rejected.",
+                category,
+            )
+
+    return render_template(
+        "admin/import_performance.html",
+        title="Import Performance Logs",
+        form=form,
+        report=report,
+    )
+
+
+PERFORMANCE_PAGE_SIZE = 50
+
+
 @bp.route("/performance/dashboard")
 def performance_dashboard():
-    """Displays recorded performance logs in a table."""
+    """
+    Shows the per-employee performance summary and one page of logs.
+
+    Logs are paged by keyset on (log_date, id), newest first: ?before= and
+    ?after= take the "YYYY-MM-DD.id" cursor of the last/first row shown, so
+    each page is an index range scan however much history there is.
+    """
     print("Accessed /performance_dashboard route")
     try:
-        logs = (
-            db.session.query(PerformanceLog)
-            .join(PerformanceLog.employee)
-            .order_by(desc(PerformanceLog.log_date), Employee.name)
+        summaries = (
+            db.session.query(PerformanceSummary)
+            .options(joinedload(PerformanceSummary.employee))
+            .join(PerformanceSummary.employee)
+            .order_by(Employee.name)
             .all()
         )
 
-        print(f"Found {len(logs)} performance logs.")
+        query = db.session.query(PerformanceLog).options(
+            joinedload(PerformanceLog.employee)
+        )
+        before = _parse_log_cursor(request.args.get("before"))
+        after = _parse_log_cursor(request.args.get("after"))
+        if after is not None:
+            # Page towards newer logs: read ascending, then flip.
+            logs = (
+                query.filter(
+                    db.tuple_(PerformanceLog.log_date, PerformanceLog.id) > after
+                )
+                .order_by(PerformanceLog.log_date, PerformanceLog.id)
+                .limit(PERFORMANCE_PAGE_SIZE + 1)
+                .all()
+            )
+            has_newer = len(logs) > PERFORMANCE_PAGE_SIZE
+            logs = logs[:PERFORMANCE_PAGE_SIZE][::-1]
+            has_older = True
+        else:
+            if before is not None:
+                query = query.filter(
+                    db.tuple_(PerformanceLog.log_date, PerformanceLog.id) < before
+                )
+            logs = (
+                query.order_by(desc(PerformanceLog.log_date), desc(PerformanceLog.id))
+                .limit(PERFORMANCE_PAGE_SIZE + 1)
+                .all()
+            )
+            has_older = len(logs) > PERFORMANCE_PAGE_SIZE
+            logs = logs[:PERFORMANCE_PAGE_SIZE]
+            has_newer = before is not None
+
+        print(
+            f"Showing {len(summaries)} employee summaries and {len(logs)} performance logs."
+        )
 
         return render_template(
-            "admin/performance_dashboard.html", title="Performance Dashboard", logs=logs
+            "admin/performance_dashboard.html",
+            title="Performance Dashboard",
+            summaries=summaries,
+            logs=logs,
+            newer_cursor=_log_cursor(logs[0]) if logs and has_newer else None,
+            older_cursor=_log_cursor(logs[-1]) if logs and has_older else None,
         )
 
     except Exception as e:
         print(f"Error querying performance logs: {e}")
         flash("Error loading performance dashboard.", "danger")
         return redirect(url_for("main.index"))
+
+
+def _log_cursor(log):
+    return f"{log.log_date.isoformat()}.{log.id}"
+
+
+def _parse_log_cursor(value):
+    """(log_date, id) from a "YYYY-MM-DD.id" cursor, or None if missing/invalid."""
+    if not value:
+        return None
+    try:
+        day, log_id = value.rsplit(".", 1)
+        return datetime.date.fromisoformat(day), int(log_id)
+    except ValueError:
+        return None
+
+
+@bp.route("/availability", methods=["GET", "POST"])
+def manage_availability():
+    """Lists and adds time off and weekly availability windows."""
+    time_off_form = TimeOffForm(prefix="time_off")
+    availability_form = AvailabilityForm(prefix="availability")
+
+    if time_off_form.submit.data and time_off_form.validate_on_submit():
+        employee = time_off_form.employee.data
+        entry = TimeOff(
+            employee_id=employee.id,
+            start=datetime.datetime.combine(
+                time_off_form.start_date.data, datetime.time()
+            ),
+            end=datetime.datetime.combine(
+                time_off_form.end_date.data + timedelta(days=1), datetime.time()
+            ),
+            reason=time_off_form.reason.data,
+        )
+        try:
+            db.session.add(entry)
+            db.session.commit()
+            flash(f"Time off recorded for {employee.name}.", "success")
+            return redirect(url_for("admin.manage_availability"))
+        except Exception as e:
+            db.session.rollback()
+            flash(f"Database error saving time off: {e}", "danger")
+
+    if availability_form.submit.data and availability_form.validate_on_submit():
+        employee = availability_form.employee.data
+        window = Availability(
+            employee_id=employee.id,
+            weekday=availability_form.weekday.data,
+            start_time=availability_form.start_time.data,
+            end_time=availability_form.end_time.data,
+        )
+        try:
+            db.session.add(window)
+            db.session.commit()
+            flash(f"Availability added for {employee.name}.", "success")
+            return redirect(url_for("admin.manage_availability"))
+        except Exception as e:
+            db.session.rollback()
+            flash(f"Database error saving availability: {e}", "danger")
+
+    try:
+        upcoming_time_off = (
+            TimeOff.query.options(joinedload(TimeOff.employee))
+            .filter(
+                TimeOff.end
+                > datetime.datetime.combine(datetime.date.today(), datetime.time())
+            )
+            .order_by(TimeOff.start)
+            .all()
+        )
+        windows = (
+            Availability.query.options(joinedload(Availability.employee))
+            .join(Availability.employee)
+            .order_by(Employee.name, Availability.weekday, Availability.start_time)
+            .all()
+        )
+    except Exception as e:
+        flash(f"Error loading availability: {e}", "danger")
+        return redirect(url_for("main.index"))
+
+    return render_template(
+        "admin/availability.html",
+        title="Availability & Time Off",
+        time_off_form=time_off_form,
+        availability_form=availability_form,
+        upcoming_time_off=upcoming_time_off,
+        windows=windows,
+        weekday_names=dict(WEEKDAY_CHOICES),
+        timedelta=timedelta,
+    )
+
+
+@bp.route("/time_off/delete/<int:time_off_id>", methods=["POST"])
+def delete_time_off(time_off_id):
+    entry = db.get_or_404(TimeOff, time_off_id)
+    try:
+        db.session.delete(entry)
+        db.session.commit()
+        flash("Time off removed.", "success")
+    except Exception as e:
+        db.session.rollback()
+        flash(f"Error removing time off: {e}", "danger")
+    return redirect(url_for("admin.manage_availability"))
+
+
+@bp.route("/availability/delete/<int:availability_id>", methods=["POST"])
+def delete_availability(availability_id):
+    window = db.get_or_404(Availability, availability_id)
+    try:
+        db.session.delete(window)
+        db.session.commit()
+        flash("Availability window removed.", "success")
+    except Exception as e:
+        db.session.rollback()
+        flash(f"Error removing availability: {e}", "danger")
+    return redirect(url_for("admin.manage_availability"))
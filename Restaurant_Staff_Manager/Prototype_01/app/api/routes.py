@@ -0,0 +1,246 @@
+import base64
+import datetime
+import json
+from collections import namedtuple
+
+from flask import current_app, jsonify, request
+
+from app import db
+from app.api import bp
+from app.models import Employee, PerformanceLog, Shift
+
+# How one collection is exposed: the JSON fields it offers (name -> column),
+# the columns it is sorted and seeked on, and the column its ?from=/?to=
+# date range applies to.
+Resource = namedtuple(
+    "Resource",
+    ["model", "fields", "default_fields", "order_by", "date_column", "joins"],
+)
+
+EMPLOYEES = Resource(
+    model=Employee,
+    fields={
+        "id": Employee.id,
+        "name": Employee.name,
+        "position": Employee.position,
+        "email": Employee.email,
+        "hourly_rate": Employee.hourly_rate,
+    },
+    default_fields=["id", "name", "position", "email", "hourly_rate"],
+    order_by=[Employee.id],
+    date_column=None,
+    joins=[],
+)
+
+SHIFTS = Resource(
+    model=Shift,
+    fields={
+        "id": Shift.id,
+        "start_time": Shift.start_time,
+        "end_time": Shift.end_time,
+        "position": Shift.required_position,
+        "employee_id": Shift.employee_id,
+        "employee_name": Employee.name,
+    },
+    default_fields=["id", "start_time", "end_time", "position", "employee_id"],
+    order_by=[Shift.start_time, Shift.id],
+    date_column=Shift.start_time,
+    # Only joined when employee_name is requested.
+    joins=[("employee_name", Employee, Shift.employee_id == Employee.id)],
+)
+
+PERFORMANCE_LOGS = Resource(
+    model=PerformanceLog,
+    fields={
+        "id": PerformanceLog.id,
+        "employee_id": PerformanceLog.employee_id,
+        "log_date": PerformanceLog.log_date,
+        "rating": PerformanceLog.rating,
+        "notes": PerformanceLog.notes,
+        "recorded_at": PerformanceLog.recorded_at,
+    },
+    default_fields=["id", "employee_id", "log_date", "rating", "notes"],
+    order_by=[PerformanceLog.log_date, PerformanceLog.id],
+    date_column=PerformanceLog.log_date,
+    joins=[],
+)
+
+
+class ApiError(Exception):
+    """A client error returned as {"error": message} with a 400 status."""
+
+
+@bp.errorhandler(ApiError)
+def handle_api_error(e):
+    return jsonify(error=str(e)), 400
+
+
+@bp.route("/employees")
+def list_employees():
+    """
+    Employees ordered by id.
+
+    Query: position, fields, limit, cursor.
+    """
+    filters = []
+    if request.args.get("position"):
+        filters.append(Employee.position == request.args["position"])
+    return _page(EMPLOYEES, filters)
+
+
+@bp.route("/shifts")
+def list_shifts():
+    """
+    Shifts ordered by (start_time, id).
+
+    Query: from, to (dates, to exclusive), employee_id, position,
+    unassigned=true, fields, limit, cursor.
+    """
+    filters = []
+    if request.args.get("employee_id"):
+        filters.append(Shift.employee_id == _int_arg("employee_id"))
+    if request.args.get("position"):
+        filters.append(Shift.required_position == request.args["position"])
+    if request.args.get("unassigned") == "true":
+        filters.append(Shift.employee_id.is_(None))
+    return _page(SHIFTS, filters)
+
+
+@bp.route("/performance_logs")
+def list_performance_logs():
+    """
+    Performance logs ordered by (log_date, id).
+
+    Query: from, to (dates, to exclusive), employee_id, fields, limit, cursor.
+    """
+    filters = []
+    if request.args.get("employee_id"):
+        filters.append(PerformanceLog.employee_id == _int_arg("employee_id"))
+    return _page(PERFORMANCE_LOGS, filters)
+
+
+def _page(resource, filters):
+    """
+    Runs one keyset-paginated query and returns the JSON page.
+
+    The cursor holds the sort key of the last row returned; the next page is
+    WHERE (sort key) > cursor ORDER BY sort key LIMIT n, which the database
+    answers from the index however deep the client has paged.
+    """
+    cfg = current_app.config
+    fields = _fields_arg(resource)
+    limit = min(
+        _int_arg("limit", cfg["API_PAGE_SIZE"]), cfg["API_MAX_PAGE_SIZE"]
+    )
+    if limit < 1:
+        raise ApiError("limit must be at least 1.")
+
+    # Selected columns: the requested fields plus the sort key for the cursor.
+    columns = [resource.fields[name].label(name) for name in fields]
+    key_labels = [f"_key{i}" for i in range(len(resource.order_by))]
+    columns += [col.label(label) for col, label in zip(resource.order_by, key_labels)]
+
+    stmt = db.select(*columns).select_from(resource.model)
+    for field, target, onclause in resource.joins:
+        if field in fields:
+            stmt = stmt.outerjoin(target, onclause)
+
+    if resource.date_column is not None:
+        start = _date_arg("from")
+        end = _date_arg("to")
+        if resource.date_column.type.python_type is datetime.datetime:
+            start = start and datetime.datetime.combine(start, datetime.time())
+            end = end and datetime.datetime.combine(end, datetime.time())
+        if start is not None:
+            stmt = stmt.where(resource.date_column >= start)
+        if end is not None:
+            stmt = stmt.where(resource.date_column < end)
+    if filters:
+        stmt = stmt.where(*filters)
+
+    cursor = _decode_cursor(request.args.get("cursor"), resource)
+    if cursor is not None:
+        stmt = stmt.where(db.tuple_(*resource.order_by) > db.tuple_(*cursor))
+
+    rows = db.session.execute(
+        stmt.order_by(*resource.order_by).limit(limit + 1)
+    ).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    data = [
+        {name: _json_value(getattr(row, name)) for name in fields} for row in rows
+    ]
+    next_cursor = None
+    if has_more:
+        next_cursor = _encode_cursor([getattr(rows[-1], k) for k in key_labels])
+    return jsonify(data=data, next_cursor=next_cursor, limit=limit)
+
+
+def _fields_arg(resource):
+    value = request.args.get("fields")
+    if not value:
+        return resource.default_fields
+    fields = [f.strip() for f in value.split(",") if f.strip()]
+    unknown = [f for f in fields if f not in resource.fields]
+    if unknown:
+        raise ApiError(
+            f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(resource.fields)}."
+        )
+    return list(dict.fromkeys(fields))
+
+
+def _int_arg(name, default=None):
+    value = request.args.get(name)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ApiError(f"{name} must be an integer.")
+
+
+def _date_arg(name):
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise ApiError(f"{name} must be a date (YYYY-MM-DD).")
+
+
+def _json_value(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
+
+
+def _encode_cursor(values):
+    raw = json.dumps([_json_value(v) for v in values]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(value, resource):
+    """Parses a cursor back into typed sort-key values."""
+    if not value:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(resource.order_by):
+            raise ValueError
+        return [
+            _parse_key(v, col.type.python_type)
+            for v, col in zip(values, resource.order_by)
+        ]
+    except (ValueError, TypeError):
+        raise ApiError("Invalid cursor.")
+
+
+def _parse_key(value, python_type):
+    if python_type is datetime.datetime:
+        return datetime.datetime.fromisoformat(value)
+    if python_type is datetime.date:
+        return datetime.date.fromisoformat(value)
+    return python_type(value)
@@ -1,4 +1,5 @@
 from flask_wtf import FlaskForm
+from flask_wtf.file import FileField, FileRequired, FileAllowed
 from wtforms import (
     SubmitField,
     FloatField,
@@ -7,8 +8,15 @@ from wtforms import (
     StringField,
     EmailField,
     SelectField,
+    TimeField,
+)
+from wtforms.validators import (
+    DataRequired,
+    Optional,
+    NumberRange,
+    Email,
+    ValidationError,
 )
-from wtforms.validators import DataRequired, Optional, NumberRange, Email
 from wtforms_sqlalchemy.fields import QuerySelectField
 from app.models import Employee
 import datetime
@@ -112,3 +120,80 @@ class EmployeeForm(FlaskForm):
         ],
     )
     submit = SubmitField("Save Employee")
+
+
+WEEKDAY_CHOICES = [
+    (0, "Monday"),
+    (1, "Tuesday"),
+    (2, "Wednesday"),
+    (3, "Thursday"),
+    (4, "Friday"),
+    (5, "Saturday"),
+    (6, "Sunday"),
+]
+
+
+class PerformanceImportForm(FlaskForm):
+    """Upload form for a CSV of performance logs."""
+
+    csv_file = FileField(
+        "CSV File",
+        validators=[
+            FileRequired(message="Please choose a CSV file."),
+            FileAllowed(["csv"], "Only .csv files are accepted."),
+        ],
+    )
+    submit = SubmitField("Import Logs")
+
+
+class RosterImportForm(FlaskForm):
+    """Upload form for a CSV or JSON employee roster."""
+
+    roster_file = FileField(
+        "Roster File",
+        validators=[
+            FileRequired(message="Please choose a CSV or JSON file."),
+            FileAllowed(["csv", "json"], "Only .csv and .json files are accepted."),
+        ],
+    )
+    submit = SubmitField("Import Roster")
+
+
+class TimeOffForm(FlaskForm):
+    """Form for recording whole days an employee cannot be scheduled."""
+
+    employee = QuerySelectField(
+        "Employee",
+        query_factory=employee_query,
+        get_label="name",
+        allow_blank=True,
+        blank_text="-- Select Employee --",
+        validators=[DataRequired(message="Please select an employee.")],
+    )
+    start_date = DateField("First Day Off", validators=[DataRequired()])
+    end_date = DateField("Last Day Off", validators=[DataRequired()])
+    reason = StringField("Reason", validators=[Optional()])
+    submit = SubmitField("Add Time Off")
+
+    def validate_end_date(self, field):
+        if self.start_date.data and field.data and field.data < self.start_date.data:
+            raise ValidationError("Last day off cannot be before the first day off.")
+
+
+class AvailabilityForm(FlaskForm):
+    """Form for adding a weekly window when an employee can work."""
+
+    employee = QuerySelectField(
+        "Employee",
+        query_factory=employee_query,
+        get_label="name",
+        allow_blank=True,
+        blank_text="-- Select Employee --",
+        validators=[DataRequired(message="Please select an employee.")],
+    )
+    weekday = SelectField("Day", choices=WEEKDAY_CHOICES, coerce=int)
+    start_time = TimeField("From", validators=[DataRequired()])
+    end_time = TimeField(
+        "Until (00:00 = midnight)", validators=[DataRequired()]
+    )
+    submit = SubmitField("Add Availability")
@@ -14,6 +14,9 @@ class Employee(db.Model):
 
 
 class Shift(db.Model):
+    # Seek index for paging shifts in time order (see app/api/routes.py).
+    __table_args__ = (db.Index("ix_shift_start_time_id", "start_time", "id"),)
+
     id = db.Column(db.Integer, primary_key=True)
     employee_id = db.Column(
         db.Integer, db.ForeignKey("employee.id"), nullable=True, index=True
@@ -28,7 +31,21 @@ class Shift(db.Model):
         return f"<Shift P:{self.required_position} E:{emp_name} Start:{self.start_time.strftime('%H:%M')}>"
 
 
+def _log_month(context):
+    log_date = context.get_current_parameters()["log_date"]
+    return log_date.replace(day=1)
+
+
 class PerformanceLog(db.Model):
+    # One log per employee per month.
+    __table_args__ = (
+        db.UniqueConstraint(
+            "employee_id", "log_month", name="uq_performance_log_employee_month"
+        ),
+        # Seek index for paging logs by date (dashboard and API).
+        db.Index("ix_performance_log_log_date_id", "log_date", "id"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     employee_id = db.Column(
         db.Integer, db.ForeignKey("employee.id"), nullable=False, index=True
@@ -36,6 +53,8 @@ class PerformanceLog(db.Model):
     log_date = db.Column(
         db.Date, nullable=False, index=True, default=datetime.date.today
     )
+    # First day of log_date's month; filled in from log_date on insert.
+    log_month = db.Column(db.Date, nullable=False, default=_log_month)
     rating = db.Column(db.Float)
     notes = db.Column(db.Text)
     recorded_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
@@ -45,3 +64,218 @@ class PerformanceLog(db.Model):
 
     def __repr__(self):
         return f"<PerformanceLog E:{self.employee_id} D:{self.log_date} Rating:{self.rating}>"
+
+
+class Availability(db.Model):
+    """
+    A weekly window when an employee can work (weekday 0 = Monday).
+    Employees without any windows are treated as available at all times.
+    An end_time of 00:00, or one before start_time, runs past midnight.
+    """
+
+    id = db.Column(db.Integer, primary_key=True)
+    employee_id = db.Column(
+        db.Integer, db.ForeignKey("employee.id"), nullable=False, index=True
+    )
+    weekday = db.Column(db.Integer, nullable=False)
+    start_time = db.Column(db.Time, nullable=False)
+    end_time = db.Column(db.Time, nullable=False)
+    employee = db.relationship(
+        "Employee", backref=db.backref("availability", lazy="dynamic")
+    )
+
+    def __repr__(self):
+        return f"<Availability E:{self.employee_id} W:{self.weekday} {self.start_time}-{self.end_time}>"
+
+
+class TimeOff(db.Model):
+    """An approved absence from `start` (inclusive) to `end` (exclusive)."""
+
+    __table_args__ = (db.Index("ix_time_off_employee_id_start", "employee_id", "start"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    employee_id = db.Column(db.Integer, db.ForeignKey("employee.id"), nullable=False)
+    start = db.Column(db.DateTime, nullable=False)
+    end = db.Column(db.DateTime, nullable=False, index=True)
+    reason = db.Column(db.String(255))
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+    employee = db.relationship(
+        "Employee", backref=db.backref("time_off", lazy="dynamic")
+    )
+
+    def __repr__(self):
+        return f"<TimeOff E:{self.employee_id} {self.start}-{self.end}>"
+
+
+class ForecastRun(db.Model):
+    """One stored forecast: a training-data version forecast `horizon_days` ahead."""
+
+    id = db.Column(db.Integer, primary_key=True)
+    data_version = db.Column(db.String(64), nullable=False, index=True)
+    horizon_days = db.Column(db.Integer, nullable=False)
+    history_end = db.Column(db.Date, nullable=False)
+    created_at = db.Column(
+        db.DateTime, nullable=False, index=True, default=datetime.datetime.utcnow
+    )
+    points = db.relationship(
+        "ForecastPoint", backref="run", lazy="dynamic", cascade="all, delete-orphan"
+    )
+
+    def __repr__(self):
+        return f"<ForecastRun V:{self.data_version[:12]} H:{self.horizon_days}>"
+
+
+class ForecastPoint(db.Model):
+    __table_args__ = (db.Index("ix_forecast_point_run_id_ds", "run_id", "ds"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.Integer, db.ForeignKey("forecast_run.id"), nullable=False)
+    ds = db.Column(db.Date, nullable=False)
+    yhat = db.Column(db.Float)
+    yhat_lower = db.Column(db.Float)
+    yhat_upper = db.Column(db.Float)
+
+    def __repr__(self):
+        return f"<ForecastPoint R:{self.run_id} D:{self.ds} yhat:{self.yhat}>"
+
+
+class ScheduleJob(db.Model):
+    """A queued or finished background run of scheduling.create_schedule()."""
+
+    id = db.Column(db.Integer, primary_key=True)
+    target_month = db.Column(db.Date, nullable=False, index=True)
+    incremental = db.Column(db.Boolean, nullable=False, default=False)
+    status = db.Column(db.String(16), nullable=False, index=True, default="queued")
+    phase = db.Column(db.String(32), nullable=False, default="queued")
+    progress = db.Column(db.Integer, nullable=False, default=0)
+    message = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "target_month": self.target_month.strftime("%Y-%m"),
+            "incremental": self.incremental,
+            "status": self.status,
+            "phase": self.phase,
+            "progress": self.progress,
+            "message": self.message,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+    def __repr__(self):
+        return f"<ScheduleJob {self.id} M:{self.target_month} S:{self.status}>"
+
+
+class ScheduleLock(db.Model):
+    """Held while a month is being rebuilt; the primary key makes it exclusive."""
+
+    target_month = db.Column(db.Date, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey("schedule_job.id"), nullable=False)
+    acquired_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<ScheduleLock M:{self.target_month} J:{self.job_id}>"
+
+
+class NotificationOutbox(db.Model):
+    """An email waiting to be delivered by the outbox dispatcher."""
+
+    id = db.Column(db.Integer, primary_key=True)
+    employee_id = db.Column(
+        db.Integer, db.ForeignKey("employee.id"), nullable=True, index=True
+    )
+    sender = db.Column(db.String(120), nullable=False)
+    recipient = db.Column(db.String(120), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    html = db.Column(db.Text)
+    status = db.Column(db.String(16), nullable=False, default="pending")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(
+        db.DateTime, nullable=False, default=datetime.datetime.utcnow
+    )
+    last_error = db.Column(db.Text)
+    claim_token = db.Column(db.String(32))
+    claimed_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index("ix_notification_outbox_status_next", "status", "next_attempt_at"),
+    )
+
+    def __repr__(self):
+        return f"<NotificationOutbox {self.id} To:{self.recipient} S:{self.status}>"
+
+
+class ScheduleVersion(db.Model):
+    """
+    Single-row counter bumped in the same commit as any schedule change.
+    Calendar feeds use it as their ETag.
+    """
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ScheduleVersion {self.version}>"
+
+
+class PerformanceSummary(db.Model):
+    """
+    Per-employee rollup of PerformanceLog, refreshed whenever logs for that
+    employee are written (see app/utils/performance.py).
+    """
+
+    employee_id = db.Column(
+        db.Integer, db.ForeignKey("employee.id"), primary_key=True
+    )
+    log_count = db.Column(db.Integer, nullable=False, default=0)
+    avg_rating = db.Column(db.Float)  # all logs
+    rolling_avg_rating = db.Column(db.Float)  # most recent ROLLING_WINDOW logs
+    trend_slope = db.Column(db.Float)  # rating points per month, recent logs
+    last_rating = db.Column(db.Float)
+    last_log_date = db.Column(db.Date)
+    updated_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+    employee = db.relationship(
+        "Employee", backref=db.backref("performance_summary", uselist=False)
+    )
+
+    def __repr__(self):
+        return f"<PerformanceSummary E:{self.employee_id} Avg:{self.avg_rating} Last:{self.last_rating}>"
+
+
+class SalesHistory(db.Model):
+    """
+    Append-only daily (or hourly) sales per location; the forecaster's
+    training data. Rows are added by ingest_sales.py and never updated.
+    """
+
+    location = db.Column(db.String(64), primary_key=True, default="default")
+    ds = db.Column(db.DateTime, primary_key=True)
+    y = db.Column(db.Float, nullable=False)
+    ingested_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+
+    def __repr__(self):
+        return f"<SalesHistory {self.location} {self.ds}: {self.y}>"
+
+
+class SalesHistoryVersion(db.Model):
+    """
+    One row per location, bumped in the same commit as any ingest that adds
+    sales rows. The forecast store keys on it, so a hit never reads history.
+    """
+
+    location = db.Column(db.String(64), primary_key=True)
+    revision = db.Column(db.Integer, nullable=False, default=0)
+    newest_ds = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+
+    def __repr__(self):
+        return f"<SalesHistoryVersion {self.location} R:{self.revision}>"
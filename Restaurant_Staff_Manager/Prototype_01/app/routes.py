@@ -1,9 +1,27 @@
-from flask import Blueprint, render_template, flash, redirect, url_for
-from app.models import Employee, Shift
-from app.utils import forecasting, scheduling
+from flask import (
+    Blueprint,
+    render_template,
+    flash,
+    redirect,
+    url_for,
+    jsonify,
+    request,
+    Response,
+    abort,
+    stream_with_context,
+    current_app,
+    session,
+)
+from app.models import Employee, Shift, ScheduleJob
+from app.utils import (
+    costs,
+    export,
+    jobs,
+    page_cache,
+    schedule_version,
+)
 from app import db
 from sqlalchemy.orm import joinedload
-from collections import defaultdict
 from datetime import timedelta
 import datetime
 import calendar
@@ -21,15 +39,18 @@ def index():
 def run_forecast_route():
     """Route to trigger the forecast generation and display results."""
     print("Accessed /run_forecast route")
+    # Imported here so pandas and the forecaster load on first use, not at boot.
+    from app.utils import forecast_store
+
     try:
-        forecast_df = forecasting.generate_forecast()
+        forecast_df = forecast_store.get_forecast()
 
         if forecast_df is not None:
             print("Forecast DataFrame generated successfully.")
             html_table = forecast_df.tail(10).to_html(border=1)
             return f"<h2>Forecast Results (Last 10 Periods)</h2>{html_table}"
         else:
-            print("forecasting.generate_forecast() returned None.")
+            print("forecast_store.get_forecast() returned None.")
             return (
                 "Error during forecast generation. Check container logs for details.",
                 500,
@@ -42,22 +63,28 @@ def run_forecast_route():
 
 @bp.route("/generate_schedule")
 def generate_schedule_route():
-    """Route to trigger the schedule generation for the current month."""
+    """
+    Route to queue the schedule generation for the current month.
+    ?mode=incremental keeps existing assignments and only writes changes.
+    """
     print("Accessed /generate_schedule route")
     try:
-        success = scheduling.create_schedule()
+        incremental = request.args.get("mode") == "incremental"
+        job, created = jobs.enqueue_schedule_job(incremental=incremental)
 
-        if success:
-            print("Scheduling function reported success.")
+        if created:
+            print(f"Queued schedule job {job.id}.")
             flash(
-                "New schedule generated successfully for the current month!", "success"
+                "Schedule generation for the current month has started. This page updates when it finishes.",
+                "success",
             )
         else:
-            print("Scheduling function reported failure.")
+            print(f"Schedule job {job.id} already in progress.")
             flash(
-                "Error generating schedule for the current month. Check application logs for details.",
-                "danger",
+                "A schedule for the current month is already being generated.",
+                "info",
             )
+        return redirect(url_for("main.schedule_job_view", job_id=job.id))
 
     except Exception as e:
         print(f"Exception in /generate_schedule route: {e}")
@@ -69,13 +96,54 @@ def generate_schedule_route():
     return redirect(url_for("main.index"))
 
 
+@bp.route("/generate_schedule/<int:job_id>")
+def schedule_job_view(job_id):
+    """Shows the progress of a background schedule generation job."""
+    job = db.get_or_404(ScheduleJob, job_id)
+    return render_template(
+        "schedule_job.html", title="Generating Schedule", job=job.to_dict()
+    )
+
+
+@bp.route("/generate_schedule/<int:job_id>/status")
+def schedule_job_status(job_id):
+    """JSON status of a schedule generation job, polled by schedule_job.html."""
+    job = db.get_or_404(ScheduleJob, job_id)
+    return jsonify(job.to_dict())
+
+
 @bp.route("/schedule")
 def schedule_view():
-    """Displays the generated schedule for the current month."""
+    """
+    Displays the generated schedule one week at a time.
+
+    Weekly and monthly cost totals are aggregated in SQL; only the shifts of
+    the selected week are loaded. ?month=YYYY-MM picks the month (default:
+    current) and ?week=YYYY-MM-DD the Monday of the week to show.
+    """
     print("Accessed /schedule route")
     try:
+        start_of_month = _parse_month(request.args.get("month"))
+        requested_week = _week_param(request.args.get("week"))
         today = datetime.date.today()
-        start_of_month = today.replace(day=1)
+
+        # Rendered pages are cached per month, week and schedule version; a
+        # new schedule commit bumps the version and so changes every key.
+        # Pages carrying flash messages are one-off and never cached.
+        stamp = schedule_version.current_stamp()
+        cache_key = "schedule-{}-{}-{}-v{}".format(
+            start_of_month.strftime("%Y-%m"),
+            requested_week or "",
+            today - timedelta(days=today.weekday()),  # default week moves weekly
+            stamp.version,
+        )
+        cacheable = not session.get("_flashes")
+        if cacheable:
+            html = page_cache.get(cache_key)
+            if html is not None:
+                print(f"Serving cached schedule page {cache_key}")
+                return page_cache.respond(html, cache_key, stamp.updated_at)
+
         days_in_month = calendar.monthrange(start_of_month.year, start_of_month.month)[
             1
         ]
@@ -84,53 +152,42 @@ def schedule_view():
 
         print(f"Querying schedule for: {month_name_str}")
 
-        shifts = (
-            db.session.query(Shift)
-            .options(joinedload(Shift.employee))
-            .outerjoin(Shift.employee)
-            .filter(Shift.start_time >= start_of_month, Shift.start_time < end_of_month)
-            .order_by(Shift.start_time, Shift.required_position)
-            .all()
-        )
-
+        weeks = costs.weekly_costs(start_of_month, end_of_month)
+        grand_total_cost = costs.period_cost(start_of_month, end_of_month)
         print(
-            f"Found {len(shifts)} shifts for {month_name_str} (including unassigned)."
+            f"Found {sum(w.shift_count for w in weeks)} shifts in {len(weeks)} weeks for {month_name_str} (including unassigned)."
         )
 
-        weekly_shifts = defaultdict(list)
-        weekly_costs = defaultdict(float)
-        grand_total_cost = 0.0
-        for shift in shifts:
-            shift_date = shift.start_time.date()
-            week_start = shift_date - timedelta(days=shift_date.weekday())
-            weekly_shifts[week_start].append(shift)
-            if shift.employee and shift.employee.hourly_rate:
-                duration_hours = (
-                    shift.end_time - shift.start_time
-                ).total_seconds() / 3600
-                shift_cost = duration_hours * shift.employee.hourly_rate
-                weekly_costs[week_start] += shift_cost
-                grand_total_cost += shift_cost
-
-        sorted_weeks = sorted(weekly_shifts.keys())
-        weekly_data = []
-        for week_start_date in sorted_weeks:
-            weekly_data.append(
-                (
-                    week_start_date,
-                    weekly_shifts[week_start_date],
-                    weekly_costs[week_start_date],
-                )
+        week = _pick_week(requested_week, weeks)
+        shifts = []
+        if week is not None:
+            # Only the part of the week inside the month, to match the totals.
+            week_from = max(week.week_start, start_of_month)
+            week_to = min(week.week_start + timedelta(days=7), end_of_month)
+            shifts = (
+                db.session.query(Shift)
+                .options(joinedload(Shift.employee))
+                .filter(Shift.start_time >= week_from, Shift.start_time < week_to)
+                .order_by(Shift.start_time, Shift.required_position)
+                .all()
             )
-        print(f"Grouped shifts into {len(weekly_data)} weeks for {month_name_str}.")
 
-        return render_template(
+        html = render_template(
             "schedule_view.html",
             title=f"Schedule for {month_name_str}",
             month_name=month_name_str,
-            weekly_data=weekly_data,
+            month_param=start_of_month.strftime("%Y-%m"),
+            export_start=start_of_month.isoformat(),
+            export_end=(end_of_month - timedelta(days=1)).isoformat(),
+            weeks=weeks,
+            week=week,
+            shifts=shifts,
             grand_total_cost=grand_total_cost,
         )
+        if not cacheable:
+            return html
+        page_cache.store(cache_key, html)
+        return page_cache.respond(html, cache_key, stamp.updated_at)
 
     except Exception as e:
         print(f"Error querying/processing shifts: {e}")
@@ -138,4 +195,123 @@ def schedule_view():
         return redirect(url_for("main.index"))
 
 
+EXPORT_FORMATS = {
+    "csv": (export.stream_csv, "text/csv"),
+    "ndjson": (export.stream_ndjson, "application/x-ndjson"),
+    "ics": (export.stream_ical, "text/calendar"),
+}
+
+
+@bp.route("/schedule/export.<fmt>")
+def schedule_export(fmt):
+    """
+    Streams shifts for a date range as CSV, NDJSON or iCalendar (.ics).
+
+    ?start=YYYY-MM-DD and ?end=YYYY-MM-DD (inclusive) default to the current
+    month. Rows are written as they are read from the database, so memory use
+    does not grow with the size of the range.
+    """
+    if fmt not in EXPORT_FORMATS:
+        abort(404)
+    try:
+        start_of_month = datetime.date.today().replace(day=1)
+        start = (
+            datetime.date.fromisoformat(request.args["start"])
+            if request.args.get("start")
+            else start_of_month
+        )
+        end = (
+            datetime.date.fromisoformat(request.args["end"])
+            if request.args.get("end")
+            else start_of_month
+            + timedelta(
+                days=calendar.monthrange(start_of_month.year, start_of_month.month)[1]
+                - 1
+            )
+        )
+    except ValueError:
+        return "Invalid start or end date; use YYYY-MM-DD.", 400
+    if end < start:
+        return "End date is before start date.", 400
+
+    print(f"Streaming {fmt} export for {start} - {end}")
+    stream, mimetype = EXPORT_FORMATS[fmt]
+    rows = export.iter_shift_rows(
+        datetime.datetime.combine(start, datetime.time()),
+        datetime.datetime.combine(end + timedelta(days=1), datetime.time()),
+    )
+    filename = f"schedule_{start.isoformat()}_{end.isoformat()}.{fmt}"
+    return Response(
+        stream_with_context(stream(rows)),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@bp.route("/calendar/<int:employee_id>.ics")
+def employee_calendar(employee_id):
+    """
+    Subscribable iCalendar feed of one employee's shifts.
+
+    The ETag is built from the cached schedule version, so a client polling
+    an unchanged feed gets 304 Not Modified without a database query.
+    """
+    cfg = current_app.config
+    today = datetime.date.today()
+    # The feed window moves daily, so the day is part of the ETag too.
+    etag = f"{schedule_version.current_version()}-{employee_id}-{today.isoformat()}"
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+
+    employee = db.get_or_404(Employee, employee_id)
+    start = today - timedelta(days=cfg["CALENDAR_FEED_PAST_DAYS"])
+    end = today + timedelta(days=cfg["CALENDAR_FEED_FUTURE_DAYS"] + 1)
+    rows = export.iter_shift_rows(
+        datetime.datetime.combine(start, datetime.time()),
+        datetime.datetime.combine(end, datetime.time()),
+        employee_id=employee.id,
+    )
+    response = Response(
+        stream_with_context(
+            export.stream_ical(rows, calendar_name=f"{employee.name} - Shifts")
+        ),
+        mimetype="text/calendar",
+    )
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def _parse_month(value):
+    """First day of the month given as YYYY-MM, or of the current month."""
+    if value:
+        try:
+            return datetime.datetime.strptime(value, "%Y-%m").date()
+        except ValueError:
+            flash(f"Invalid month '{value}', showing the current month.", "info")
+    return datetime.date.today().replace(day=1)
+
+
+def _week_param(value):
+    """The Monday of the week given as YYYY-MM-DD, or None if missing/invalid."""
+    if not value:
+        return None
+    try:
+        day = datetime.date.fromisoformat(value)
+    except ValueError:
+        return None
+    return day - timedelta(days=day.weekday())
+
 
+def _pick_week(requested, weeks):
+    """The WeekCost row for the requested Monday, else the current week, else the first."""
+    if not weeks:
+        return None
+    by_start = {w.week_start: w for w in weeks}
+    if requested in by_start:
+        return by_start[requested]
+    today = datetime.date.today()
+    current = today - timedelta(days=today.weekday())
+    return by_start.get(current, weeks[0])
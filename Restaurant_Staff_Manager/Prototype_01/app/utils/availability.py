@@ -0,0 +1,118 @@
+# app/utils/availability.py
+
+import bisect
+import datetime
+import logging
+from collections import defaultdict
+
+from app import db
+from app.models import Availability, TimeOff
+
+log = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+
+
+class AvailabilityIndex:
+    """
+    In-memory interval index of who can work when, built once per scheduling run.
+
+    Per employee it keeps time off and already-booked shifts as sorted,
+    non-overlapping interval arrays, so checking a candidate is a binary search
+    instead of a database query per slot. Weekly availability windows are
+    kept per weekday as minute ranges.
+    """
+
+    def __init__(self, time_off=(), windows=()):
+        # employee id -> ([starts], [ends]) of merged blocked intervals
+        self._blocked = {}
+        self._windows = defaultdict(lambda: defaultdict(list))
+
+        by_employee = defaultdict(list)
+        for employee_id, start, end in time_off:
+            if end > start:
+                by_employee[employee_id].append((start, end))
+        for employee_id, intervals in by_employee.items():
+            starts, ends = [], []
+            for start, end in sorted(intervals):
+                if ends and start <= ends[-1]:
+                    ends[-1] = max(ends[-1], end)
+                else:
+                    starts.append(start)
+                    ends.append(end)
+            self._blocked[employee_id] = (starts, ends)
+
+        for employee_id, weekday, start_time, end_time in windows:
+            start = start_time.hour * 60 + start_time.minute
+            end = end_time.hour * 60 + end_time.minute
+            if end <= start:
+                end += MINUTES_PER_DAY  # runs past midnight
+            self._windows[employee_id][weekday].append((start, end))
+
+    @classmethod
+    def build(cls, start, end):
+        """
+        Loads time off overlapping [start, end) and all weekly windows in two queries.
+
+        Args:
+            start (datetime.datetime): Start of the scheduling period.
+            end (datetime.datetime): End of the scheduling period (exclusive).
+        """
+        time_off = db.session.execute(
+            db.select(TimeOff.employee_id, TimeOff.start, TimeOff.end).where(
+                TimeOff.start < end, TimeOff.end > start
+            )
+        ).all()
+        windows = db.session.execute(
+            db.select(
+                Availability.employee_id,
+                Availability.weekday,
+                Availability.start_time,
+                Availability.end_time,
+            )
+        ).all()
+        log.info(
+            f"Availability index built: {len(time_off)} time-off intervals, {len(windows)} weekly windows."
+        )
+        return cls(time_off, windows)
+
+    def is_available(self, employee_id, start, end):
+        """True if the employee is within a weekly window and not blocked for [start, end)."""
+        return self._in_window(employee_id, start, end) and not self._is_blocked(
+            employee_id, start, end
+        )
+
+    def book(self, employee_id, start, end):
+        """Blocks [start, end) for the employee, e.g. once a shift is assigned."""
+        starts, ends = self._blocked.setdefault(employee_id, ([], []))
+        i = bisect.bisect_left(starts, start)
+        starts.insert(i, start)
+        ends.insert(i, end)
+        # Merge with neighbours so the arrays stay sorted and non-overlapping.
+        if i > 0 and starts[i] <= ends[i - 1]:
+            i -= 1
+        while i + 1 < len(starts) and starts[i + 1] <= ends[i]:
+            ends[i] = max(ends[i], ends.pop(i + 1))
+            starts.pop(i + 1)
+
+    def _is_blocked(self, employee_id, start, end):
+        blocked = self._blocked.get(employee_id)
+        if not blocked:
+            return False
+        starts, ends = blocked
+        # Last interval starting before `end`; intervals never overlap, so it
+        # is the only one that can reach past `start`.
+        i = bisect.bisect_left(starts, end) - 1
+        return i >= 0 and ends[i] > start
+
+    def _in_window(self, employee_id, start, end):
+        windows = self._windows.get(employee_id)
+        if not windows:
+            return True
+        midnight = datetime.datetime.combine(start.date(), datetime.time())
+        shift_start = (start - midnight).total_seconds() / 60
+        shift_end = shift_start + (end - start).total_seconds() / 60
+        return any(
+            w_start <= shift_start and shift_end <= w_end
+            for w_start, w_end in windows.get(start.weekday(), ())
+        )
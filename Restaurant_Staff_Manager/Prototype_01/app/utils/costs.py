@@ -0,0 +1,124 @@
+# app/utils/costs.py
+
+import logging
+from collections import namedtuple
+
+from sqlalchemy import Date, Float, case, func
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+
+from app import db
+from app.models import Employee, Shift
+
+log = logging.getLogger(__name__)
+
+# One row of the weekly rollup. week_start is the Monday of the ISO week.
+WeekCost = namedtuple(
+    "WeekCost", ["week_start", "shift_count", "unassigned_count", "cost"]
+)
+
+
+class week_start(FunctionElement):
+    """SQL expression for the Monday (as a date) of the week containing a timestamp."""
+
+    type = Date()
+    inherit_cache = True
+    name = "week_start"
+
+
+@compiles(week_start)
+def _week_start_default(element, compiler, **kw):
+    # ANSI-ish fallback; PostgreSQL weeks start on Monday.
+    (ts,) = element.clauses
+    return f"CAST(date_trunc('week', {compiler.process(ts, **kw)}) AS DATE)"
+
+
+@compiles(week_start, "sqlite")
+def _week_start_sqlite(element, compiler, **kw):
+    # 'weekday 0' moves forward to Sunday (or stays on it); back 6 days is Monday.
+    (ts,) = element.clauses
+    return f"date({compiler.process(ts, **kw)}, 'weekday 0', '-6 days')"
+
+
+@compiles(week_start, "mysql")
+def _week_start_mysql(element, compiler, **kw):
+    (ts,) = element.clauses
+    ts_sql = compiler.process(ts, **kw)
+    return f"DATE(DATE_SUB({ts_sql}, INTERVAL WEEKDAY({ts_sql}) DAY))"
+
+
+class hours_between(FunctionElement):
+    """SQL expression for the length of [start, end) in (fractional) hours."""
+
+    type = Float()
+    inherit_cache = True
+    name = "hours_between"
+
+
+@compiles(hours_between)
+def _hours_between_default(element, compiler, **kw):
+    start, end = (compiler.process(c, **kw) for c in element.clauses)
+    return f"(EXTRACT(EPOCH FROM ({end} - {start})) / 3600.0)"
+
+
+@compiles(hours_between, "sqlite")
+def _hours_between_sqlite(element, compiler, **kw):
+    start, end = (compiler.process(c, **kw) for c in element.clauses)
+    # Whole epoch seconds rather than julianday(), which drifts in the 6th decimal.
+    return f"((strftime('%s', {end}) - strftime('%s', {start})) / 3600.0)"
+
+
+@compiles(hours_between, "mysql")
+def _hours_between_mysql(element, compiler, **kw):
+    start, end = (compiler.process(c, **kw) for c in element.clauses)
+    return f"(TIMESTAMPDIFF(SECOND, {start}, {end}) / 3600.0)"
+
+
+def shift_cost_expr():
+    """Per-shift labour cost (hours x hourly_rate); 0 when unassigned or unpaid."""
+    return func.coalesce(
+        hours_between(Shift.start_time, Shift.end_time) * Employee.hourly_rate, 0.0
+    )
+
+
+def weekly_costs(start, end):
+    """
+    Labour cost per week for shifts starting in [start, end), aggregated in SQL.
+
+    Args:
+        start (datetime.date | datetime.datetime): First day of the period.
+        end (datetime.date | datetime.datetime): End of the period (exclusive).
+
+    Returns:
+        list: WeekCost rows in week order.
+    """
+    bucket = week_start(Shift.start_time).label("week_start")
+    rows = db.session.execute(
+        db.select(
+            bucket,
+            func.count(Shift.id),
+            func.sum(case((Shift.employee_id.is_(None), 1), else_=0)),
+            func.sum(shift_cost_expr()),
+        )
+        .outerjoin(Employee, Shift.employee_id == Employee.id)
+        .where(Shift.start_time >= start, Shift.start_time < end)
+        .group_by(bucket)
+        .order_by(bucket)
+    ).all()
+    weeks = [
+        WeekCost(week, count, unassigned or 0, float(cost or 0.0))
+        for week, count, unassigned, cost in rows
+    ]
+    log.debug(f"Weekly cost rollup for {start} - {end}: {len(weeks)} weeks.")
+    return weeks
+
+
+def period_cost(start, end):
+    """Total labour cost of shifts starting in [start, end), as one SQL aggregate."""
+    total = db.session.scalar(
+        db.select(func.sum(shift_cost_expr()))
+        .select_from(Shift)
+        .outerjoin(Employee, Shift.employee_id == Employee.id)
+        .where(Shift.start_time >= start, Shift.start_time < end)
+    )
+    return float(total or 0.0)
@@ -0,0 +1,75 @@
+# app/utils/db_profiles.py
+
+import logging
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+log = logging.getLogger(__name__)
+
+PROFILES = ("auto", "plain", "sqlite-wal", "postgres-pooled")
+
+
+def resolve_profile(config):
+    """The engine profile to use: DB_PROFILE, or picked from the URI for "auto"."""
+    profile = (config.get("DB_PROFILE") or "auto").lower()
+    if profile not in PROFILES:
+        log.warning(f"Unknown DB_PROFILE '{profile}'; using 'plain'.")
+        return "plain"
+    if profile != "auto":
+        return profile
+    backend = make_url(config["SQLALCHEMY_DATABASE_URI"]).get_backend_name()
+    if backend == "sqlite":
+        return "sqlite-wal"
+    if backend == "postgresql":
+        return "postgres-pooled"
+    return "plain"
+
+
+def engine_options(config):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for the profile. Explicit options already in
+    the config win over the profile's.
+
+    sqlite-wal: a busy timeout on the driver, so writers queue for the lock
+        instead of failing with "database is locked" (pragmas are set per
+        connection by install()).
+    postgres-pooled: a fixed-size pool per process with overflow, pre-ping
+        to drop connections the server closed, and periodic recycling.
+    """
+    profile = resolve_profile(config)
+    options = {}
+    if profile == "sqlite-wal":
+        options["connect_args"] = {"timeout": config["SQLITE_BUSY_TIMEOUT"] / 1000}
+    elif profile == "postgres-pooled":
+        options.update(
+            pool_size=config["DB_POOL_SIZE"],
+            max_overflow=config["DB_MAX_OVERFLOW"],
+            pool_timeout=config["DB_POOL_TIMEOUT"],
+            pool_recycle=config["DB_POOL_RECYCLE"],
+            pool_pre_ping=True,
+        )
+    options.update(config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    return options
+
+
+def install(engine, config):
+    """Registers per-connection setup for the profile on a freshly created engine."""
+    profile = resolve_profile(config)
+    if profile == "sqlite-wal" and engine.dialect.name == "sqlite":
+        journal_mode = config["SQLITE_JOURNAL_MODE"]
+        synchronous = config["SQLITE_SYNCHRONOUS"]
+        busy_timeout = int(config["SQLITE_BUSY_TIMEOUT"])
+
+        @event.listens_for(engine, "connect")
+        def _set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            # WAL lets readers keep reading while a writer holds the lock;
+            # NORMAL only fsyncs at checkpoints, which is safe in WAL mode.
+            cursor.execute(f"PRAGMA journal_mode={journal_mode}")
+            cursor.execute(f"PRAGMA synchronous={synchronous}")
+            cursor.execute(f"PRAGMA busy_timeout={busy_timeout}")
+            cursor.close()
+
+    log.info(f"Database engine profile: {profile}.")
+    return profile
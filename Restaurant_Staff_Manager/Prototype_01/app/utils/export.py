@@ -0,0 +1,169 @@
+# app/utils/export.py
+
+import csv
+import datetime
+import io
+import json
+import logging
+
+from app import db
+from app.models import Employee, Shift
+
+log = logging.getLogger(__name__)
+
+# Rows fetched per round trip from the server-side cursor.
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_COLUMNS = [
+    "shift_id",
+    "start_time",
+    "end_time",
+    "position",
+    "employee_id",
+    "employee_name",
+    "hours",
+    "cost",
+]
+
+ICAL_PRODID = "-//Restaurant Staff Manager//Schedule Export//EN"
+
+
+def iter_shift_rows(start, end, employee_id=None):
+    """
+    Yields plain column tuples for shifts starting in [start, end), in start order.
+
+    Uses a Core select of the needed columns with yield_per, so rows stream
+    from a server-side cursor in batches and no ORM objects are built.
+
+    Args:
+        start (datetime.datetime): Start of the range.
+        end (datetime.datetime): End of the range (exclusive).
+        employee_id (int, optional): Restrict to one employee's shifts.
+
+    Yields:
+        tuple: (shift_id, start_time, end_time, position, employee_id,
+                employee_name, hourly_rate)
+    """
+    stmt = (
+        db.select(
+            Shift.id,
+            Shift.start_time,
+            Shift.end_time,
+            Shift.required_position,
+            Shift.employee_id,
+            Employee.name,
+            Employee.hourly_rate,
+        )
+        .outerjoin(Employee, Shift.employee_id == Employee.id)
+        .where(Shift.start_time >= start, Shift.start_time < end)
+        .order_by(Shift.start_time, Shift.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    if employee_id is not None:
+        stmt = stmt.where(Shift.employee_id == employee_id)
+
+    count = 0
+    result = db.session.execute(stmt)
+    try:
+        for row in result:
+            count += 1
+            yield tuple(row)
+    finally:
+        result.close()
+        log.info(f"Exported {count} shifts for {start} - {end}.")
+
+
+def _record(row):
+    shift_id, start_time, end_time, position, employee_id, name, rate = row
+    hours = (end_time - start_time).total_seconds() / 3600
+    return {
+        "shift_id": shift_id,
+        "start_time": start_time.isoformat(),
+        "end_time": end_time.isoformat(),
+        "position": position,
+        "employee_id": employee_id,
+        "employee_name": name,
+        "hours": round(hours, 2),
+        "cost": round(hours * rate, 2) if rate else 0.0,
+    }
+
+
+def stream_csv(rows, chunk_rows=500):
+    """Yields CSV text (header first) in chunks of `chunk_rows` rows."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    pending = 0
+    for row in rows:
+        writer.writerow(_record(row))
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue()
+
+
+def stream_ndjson(rows):
+    """Yields one JSON object per line."""
+    for row in rows:
+        yield json.dumps(_record(row)) + "\n"
+
+
+def stream_ical(rows, calendar_name="Staff Schedule"):
+    """Yields an iCalendar (RFC 5545) document with one VEVENT per shift."""
+    stamp = datetime.datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    yield _ical_lines(
+        [
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            f"PRODID:{ICAL_PRODID}",
+            "CALSCALE:GREGORIAN",
+            f"X-WR-CALNAME:{_ical_text(calendar_name)}",
+        ]
+    )
+    for row in rows:
+        shift_id, start_time, end_time, position, _employee_id, name, _rate = row
+        summary = f"{position} - {name or 'Unassigned'}"
+        yield _ical_lines(
+            [
+                "BEGIN:VEVENT",
+                f"UID:shift-{shift_id}@restaurant-staff-manager",
+                f"DTSTAMP:{stamp}",
+                # Floating local times, matching how shifts are stored.
+                f"DTSTART:{start_time.strftime('%Y%m%dT%H%M%S')}",
+                f"DTEND:{end_time.strftime('%Y%m%dT%H%M%S')}",
+                f"SUMMARY:{_ical_text(summary)}",
+                "END:VEVENT",
+            ]
+        )
+    yield _ical_lines(["END:VCALENDAR"])
+
+
+def _ical_text(value):
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def _ical_lines(lines):
+    """Joins content lines with CRLF, folding any longer than 75 octets."""
+    out = []
+    for line in lines:
+        encoded = line.encode("utf-8")
+        limit = 75
+        while len(encoded) > limit:
+            cut = limit
+            # Never split inside a multi-byte UTF-8 sequence.
+            while (encoded[cut] & 0xC0) == 0x80:
+                cut -= 1
+            out.append(encoded[:cut].decode("utf-8") + "\r\n ")
+            encoded = encoded[cut:]
+            limit = 74  # continuation lines start with a space
+        out.append(encoded.decode("utf-8") + "\r\n")
+    return "".join(out)
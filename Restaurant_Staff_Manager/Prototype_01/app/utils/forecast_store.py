@@ -0,0 +1,188 @@
+# app/utils/forecast_store.py
+
+import datetime
+from datetime import timedelta
+import hashlib
+import json
+import logging
+
+import pandas as pd
+from flask import current_app
+from sqlalchemy import insert
+
+from app import db
+from app.models import ForecastRun, ForecastPoint
+from . import forecasting, sales_history
+
+log = logging.getLogger(__name__)
+
+FORECAST_COLUMNS = ["ds", "yhat", "yhat_lower", "yhat_upper"]
+
+
+def get_forecast(days_to_predict=7):
+    """
+    Returns the forecast frame for the current training data, served from the
+    forecast store when possible and computed by the FORECAST_BACKEND
+    forecaster only on a miss.
+
+    When the sales_history table has a recorded version (see
+    sales_history.version()), a hit costs one primary-key read plus the
+    store lookup; the history itself is only loaded on a miss. Otherwise
+    (the CSV fallback, or rows ingested before versions existed) the history
+    is loaded and hashed to find the version.
+
+    Args:
+        days_to_predict (int): Number of days into the future to forecast.
+
+    Returns:
+        pandas.DataFrame: Same contract as forecasting.generate_forecast(),
+                          or None if the forecast could not be produced.
+    """
+    forecaster = forecasting.get_forecaster()
+    history = None
+    stamp = _history_stamp()
+    if stamp is not None:
+        version = _stamp_version(stamp, forecaster)
+        history_end = stamp.newest_ds.date()
+    else:
+        history = forecasting.load_history()
+        if history is None:
+            return None
+        version = forecasting.data_version(history, forecaster)
+        history_end = history["ds"].max().date()
+
+    stored = lookup(version, history_end, days_to_predict)
+    if stored is not None:
+        log.info(
+            f"Forecast store hit for version {version[:12]} ({days_to_predict} days)."
+        )
+        return stored
+
+    if history is None:
+        history = forecasting.load_history()
+        if history is None:
+            return None
+
+    log.info(f"Forecast store miss for version {version[:12]}; running forecaster.")
+    forecast_df = forecasting.generate_forecast(
+        days_to_predict=days_to_predict, history=history, forecaster=forecaster
+    )
+    if forecast_df is not None:
+        try:
+            save(version, history_end, days_to_predict, forecast_df)
+        except Exception as e:
+            db.session.rollback()
+            log.warning(f"Could not store forecast {version[:12]}: {e}")
+    return forecast_df
+
+
+def _history_stamp():
+    try:
+        return sales_history.version()
+    except Exception as e:
+        db.session.rollback()
+        log.warning(f"Could not read the sales history version: {e}")
+        return None
+
+
+def _stamp_version(stamp, forecaster):
+    """
+    Data version from the ingest revision: the training window is fully
+    determined by the location, its revision and FORECAST_HISTORY_DAYS.
+    """
+    identity = [
+        stamp.location,
+        stamp.revision,
+        current_app.config["FORECAST_HISTORY_DAYS"],
+        forecaster.settings(),
+    ]
+    return hashlib.sha256(
+        json.dumps(identity, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def lookup(version, history_end, days_to_predict):
+    """
+    Finds a fresh stored forecast covering at least `days_to_predict` days.
+
+    A longer stored horizon also answers a shorter request: its rows are cut
+    off at history_end + days_to_predict.
+    """
+    ttl = current_app.config["FORECAST_RESULT_TTL"]
+    fresh_after = datetime.datetime.utcnow() - timedelta(seconds=ttl)
+
+    run = (
+        ForecastRun.query.filter(
+            ForecastRun.data_version == version,
+            ForecastRun.horizon_days >= days_to_predict,
+            ForecastRun.created_at >= fresh_after,
+        )
+        .order_by(ForecastRun.horizon_days, ForecastRun.created_at.desc())
+        .first()
+    )
+    if run is None:
+        return None
+
+    last_day = history_end + timedelta(days=days_to_predict)
+    rows = db.session.execute(
+        db.select(
+            ForecastPoint.ds,
+            ForecastPoint.yhat,
+            ForecastPoint.yhat_lower,
+            ForecastPoint.yhat_upper,
+        )
+        .where(ForecastPoint.run_id == run.id, ForecastPoint.ds <= last_day)
+        .order_by(ForecastPoint.ds)
+    ).all()
+    if not rows:
+        return None
+
+    forecast_df = pd.DataFrame(rows, columns=FORECAST_COLUMNS)
+    forecast_df["ds"] = pd.to_datetime(forecast_df["ds"])
+    return forecast_df
+
+
+def save(version, history_end, days_to_predict, forecast_df):
+    """Stores a forecast frame and purges runs older than the TTL."""
+    purge_expired()
+
+    run = ForecastRun(
+        data_version=version,
+        horizon_days=days_to_predict,
+        history_end=history_end,
+    )
+    db.session.add(run)
+    db.session.flush()
+
+    points = [
+        {
+            "run_id": run.id,
+            "ds": ds.date(),
+            "yhat": float(yhat),
+            "yhat_lower": float(lower),
+            "yhat_upper": float(upper),
+        }
+        for ds, yhat, lower, upper in forecast_df[FORECAST_COLUMNS].itertuples(
+            index=False
+        )
+    ]
+    db.session.execute(insert(ForecastPoint), points)
+    db.session.commit()
+    log.info(
+        f"Stored {len(points)} forecast rows for version {version[:12]} ({days_to_predict} days)."
+    )
+
+
+def purge_expired():
+    """Deletes stored forecasts past the TTL (pending until the caller commits)."""
+    ttl = current_app.config["FORECAST_RESULT_TTL"]
+    expired_before = datetime.datetime.utcnow() - timedelta(seconds=ttl)
+    expired_ids = db.select(ForecastRun.id).where(
+        ForecastRun.created_at < expired_before
+    )
+    db.session.execute(
+        db.delete(ForecastPoint).where(ForecastPoint.run_id.in_(expired_ids))
+    )
+    db.session.execute(
+        db.delete(ForecastRun).where(ForecastRun.created_at < expired_before)
+    )
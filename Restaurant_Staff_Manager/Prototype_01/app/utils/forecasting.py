@@ -1,25 +1,296 @@
 import pandas as pd
-from prophet import Prophet
+import numpy as np
+from importlib import metadata
+import datetime
+import hashlib
+import json
 import os
 import logging
+import time
+from collections import namedtuple
+from flask import current_app, has_app_context
+from . import model_cache, sales_history
+from .numpy_forecasters import HoltWinters, SeasonalNaive, WeeklyRegression
+
+log = logging.getLogger(__name__)
 
 logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
 logging.getLogger("prophet").setLevel(logging.WARNING)
 
+# Keyword arguments passed to Prophet(). Changing them invalidates cached models.
+PROPHET_SETTINGS = {}
+
+# Days of each forecast kept to check the next fit's new data for drift.
+DRIFT_HORIZON_DAYS = 31
+DS_FORMAT = "%Y-%m-%dT%H:%M:%S"
+# Fit reports kept in the warm-start state, newest last.
+FIT_LOG_SIZE = 20
+
+FitReport = namedtuple("FitReport", ["mode", "seconds", "reason"])
+
+
+def _config():
+    """App config inside a request or job, Config defaults otherwise."""
+    if has_app_context():
+        return current_app.config
+    from config import Config
+
+    return {k: getattr(Config, k) for k in dir(Config) if k.isupper()}
 
-def generate_forecast(days_to_predict=7):
+
+class ProphetForecaster:
     """
-    Generates a sales/demand forecast using Prophet.
+    Prophet (fitted through cmdstan). The most accurate backend, and by far the
+    slowest to import and fit, so fitted models go through model_cache.
 
-    Args:
-        days_to_predict (int): Number of days into the future to forecast.
+    When the history only grew at the tail since the last fit, the new fit
+    is warm-started from the previous parameters (Stan init) instead of the
+    default initialisation. A full fit runs when there is no earlier fit, the
+    last full fit is older than FORECAST_FULL_REFIT_DAYS, the older rows
+    changed, or the new rows miss the previous forecast by more than
+    FORECAST_DRIFT_THRESHOLD times its in-sample RMSE.
+    """
+
+    name = "prophet"
+
+    def __init__(self):
+        self.last_fit = None  # FitReport of this forecaster's latest fit
+
+    def settings(self):
+        # Read from package metadata so a forecast store hit never imports Prophet.
+        return {
+            "prophet_version": metadata.version("prophet"),
+            "params": PROPHET_SETTINGS,
+        }
+
+    def forecast(self, df, days_to_predict):
+        from prophet.serialize import model_to_json, model_from_json
+
+        # Reuse a fitted model when neither the data nor the settings changed
+        cache_key = model_cache.make_key(df, self.settings())
+        m = model_cache.load(cache_key, model_from_json)
+
+        state = None
+        if m is not None:
+            print(f"Using cached Prophet model {cache_key[:12]}.")
+        else:
+            print("Fitting Prophet model...")
+            m, state = self._fit(df)
+            print("Model fitting complete.")
+            model_cache.save(cache_key, m, model_to_json)
+
+        future = m.make_future_dataframe(periods=days_to_predict)
+        forecast = m.predict(future)
+        if state is not None:
+            self._save_state(state, m, df, forecast)
+        return forecast[["ds", "yhat", "yhat_lower", "yhat_upper"]]
+
+    def _fit(self, df):
+        """
+        Fits a new model, warm or full as _plan_fit() decides.
+
+        Returns:
+            (Prophet, dict): The fitted model and the previous warm-start
+                             state ({} when there was none or it is disabled).
+        """
+        from prophet import Prophet
+
+        cfg = _config()
+        state = None
+        if cfg["FORECAST_WARM_START"]:
+            state = model_cache.load_state(self._state_name(cfg))
+        mode, reason = _plan_fit(state, df, cfg)
+
+        started = time.perf_counter()
+        m = Prophet(**PROPHET_SETTINGS)
+        if mode == "warm":
+            try:
+                m.fit(df, init=_stan_init(state["params"]))
+            except Exception as e:
+                # e.g. a different number of changepoints than the last fit
+                log.warning(f"Warm start failed ({e}); fitting from scratch.")
+                mode, reason = "full", "warm start failed"
+                started = time.perf_counter()
+                m = Prophet(**PROPHET_SETTINGS)
+                m.fit(df)
+        else:
+            m.fit(df)
+
+        self.last_fit = FitReport(mode, time.perf_counter() - started, reason)
+        print(f"Prophet {mode} fit in {self.last_fit.seconds:.2f}s ({reason}).")
+        log.info(f"Prophet {mode} fit in {self.last_fit.seconds:.2f}s ({reason}).")
+        return m, state or {}
+
+    def _state_name(self, cfg):
+        """One warm-start state per model settings and sales location."""
+        identity = json.dumps(
+            [self.settings(), cfg["SALES_HISTORY_LOCATION"]], sort_keys=True
+        )
+        return "prophet-warm-" + hashlib.sha256(identity.encode("utf-8")).hexdigest()[:16]
+
+    def _save_state(self, previous, m, df, forecast):
+        """Stores what the next fit needs: parameters, series, drift baseline."""
+        cfg = _config()
+        if not cfg["FORECAST_WARM_START"]:
+            return
+        ds, y = _series(df)
+        full = self.last_fit.mode == "full"
+        now = datetime.datetime.utcnow().isoformat(timespec="seconds")
+
+        fitted = forecast.set_index("ds")["yhat"]
+        in_sample = fitted.reindex(pd.to_datetime(ds, format=DS_FORMAT)).to_numpy()
+        rmse = float(np.sqrt(np.nanmean((np.asarray(y) - in_sample) ** 2)))
+        future = forecast[forecast["ds"] > pd.Timestamp(ds[-1])].head(DRIFT_HORIZON_DAYS)
+
+        fits = previous.get("fits", []) + [
+            {
+                "mode": self.last_fit.mode,
+                "seconds": round(self.last_fit.seconds, 3),
+                "reason": self.last_fit.reason,
+                "at": now,
+            }
+        ]
+        model_cache.save_state(
+            self._state_name(cfg),
+            {
+                "params": _warm_start_params(m),
+                "ds": ds,
+                "y": y,
+                # The drift baseline comes from the last full fit.
+                "resid_rmse": rmse if full else previous.get("resid_rmse", rmse),
+                "full_fit_at": now if full else previous.get("full_fit_at", now),
+                "predictions": dict(
+                    zip(future["ds"].dt.strftime(DS_FORMAT), future["yhat"].astype(float))
+                ),
+                "fits": fits[-FIT_LOG_SIZE:],
+            },
+        )
+
+
+def _warm_start_params(m):
+    """A fitted model's MAP estimates in the form Stan accepts as init."""
+    return {
+        "k": float(m.params["k"][0][0]),
+        "m": float(m.params["m"][0][0]),
+        "sigma_obs": float(m.params["sigma_obs"][0][0]),
+        "delta": [float(v) for v in m.params["delta"][0]],
+        "beta": [float(v) for v in m.params["beta"][0]],
+    }
+
+
+def _stan_init(params):
+    """Stored warm-start parameters back in the array form Prophet expects."""
+    return {
+        name: np.asarray(value) if isinstance(value, list) else value
+        for name, value in params.items()
+    }
+
+
+def _series(df):
+    """(ds strings, y floats) of a history frame, oldest first."""
+    ordered = df.assign(ds=pd.to_datetime(df["ds"])).sort_values("ds")
+    return (
+        ordered["ds"].dt.strftime(DS_FORMAT).tolist(),
+        ordered["y"].astype(float).tolist(),
+    )
+
+
+def _plan_fit(state, df, cfg):
+    """Returns ("warm" or "full", reason) for fitting `df` after `state`."""
+    if not state:
+        return "full", "no earlier fit to start from"
+
+    full_at = datetime.datetime.fromisoformat(state["full_fit_at"])
+    age_days = (datetime.datetime.utcnow() - full_at).total_seconds() / 86400
+    if age_days >= cfg["FORECAST_FULL_REFIT_DAYS"]:
+        return "full", f"last full fit {age_days:.1f} days ago"
+
+    ds, y = _series(df)
+    if not _grew_at_tail(state, ds, y):
+        return "full", "history changed, not only appended"
+
+    drift = _drift(state, ds, y)
+    if drift is not None and drift > cfg["FORECAST_DRIFT_THRESHOLD"]:
+        return "full", f"drift: new rows off by {drift:.1f}x the fit's RMSE"
+
+    appended = sum(1 for d in ds if d > state["ds"][-1])
+    return "warm", f"{appended} row(s) appended"
+
+
+def _grew_at_tail(state, ds, y):
+    """
+    True when the series is the previous one with rows appended; rows may
+    also have dropped off the front as the FORECAST_HISTORY_DAYS window slid.
+    """
+    prev_ds, prev_y = state["ds"], state["y"]
+    if not prev_ds or not ds or ds[-1] < prev_ds[-1]:
+        return False
+    try:
+        start = prev_ds.index(ds[0])
+    except ValueError:
+        return False
+    overlap = len(prev_ds) - start
+    return ds[:overlap] == prev_ds[start:] and y[:overlap] == prev_y[start:]
+
+
+def _drift(state, ds, y):
+    """Mean absolute miss of the previous forecast on the new rows, in RMSEs (or None)."""
+    predictions = state.get("predictions") or {}
+    misses = [abs(v - predictions[d]) for d, v in zip(ds, y) if d in predictions]
+    scale = state.get("resid_rmse") or 0.0
+    if not misses or scale <= 0:
+        return None
+    return float(np.mean(misses)) / scale
+
+
+# FORECAST_BACKEND values. Every backend has settings() and
+# forecast(df, days_to_predict) returning ds/yhat/yhat_lower/yhat_upper.
+BACKENDS = {
+    "prophet": ProphetForecaster,
+    "seasonal_naive": SeasonalNaive,
+    "holt_winters": HoltWinters,
+    "weekly_regression": WeeklyRegression,
+}
+
+
+def get_forecaster(name=None):
+    """
+    Returns the forecaster `name`, or the one set by FORECAST_BACKEND.
+
+    Unknown names fall back to Prophet with a warning.
+    """
+    if name is None:
+        name = _config()["FORECAST_BACKEND"]
+    backend = BACKENDS.get((name or "").lower())
+    if backend is None:
+        log.warning(f"Unknown FORECAST_BACKEND '{name}'; using 'prophet'.")
+        backend = ProphetForecaster
+    return backend()
+
+
+def load_history():
+    """
+    Reads the historical sales series used to train the forecaster.
+
+    Inside the app this is the last FORECAST_HISTORY_DAYS of the
+    sales_history table for SALES_HISTORY_LOCATION. The bundled CSV is used
+    outside the app and while the table is still empty.
 
     Returns:
-        pandas.DataFrame: A DataFrame containing the forecast with columns
-                          ['ds', 'yhat', 'yhat_lower', 'yhat_upper']
-                          Returns None if an error occurs (e.g., file not found).
+        pandas.DataFrame: Columns ['ds', 'y'] with 'ds' parsed as datetimes,
+                          or None if no usable data was found.
     """
-    print("Attempting to generate forecast...") 
+    if has_app_context():
+        try:
+            df = sales_history.load_window()
+        except Exception as e:
+            sales_history.db.session.rollback()
+            print(f"Could not read the sales_history table: {e}")
+            df = None
+        if df is not None:
+            print(f"Read {len(df)} rows from the sales_history table.")
+            return _check_history(df)
+        print("No rows in sales_history; using the CSV (load it with ingest_sales.py).")
 
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     data_dir = os.path.join(os.path.dirname(base_dir), "data")
@@ -28,43 +299,72 @@ def generate_forecast(days_to_predict=7):
     print(f"Looking for data file at: {file_path}")
 
     try:
-        df = pd.read_csv(file_path)
+        df, dropped = sales_history.read_csv(file_path)
         print(f"Successfully read {len(df)} rows from {file_path}")
+        if dropped:
+            print(f"Skipped {dropped} row(s) with a missing or invalid ds/y.")
+    except FileNotFoundError:
+        print(f"Error: Data file not found at {file_path}")
+        return None
+    except ValueError as e:
+        # pandas raises ValueError when usecols names a missing column
+        print(f"Error: CSV must contain 'ds' and 'y' columns ({e}).")
+        return None
+    except Exception as e:
+        print(f"An error occurred reading {file_path}: {e}")
+        return None
 
-        df["ds"] = pd.to_datetime(df["ds"])
+    return _check_history(df)
 
-        if "ds" not in df.columns or "y" not in df.columns:
-            print("Error: CSV must contain 'ds' and 'y' columns.")
-            return None
 
-        if len(df) < 2:
-            print("Error: Need at least 2 data points to create a forecast.")
-            return None
+def _check_history(df):
+    if len(df) < 2:
+        print("Error: Need at least 2 data points to create a forecast.")
+        return None
+    return df
 
-        # --- Model Training & Forecasting ---
-        # Initialize Prophet model
-        m = Prophet()
 
-        print("Fitting Prophet model...")
-        m.fit(df)
-        print("Model fitting complete.")
+def data_version(df, forecaster=None):
+    """Identifies a training series + forecaster settings; changes whenever a refit is needed."""
+    forecaster = forecaster or get_forecaster()
+    return model_cache.make_key(df, forecaster.settings())
 
-        future = m.make_future_dataframe(periods=days_to_predict)
 
-        print(f"Generating forecast for {days_to_predict} days...")
-        forecast = m.predict(future)
-        print("Forecast generation complete.")
+def generate_forecast(days_to_predict=7, history=None, forecaster=None):
+    """
+    Generates a sales/demand forecast with the configured backend.
+
+    Args:
+        days_to_predict (int): Number of days into the future to forecast.
+        history (pandas.DataFrame, optional): Training data already returned by
+                          load_history(). Read from disk when omitted.
+        forecaster (optional): A backend from get_forecaster(). Defaults to
+                          the one set by FORECAST_BACKEND.
+
+    Returns:
+        pandas.DataFrame: A DataFrame containing the forecast with columns
+                          ['ds', 'yhat', 'yhat_lower', 'yhat_upper']
+                          Returns None if an error occurs (e.g., file not found).
+    """
+    print("Attempting to generate forecast...") 
+
+    try:
+        df = history if history is not None else load_history()
+        if df is None:
+            return None
 
-        forecast_subset = forecast[["ds", "yhat", "yhat_lower", "yhat_upper"]]
+        # --- Model Training & Forecasting ---
+        forecaster = forecaster or get_forecaster()
+
+        print(f"Generating {forecaster.name} forecast for {days_to_predict} days...")
+        forecast_subset = forecaster.forecast(df, days_to_predict)
+        print("Forecast generation complete.")
 
         print("Forecast results (tail):")
         print(forecast_subset.tail())
 
         return forecast_subset
 
-    except FileNotFoundError:
-        print(f"Error: Data file not found at {file_path}")
-        return None
     except Exception as e:
         print(f"An error occurred during forecasting: {e}")
         return None
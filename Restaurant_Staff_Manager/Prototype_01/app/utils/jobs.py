@@ -0,0 +1,228 @@
+# app/utils/jobs.py
+
+import datetime
+from datetime import timedelta
+import logging
+import queue
+import threading
+
+from flask import current_app
+from sqlalchemy import delete, insert, update
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import ScheduleJob, ScheduleLock
+from . import outbox
+
+log = logging.getLogger(__name__)
+
+# Progress (percent) reported when each create_schedule phase starts.
+PHASE_PROGRESS = {
+    "queued": 0,
+    "forecast": 10,
+    "employees": 25,
+    "planning": 35,
+    "notifying": 60,
+    "saving": 80,
+    "done": 100,
+}
+ACTIVE_STATUSES = ("queued", "running")
+
+_queue = queue.Queue()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def enqueue_schedule_job(target_date=None, incremental=False):
+    """
+    Queues a schedule generation for the month containing `target_date`.
+    With `incremental`, the job applies only the changes to the existing month.
+
+    If a job for that month is already queued or running, that job is returned
+    instead of creating a second one. An active job whose worker is gone (see
+    _is_abandoned) is marked failed and replaced by a new job.
+
+    Returns:
+        tuple: (ScheduleJob, bool) - the job and whether it was newly created.
+    """
+    if target_date is None:
+        target_date = datetime.date.today()
+    target_month = target_date.replace(day=1)
+
+    active = (
+        ScheduleJob.query.filter(
+            ScheduleJob.target_month == target_month,
+            ScheduleJob.status.in_(ACTIVE_STATUSES),
+        )
+        .order_by(ScheduleJob.id.desc())
+        .first()
+    )
+    if active is not None and _is_abandoned(active):
+        log.warning(
+            f"Schedule job {active.id} for {target_month} was abandoned by its worker; queuing a new one."
+        )
+        _set_job(
+            active.id,
+            status="failed",
+            phase="done",
+            message="Abandoned: the worker running this job stopped.",
+            finished_at=datetime.datetime.utcnow(),
+        )
+        db.session.expire(active)
+        active = None
+    if active is not None:
+        log.info(f"Schedule job {active.id} already active for {target_month}.")
+        return active, False
+
+    job = ScheduleJob(target_month=target_month, incremental=incremental)
+    db.session.add(job)
+    db.session.commit()
+
+    _ensure_worker(current_app._get_current_object())
+    _queue.put(job.id)
+    log.info(f"Queued schedule job {job.id} for {target_month}.")
+    return job, True
+
+
+def _is_abandoned(job):
+    """
+    True for a queued or running job that no worker will finish. The queue and
+    the worker thread live in process memory, so a restart or crash leaves the
+    row active: a running job has then lost its live month lock, and a queued
+    one has waited longer than SCHEDULE_JOB_LOCK_TIMEOUT.
+    """
+    now = datetime.datetime.utcnow()
+    if job.status == "running":
+        lock = db.session.get(ScheduleLock, job.target_month)
+        return lock is None or lock.job_id != job.id or lock.expires_at < now
+    timeout = current_app.config["SCHEDULE_JOB_LOCK_TIMEOUT"]
+    return job.created_at is None or job.created_at < now - timedelta(
+        seconds=timeout
+    )
+
+
+def _ensure_worker(app):
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(
+                target=_worker_loop, args=(app,), name="schedule-worker", daemon=True
+            )
+            _worker.start()
+
+
+def _worker_loop(app):
+    while True:
+        job_id = _queue.get()
+        try:
+            with app.app_context():
+                run_job(job_id)
+        except Exception as e:
+            log.error(f"Schedule worker crashed on job {job_id}: {e}", exc_info=True)
+        finally:
+            _queue.task_done()
+
+
+def run_job(job_id):
+    """Runs one queued job under the per-month lock, recording its progress."""
+    job = db.session.get(ScheduleJob, job_id)
+    if job is None:
+        log.warning(f"Schedule job {job_id} vanished before it could run.")
+        return
+    target_month = job.target_month
+    incremental = job.incremental
+    db.session.remove()
+
+    if not acquire_month_lock(target_month, job_id):
+        _set_job(
+            job_id,
+            status="skipped",
+            phase="done",
+            message="Another schedule generation for this month is already running.",
+            finished_at=datetime.datetime.utcnow(),
+        )
+        return
+
+    _set_job(job_id, status="running", started_at=datetime.datetime.utcnow())
+    # scheduling pulls in pandas and the forecaster; load them on the first job.
+    from . import scheduling
+
+    try:
+        success = scheduling.create_schedule(
+            target_date=target_month,
+            incremental=incremental,
+            progress=lambda phase: _set_job(
+                job_id, phase=phase, progress=PHASE_PROGRESS.get(phase, 0)
+            ),
+        )
+        _set_job(
+            job_id,
+            status="finished" if success else "failed",
+            phase="done",
+            progress=100,
+            message=None if success else "Schedule generation failed. Check logs.",
+            finished_at=datetime.datetime.utcnow(),
+        )
+    except Exception as e:
+        log.error(f"Schedule job {job_id} failed: {e}", exc_info=True)
+        _set_job(
+            job_id,
+            status="failed",
+            message=str(e),
+            finished_at=datetime.datetime.utcnow(),
+        )
+    finally:
+        release_month_lock(target_month, job_id)
+
+    # Deliver the job's emails now rather than at the next dispatcher poll, on
+    # the outbox thread so a large backlog never holds up the next job.
+    outbox.dispatch_soon(current_app._get_current_object())
+
+
+def acquire_month_lock(target_month, job_id):
+    """Takes the month lock (clearing an expired holder first). Returns False if held."""
+    now = datetime.datetime.utcnow()
+    timeout = current_app.config["SCHEDULE_JOB_LOCK_TIMEOUT"]
+    table = ScheduleLock.__table__
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(
+                delete(table).where(
+                    table.c.target_month == target_month, table.c.expires_at < now
+                )
+            )
+            conn.execute(
+                insert(table).values(
+                    target_month=target_month,
+                    job_id=job_id,
+                    acquired_at=now,
+                    expires_at=now + timedelta(seconds=timeout),
+                )
+            )
+        return True
+    except IntegrityError:
+        log.warning(f"Month {target_month} is locked; job {job_id} not started.")
+        return False
+
+
+def release_month_lock(target_month, job_id):
+    table = ScheduleLock.__table__
+    with db.engine.begin() as conn:
+        conn.execute(
+            delete(table).where(
+                table.c.target_month == target_month, table.c.job_id == job_id
+            )
+        )
+
+
+def _set_job(job_id, **values):
+    """
+    Updates a job row on its own connection, so status changes are visible to
+    pollers immediately and never commit create_schedule's pending work.
+    """
+    table = ScheduleJob.__table__
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(update(table).where(table.c.id == job_id).values(**values))
+    except Exception as e:
+        log.warning(f"Could not update schedule job {job_id}: {e}")
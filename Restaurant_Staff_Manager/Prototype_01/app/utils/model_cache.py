@@ -0,0 +1,220 @@
+# app/utils/model_cache.py
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, has_app_context
+
+log = logging.getLogger(__name__)
+
+# Fitted models already deserialised by this process, newest last:
+# key -> (model, time the model was written to the cache).
+_memory = OrderedDict()
+_memory_lock = threading.Lock()
+MEMORY_SLOTS = 4
+
+
+def _settings():
+    """Cache settings from the app config, or Config defaults outside a request."""
+    if has_app_context():
+        cfg = current_app.config
+    else:
+        from config import Config
+
+        cfg = {k: getattr(Config, k) for k in dir(Config) if k.isupper()}
+    return {
+        "dir": cfg["FORECAST_MODEL_CACHE_DIR"],
+        "max_entries": cfg["FORECAST_MODEL_CACHE_MAX_ENTRIES"],
+        "max_bytes": cfg["FORECAST_MODEL_CACHE_MAX_BYTES"],
+        "max_age": cfg["FORECAST_MODEL_CACHE_MAX_AGE"],
+    }
+
+
+def make_key(df, settings):
+    """
+    Builds a cache key from the training data content and the model settings.
+
+    Args:
+        df (pandas.DataFrame): Training frame with 'ds' and 'y' columns.
+        settings (dict): Anything that changes the fitted model (kwargs, versions).
+
+    Returns:
+        str: Hex digest identifying this data/settings combination.
+    """
+    import pandas as pd
+
+    digest = hashlib.sha256()
+    digest.update(
+        pd.util.hash_pandas_object(df[["ds", "y"]], index=False).values.tobytes()
+    )
+    digest.update(json.dumps(settings, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _path_for(cache_dir, key):
+    return os.path.join(cache_dir, f"{key}.json")
+
+
+def load(key, deserialize):
+    """
+    Returns the cached model for `key`, or None on a miss.
+
+    Args:
+        key (str): Key from make_key().
+        deserialize (callable): Turns the stored JSON string back into a model.
+    """
+    settings = _settings()
+    with _memory_lock:
+        if key in _memory:
+            model, written_at = _memory[key]
+            if time.time() - written_at <= settings["max_age"]:
+                _memory.move_to_end(key)
+                return model
+            # Same expiry as the disk entry, which may already be evicted.
+            del _memory[key]
+
+    path = _path_for(settings["dir"], key)
+    try:
+        written_at = os.path.getmtime(path)
+        age = time.time() - written_at
+        if age > settings["max_age"]:
+            log.info(f"Cached model {key[:12]} expired ({age:.0f}s old).")
+            _remove(path)
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            model = deserialize(f.read())
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        log.warning(f"Discarding unreadable cached model {path}: {e}")
+        _remove(path)
+        return None
+
+    # Touch the entry so size-based eviction drops the least recently used first.
+    try:
+        os.utime(path, (time.time(), os.path.getmtime(path)))
+    except OSError:
+        pass
+
+    _remember(key, model, written_at)
+    return model
+
+
+def save(key, model, serialize):
+    """
+    Writes a fitted model to the shared cache directory and evicts old entries.
+
+    The file is written to a temp name and renamed into place, so concurrent
+    gunicorn workers never read a half-written model.
+    """
+    _remember(key, model, time.time())
+    settings = _settings()
+    cache_dir = settings["dir"]
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(serialize(model))
+        os.replace(tmp_path, _path_for(cache_dir, key))
+        log.info(f"Cached fitted model {key[:12]} in {cache_dir}.")
+    except Exception as e:
+        log.warning(f"Could not write model cache entry {key[:12]}: {e}")
+        return
+    evict(settings)
+
+
+def load_state(name):
+    """
+    Returns a small JSON state document stored next to the models, or None.
+
+    State files (".state") are never evicted; they carry what must outlive
+    any single cached model, such as the warm-start parameters.
+    """
+    path = os.path.join(_settings()["dir"], f"{name}.state")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        log.warning(f"Ignoring unreadable state file {path}: {e}")
+        return None
+
+
+def save_state(name, state):
+    """Atomically replaces the state document `name`."""
+    cache_dir = _settings()["dir"]
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, os.path.join(cache_dir, f"{name}.state"))
+    except Exception as e:
+        log.warning(f"Could not write state {name}: {e}")
+
+
+def evict(settings=None):
+    """Removes expired entries, then least recently used ones over the size limits."""
+    settings = settings or _settings()
+    cache_dir = settings["dir"]
+    try:
+        names = os.listdir(cache_dir)
+    except FileNotFoundError:
+        return 0
+
+    now = time.time()
+    entries = []
+    removed = 0
+    for name in names:
+        path = os.path.join(cache_dir, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        if name.endswith(".tmp"):
+            # Leftover from a crashed writer.
+            if now - stat.st_mtime > 3600:
+                removed += _remove(path)
+            continue
+        if not name.endswith(".json"):
+            continue
+        if now - stat.st_mtime > settings["max_age"]:
+            removed += _remove(path)
+            continue
+        entries.append((max(stat.st_atime, stat.st_mtime), stat.st_size, path))
+
+    entries.sort()
+    total_bytes = sum(size for _, size, _ in entries)
+    while entries and (
+        len(entries) > settings["max_entries"] or total_bytes > settings["max_bytes"]
+    ):
+        _, size, path = entries.pop(0)
+        total_bytes -= size
+        removed += _remove(path)
+
+    if removed:
+        log.info(f"Evicted {removed} cached model(s) from {cache_dir}.")
+    return removed
+
+
+def _remember(key, model, written_at):
+    with _memory_lock:
+        _memory[key] = (model, written_at)
+        _memory.move_to_end(key)
+        while len(_memory) > MEMORY_SLOTS:
+            _memory.popitem(last=False)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+        return 1
+    except OSError:
+        return 0
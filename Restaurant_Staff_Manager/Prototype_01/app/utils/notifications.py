@@ -7,76 +7,159 @@ from flask import (
     render_template,
 )  # Import current_app for config, render_template for HTML body
 import logging  # Optional: for better logging
+import smtplib
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 
 # Configure logger (optional, but good practice)
 log = logging.getLogger(__name__)
 
+# Outcome of one message in a batch dispatch
+DispatchResult = namedtuple("DispatchResult", ["recipient", "ok", "error"])
 
-def send_schedule_update_email(employee, shifts):
+
+def build_schedule_update_message(employee, shifts):
     """
-    Sends an email to an employee with their assigned shifts.
+    Renders the schedule update email for one employee.
 
     Args:
         employee (Employee): The Employee object (must have .name and .email).
-        shifts (list): A list of Shift objects assigned to this employee for the period.
+        shifts (list): Shift-like objects (start_time/end_time) for the period.
 
     Returns:
-        bool: True if email sending was attempted (doesn't guarantee delivery), False on error.
+        Message: The ready-to-send message, or None if it cannot be built.
     """
-    if not (employee and employee.email):
-        log.warning(
-            f"Attempted to send schedule email to employee ID {employee.id if employee else 'N/A'} but email address is missing."
-        )
-        return False
+    # Get sender from app config (set in .env)
+    sender_email = current_app.config["MAIL_DEFAULT_SENDER"]
+    if not sender_email:
+        log.error("MAIL_DEFAULT_SENDER not configured. Cannot send email.")
+        return None
 
-    if not shifts:
-        log.info(
-            f"No shifts to notify for employee {employee.name} ({employee.email}). Email not sent."
+    # Determine date range for subject (find min/max dates in shifts list)
+    if shifts:
+        min_date = min(s.start_time.date() for s in shifts)
+        max_date = max(s.start_time.date() for s in shifts)
+        date_range_str = (
+            f"{min_date.strftime('%b %d')} - {max_date.strftime('%b %d, %Y')}"
         )
-        return True  # Not an error, just nothing to send
-
-    try:
-        # Get sender from app config (set in .env)
-        sender_email = current_app.config["MAIL_DEFAULT_SENDER"]
-        if not sender_email:
-            log.error("MAIL_DEFAULT_SENDER not configured. Cannot send email.")
-            return False
-
-        # Determine date range for subject (find min/max dates in shifts list)
-        if shifts:
-            min_date = min(s.start_time.date() for s in shifts)
-            max_date = max(s.start_time.date() for s in shifts)
-            date_range_str = (
-                f"{min_date.strftime('%b %d')} - {max_date.strftime('%b %d, %Y')}"
-            )
-        else:
-            date_range_str = "Upcoming Period"  # Fallback subject date
+    else:
+        date_range_str = "Upcoming Period"  # Fallback subject date
 
-        subject = f"Your Pozole Schedule: {date_range_str}"
+    subject = f"Your Pozole Schedule: {date_range_str}"
 
-        # Create the email message object
-        msg = Message(subject=subject, sender=sender_email, recipients=[employee.email])
+    # Create the email message object
+    msg = Message(subject=subject, sender=sender_email, recipients=[employee.email])
+
+    # Render the HTML body using the template
+    # Pass employee and shifts objects to the template context
+    msg.html = render_template(
+        "email/schedule_update.html",  # Path to the template
+        employee=employee,
+        shifts=shifts,
+    )
+
+    # Optional: Add a plain text body as fallback
+    # msg.body = f"Hi {employee.name},\n\nYour schedule is attached or viewable online.\n\nThanks."
+    return msg
+
+
+def send_messages(messages, pool_size=None, rate_limit=None):
+    """
+    Sends pre-built messages over a bounded pool of persistent SMTP connections.
+
+    The pool and its connections are opened once for the whole list; a rate
+    limit is enforced inside it by a token bucket shared by all connections.
+
+    Args:
+        messages (list): (key, Message) pairs; the key identifies each result.
+        pool_size (int, optional): Maximum concurrent connections.
+        rate_limit (float, optional): Maximum messages per second overall.
+
+    Returns:
+        dict: key -> DispatchResult(recipient, ok, error).
+    """
+    if not messages:
+        return {}
+
+    app = current_app._get_current_object()
+    pool_size = max(1, min(pool_size or app.config["MAIL_POOL_SIZE"], len(messages)))
+    chunks = [messages[i::pool_size] for i in range(pool_size)]
+
+    log.info(
+        f"Sending {len(messages)} emails over {pool_size} SMTP connection(s)..."
+    )
+    bucket = TokenBucket(rate_limit) if rate_limit else None
+    results = {}
+    with ThreadPoolExecutor(max_workers=pool_size) as executor:
+        for chunk_results in executor.map(
+            lambda chunk: _send_chunk(app, chunk, bucket), chunks
+        ):
+            results.update(chunk_results)
+
+    sent = sum(1 for r in results.values() if r.ok)
+    log.info(f"Batch email dispatch finished: {sent} sent, {len(results) - sent} failed.")
+    return results
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, bursts of up to
+    `rate`. take() blocks until the caller's token is due.
+    """
+
+    def __init__(self, rate):
+        self.rate = float(rate)
+        self.capacity = max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            # Going negative reserves a future token for this caller.
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
 
-        # Render the HTML body using the template
-        # Pass employee and shifts objects to the template context
-        msg.html = render_template(
-            "email/schedule_update.html",  # Path to the template
-            employee=employee,
-            shifts=shifts,
-        )
 
-        # Optional: Add a plain text body as fallback
-        # msg.body = f"Hi {employee.name},\n\nYour schedule is attached or viewable online.\n\nThanks."
-
-        # Send the email
-        log.info(f"Attempting to send schedule email to {employee.email}...")
-        mail.send(msg)
-        log.info(f"Email sent successfully to {employee.email}.")
-        return True
-
-    except Exception as e:
-        log.error(
-            f"Error sending schedule email to {employee.email}: {e}", exc_info=True
-        )  # Log full exception
-        # Consider adding more specific error handling or re-trying logic later
-        return False
+def _send_chunk(app, chunk, bucket=None):
+    """Sends one worker's share of messages, reconnecting once if the server drops us."""
+    results = {}
+    with app.app_context():
+        pending = list(chunk)
+        reconnects_left = 1
+        while pending:
+            try:
+                with mail.connect() as conn:
+                    while pending:
+                        key, msg = pending[0]
+                        recipient = ", ".join(msg.recipients)
+                        if bucket is not None:
+                            bucket.take()
+                        try:
+                            conn.send(msg)
+                            results[key] = DispatchResult(recipient, True, None)
+                        except smtplib.SMTPServerDisconnected:
+                            raise
+                        except Exception as e:
+                            log.error(f"Error sending email to {recipient}: {e}")
+                            results[key] = DispatchResult(recipient, False, str(e))
+                        pending.pop(0)
+            except Exception as e:
+                if isinstance(e, smtplib.SMTPServerDisconnected) and reconnects_left:
+                    reconnects_left -= 1
+                    log.warning(f"SMTP connection dropped ({e}); reconnecting.")
+                    continue
+                log.error(f"SMTP connection failed: {e}")
+                for key, msg in pending:
+                    results[key] = DispatchResult(", ".join(msg.recipients), False, str(e))
+                pending = []
+    return results
@@ -0,0 +1,217 @@
+# app/utils/numpy_forecasters.py
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+SEASON_LENGTH = 7  # daily data, weekly pattern
+# Half-width of the yhat_lower/yhat_upper band in standard deviations; 1.2816
+# gives the same 80% interval Prophet reports by default.
+INTERVAL_Z = 1.2816
+
+# Holt-Winters smoothing parameters tried in one vectorised pass.
+HW_ALPHAS = np.linspace(0.05, 0.95, 19)
+HW_BETAS = np.array([0.0, 0.01, 0.02, 0.05, 0.1])
+HW_GAMMAS = np.array([0.0, 0.05, 0.1, 0.2, 0.3, 0.5])
+
+
+class NumpyForecaster:
+    """
+    Base for the NumPy forecasters.
+
+    Subclasses implement _fit(dates, y, horizon) on a gap-free daily series
+    and return (fitted, future, sigma): in-sample predictions, point
+    forecasts for the next `horizon` days and the forecast standard
+    deviation for each of those days.
+    """
+
+    name = None
+
+    def settings(self):
+        """Everything that changes this forecaster's output, for data_version()."""
+        return {"backend": self.name}
+
+    def forecast(self, df, days_to_predict):
+        """
+        Forecasts `days_to_predict` days past the end of `df`.
+
+        Returns:
+            pandas.DataFrame: ['ds', 'yhat', 'yhat_lower', 'yhat_upper'] for every
+                              history date followed by each future day, like
+                              Prophet's predict() on make_future_dataframe().
+        """
+        history = (
+            df[["ds", "y"]]
+            .assign(ds=pd.to_datetime(df["ds"]).dt.normalize())
+            .groupby("ds", sort=True)["y"]
+            .mean()
+        )
+        dates = pd.date_range(history.index[0], history.index[-1], freq="D")
+        # Missing days are filled by linear interpolation so seasonal lags line up.
+        y = history.reindex(dates).interpolate().to_numpy(dtype=float)
+
+        fitted, future, sigma = self._fit(dates, y, days_to_predict)
+
+        observed = dates.get_indexer(history.index)
+        future_dates = pd.date_range(
+            dates[-1] + pd.Timedelta(days=1), periods=days_to_predict, freq="D"
+        )
+        yhat = np.concatenate([fitted[observed], future])
+        # History rows carry the one-step error band.
+        spread = INTERVAL_Z * np.concatenate(
+            [np.full(len(observed), sigma[0] if len(sigma) else 0.0), sigma]
+        )
+        return pd.DataFrame(
+            {
+                "ds": history.index.append(future_dates),
+                "yhat": yhat,
+                "yhat_lower": yhat - spread,
+                "yhat_upper": yhat + spread,
+            }
+        )
+
+    def _fit(self, dates, y, horizon):
+        raise NotImplementedError
+
+
+def _season_length(n):
+    """Weekly seasonality needs at least two full weeks of data."""
+    return SEASON_LENGTH if n >= 2 * SEASON_LENGTH else 1
+
+
+def _residual_sigma(residuals):
+    residuals = residuals[np.isfinite(residuals)]
+    if len(residuals) < 2:
+        return 0.0
+    return float(np.sqrt(np.mean(residuals**2)))
+
+
+class SeasonalNaive(NumpyForecaster):
+    """Each day is forecast as the same weekday one week earlier."""
+
+    name = "seasonal_naive"
+
+    def _fit(self, dates, y, horizon):
+        m = _season_length(len(y))
+        fitted = y.copy()
+        fitted[m:] = y[:-m]
+        sigma1 = _residual_sigma(y[m:] - y[:-m])
+
+        steps = np.arange(horizon)
+        last_season = y[-m:]
+        future = last_season[steps % m]
+        # Every further season repeats the same value, so the error adds up once per season.
+        sigma = sigma1 * np.sqrt(steps // m + 1)
+        return fitted, future, sigma
+
+
+class HoltWinters(NumpyForecaster):
+    """
+    Additive Holt-Winters (level, trend, weekly season) in error-correction form.
+
+    Every (alpha, beta, gamma) combination of the grid is run at once: the
+    states are arrays with one column per candidate, so the recursion is one
+    loop over days and the candidate with the lowest one-step squared error
+    is kept.
+    """
+
+    name = "holt_winters"
+
+    def settings(self):
+        return {
+            "backend": self.name,
+            "alphas": HW_ALPHAS.tolist(),
+            "betas": HW_BETAS.tolist(),
+            "gammas": HW_GAMMAS.tolist(),
+        }
+
+    def _fit(self, dates, y, horizon):
+        n = len(y)
+        m = _season_length(n)
+        alpha, beta, gamma = (
+            g.ravel() for g in np.meshgrid(HW_ALPHAS, HW_BETAS, HW_GAMMAS)
+        )
+        # Keep the usual admissible region: beta <= alpha, gamma <= 1 - alpha.
+        keep = (beta <= alpha) & (gamma <= 1 - alpha)
+        if m == 1:
+            keep &= gamma == 0
+        alpha, beta, gamma = alpha[keep], beta[keep], gamma[keep]
+        k = len(alpha)
+
+        # Initial states from the first one or two seasons.
+        first = y[:m]
+        level = np.full(k, first.mean())
+        if n >= 2 * m and m > 1:
+            trend = np.full(k, (y[m : 2 * m].mean() - first.mean()) / m)
+        else:
+            trend = np.full(k, (y[1] - y[0]) if n > 1 else 0.0)
+        season = np.tile(first - first.mean(), (k, 1))  # shape (k, m)
+
+        fitted = np.empty((n, k))
+        for t in range(n):
+            s = season[:, t % m]
+            fitted[t] = level + trend + s
+            error = y[t] - fitted[t]
+            level = level + trend + alpha * error
+            trend = trend + beta * error
+            season[:, t % m] = s + gamma * error
+
+        errors = y[:, None] - fitted
+        sse = (errors[m:] ** 2).sum(axis=0)
+        best = int(np.argmin(sse))
+        a, b, g = alpha[best], beta[best], gamma[best]
+        log.info(f"Holt-Winters picked alpha={a:.2f} beta={b:.2f} gamma={g:.2f}.")
+
+        steps = np.arange(1, horizon + 1)
+        future = (
+            level[best] + steps * trend[best] + season[best, (n + steps - 1) % m]
+        )
+        # Var(h) = sigma^2 * (1 + sum_{j<h} c_j^2), c_j = alpha + j*beta + gamma*[m | j]
+        j = np.arange(1, horizon)
+        c = a + j * b + g * (j % m == 0)
+        growth = np.concatenate([[1.0], 1.0 + np.cumsum(c**2)])
+        sigma1 = _residual_sigma(errors[m:, best])
+        return fitted[:, best], future, sigma1 * np.sqrt(growth[:horizon])
+
+
+class WeeklyRegression(NumpyForecaster):
+    """
+    Least squares on a linear trend plus day-of-week effects.
+
+    The design matrix holds an intercept, the day number and one dummy per
+    weekday (Monday is the baseline); the bands include the uncertainty of
+    the fitted coefficients.
+    """
+
+    name = "weekly_regression"
+
+    def _fit(self, dates, y, horizon):
+        n = len(y)
+        weekly = n >= 2 * SEASON_LENGTH
+        all_dates = dates.append(
+            pd.date_range(dates[-1] + pd.Timedelta(days=1), periods=horizon, freq="D")
+        )
+        X = self._design(all_dates, weekly)
+        X_hist, X_future = X[:n], X[n:]
+
+        coef, _, rank, _ = np.linalg.lstsq(X_hist, y, rcond=None)
+        fitted = X_hist @ coef
+        dof = max(n - rank, 1)
+        sigma1 = float(np.sqrt(((y - fitted) ** 2).sum() / dof))
+
+        # Prediction variance: sigma^2 * (1 + x (X'X)^-1 x') for each future row.
+        xtx_inv = np.linalg.pinv(X_hist.T @ X_hist)
+        leverage = np.einsum("ij,jk,ik->i", X_future, xtx_inv, X_future)
+        return fitted, X_future @ coef, sigma1 * np.sqrt(1.0 + leverage)
+
+    @staticmethod
+    def _design(dates, weekly):
+        t = np.arange(len(dates), dtype=float)
+        columns = [np.ones_like(t), t]
+        if weekly:
+            weekday = dates.dayofweek.to_numpy()
+            columns += [(weekday == d).astype(float) for d in range(1, SEASON_LENGTH)]
+        return np.column_stack(columns)
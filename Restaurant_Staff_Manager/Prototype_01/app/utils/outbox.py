@@ -0,0 +1,222 @@
+# app/utils/outbox.py
+
+import datetime
+from datetime import timedelta
+import logging
+import threading
+import time
+import uuid
+
+from flask import current_app
+from flask_mail import Message
+from sqlalchemy import update
+
+from app import db
+from app.models import NotificationOutbox
+from .notifications import send_messages
+
+log = logging.getLogger(__name__)
+
+# Wakes the in-process dispatch thread started by dispatch_soon().
+_wake = threading.Event()
+_kicker = None
+_kicker_lock = threading.Lock()
+
+
+def enqueue(msg, employee_id=None):
+    """
+    Adds outbox rows for a built Message to the current session.
+
+    Nothing is committed here: the caller commits the rows together with the
+    data the email is about, so either both are saved or neither is.
+    """
+    rows = [
+        NotificationOutbox(
+            employee_id=employee_id,
+            sender=msg.sender,
+            recipient=recipient,
+            subject=msg.subject,
+            html=msg.html,
+        )
+        for recipient in msg.recipients
+    ]
+    db.session.add_all(rows)
+    return rows
+
+
+def dispatch_pending(limit=None):
+    """
+    Sends due outbox emails once, honouring the configured rate limit.
+
+    Rows are claimed with a conditional UPDATE first, so several dispatchers
+    (or gunicorn workers) can run at the same time without double-sending.
+
+    Returns:
+        dict: Counts of 'sent', 'retry' and 'dead' messages.
+    """
+    cfg = current_app.config
+    limit = limit or cfg["OUTBOX_BATCH_SIZE"]
+    counts = {"sent": 0, "retry": 0, "dead": 0}
+
+    _release_stale_claims()
+    rows = _claim(limit)
+    if not rows:
+        return counts
+
+    log.info(f"Dispatching {len(rows)} outbox email(s)...")
+    by_id = {row.id: row for row in rows}
+    messages = [
+        (
+            row.id,
+            Message(
+                subject=row.subject,
+                sender=row.sender,
+                recipients=[row.recipient],
+                html=row.html,
+            ),
+        )
+        for row in rows
+    ]
+
+    # One pool of SMTP connections for the whole batch, throttled inside it.
+    results = send_messages(messages, rate_limit=cfg["OUTBOX_RATE_LIMIT"])
+    for outbox_id, result in results.items():
+        outcome = _record_result(by_id[outbox_id], result)
+        counts[outcome] += 1
+    db.session.commit()
+
+    log.info(
+        f"Outbox dispatch finished: {counts['sent']} sent, {counts['retry']} to retry, {counts['dead']} dead-lettered."
+    )
+    return counts
+
+
+def dispatch_soon(app):
+    """
+    Asks for a dispatch pass on this process's background dispatch thread and
+    returns at once, so callers never wait on SMTP or the rate limit. The
+    outbox service still delivers anything this process does not get to.
+    """
+    global _kicker
+    _wake.set()
+    with _kicker_lock:
+        if _kicker is None or not _kicker.is_alive():
+            _kicker = threading.Thread(
+                target=_kicker_loop, args=(app,), name="outbox-dispatch", daemon=True
+            )
+            _kicker.start()
+
+
+def _kicker_loop(app):
+    while True:
+        _wake.wait()
+        _wake.clear()
+        with app.app_context():
+            try:
+                dispatch_pending()
+            except Exception as e:
+                db.session.rollback()
+                log.error(f"Background outbox dispatch failed: {e}", exc_info=True)
+            finally:
+                db.session.remove()
+
+
+def run_dispatcher(once=False):
+    """Drains the outbox forever (or once), sleeping OUTBOX_POLL_INTERVAL when idle."""
+    poll_interval = current_app.config["OUTBOX_POLL_INTERVAL"]
+    log.info("Outbox dispatcher started.")
+    while True:
+        try:
+            counts = dispatch_pending()
+        except Exception as e:
+            db.session.rollback()
+            log.error(f"Outbox dispatch failed: {e}", exc_info=True)
+            counts = {}
+        if once:
+            return counts
+        if not any(counts.values()):
+            time.sleep(poll_interval)
+
+
+def _claim(limit):
+    now = datetime.datetime.utcnow()
+    token = uuid.uuid4().hex
+    due_ids = db.session.scalars(
+        db.select(NotificationOutbox.id)
+        .where(
+            NotificationOutbox.status == "pending",
+            NotificationOutbox.next_attempt_at <= now,
+        )
+        .order_by(NotificationOutbox.next_attempt_at, NotificationOutbox.id)
+        .limit(limit)
+    ).all()
+    if not due_ids:
+        db.session.commit()
+        return []
+
+    db.session.execute(
+        update(NotificationOutbox)
+        .where(
+            NotificationOutbox.id.in_(due_ids),
+            NotificationOutbox.status == "pending",
+        )
+        .values(status="sending", claim_token=token, claimed_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+    return db.session.scalars(
+        db.select(NotificationOutbox)
+        .where(NotificationOutbox.claim_token == token)
+        .order_by(NotificationOutbox.id)
+    ).all()
+
+
+def _release_stale_claims():
+    """Returns rows claimed by a dispatcher that died mid-send to the queue."""
+    timeout = current_app.config["OUTBOX_CLAIM_TIMEOUT"]
+    stale_before = datetime.datetime.utcnow() - timedelta(seconds=timeout)
+    released = db.session.execute(
+        update(NotificationOutbox)
+        .where(
+            NotificationOutbox.status == "sending",
+            NotificationOutbox.claimed_at < stale_before,
+        )
+        .values(status="pending", claim_token=None, claimed_at=None)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    if released:
+        log.warning(f"Released {released} stale outbox claim(s).")
+
+
+def _record_result(row, result):
+    cfg = current_app.config
+    now = datetime.datetime.utcnow()
+    row.claim_token = None
+    row.claimed_at = None
+    row.attempts += 1
+
+    if result.ok:
+        row.status = "sent"
+        row.sent_at = now
+        row.last_error = None
+        return "sent"
+
+    row.last_error = result.error
+    if row.attempts >= cfg["OUTBOX_MAX_ATTEMPTS"]:
+        row.status = "dead"
+        log.error(
+            f"Outbox email {row.id} to {row.recipient} dead-lettered after {row.attempts} attempts: {result.error}"
+        )
+        return "dead"
+
+    delay = min(
+        cfg["OUTBOX_BACKOFF_BASE"] * 2 ** (row.attempts - 1), cfg["OUTBOX_BACKOFF_MAX"]
+    )
+    row.status = "pending"
+    row.next_attempt_at = now + timedelta(seconds=delay)
+    log.warning(
+        f"Outbox email {row.id} to {row.recipient} failed (attempt {row.attempts}); retrying in {delay}s."
+    )
+    return "retry"
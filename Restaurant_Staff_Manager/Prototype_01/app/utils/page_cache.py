@@ -0,0 +1,136 @@
+# app/utils/page_cache.py
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from flask import Response, current_app, request
+
+log = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    """
+    In-process LRU of rendered pages. Each gunicorn worker has its own.
+    Entries also expire after their ttl, like in the Redis backend.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisBackend:
+    """Pages shared by all workers in Redis (or any Redis-protocol server)."""
+
+    def __init__(self, url, prefix="page:"):
+        import redis
+
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        try:
+            value = self._client.get(self.prefix + key)
+        except Exception as e:
+            log.warning(f"Page cache read failed: {e}")
+            return None
+        return value.decode("utf-8") if value is not None else None
+
+    def set(self, key, value, ttl=None):
+        try:
+            self._client.set(self.prefix + key, value.encode("utf-8"), ex=ttl)
+        except Exception as e:
+            log.warning(f"Page cache write failed: {e}")
+
+    def clear(self):
+        try:
+            keys = list(self._client.scan_iter(match=self.prefix + "*"))
+            if keys:
+                self._client.delete(*keys)
+        except Exception as e:
+            log.warning(f"Page cache clear failed: {e}")
+
+
+def get_backend():
+    """The app's cache backend per PAGE_CACHE_BACKEND, or None when disabled."""
+    app = current_app._get_current_object()
+    if "page_cache" not in app.extensions:
+        app.extensions["page_cache"] = _create_backend(app.config)
+    return app.extensions["page_cache"]
+
+
+def _create_backend(cfg):
+    kind = (cfg["PAGE_CACHE_BACKEND"] or "none").lower()
+    if kind == "memory":
+        return MemoryBackend(cfg["PAGE_CACHE_MAX_ENTRIES"])
+    if kind == "redis":
+        try:
+            backend = RedisBackend(cfg["PAGE_CACHE_URL"])
+            log.info(f"Page cache using Redis at {cfg['PAGE_CACHE_URL']}.")
+            return backend
+        except ImportError:
+            log.warning(
+                "PAGE_CACHE_BACKEND=redis but the redis package is not installed; using the in-process cache."
+            )
+            return MemoryBackend(cfg["PAGE_CACHE_MAX_ENTRIES"])
+    if kind != "none":
+        log.warning(f"Unknown PAGE_CACHE_BACKEND '{kind}'; page cache disabled.")
+    return None
+
+
+def get(key):
+    backend = get_backend()
+    return backend.get(key) if backend is not None else None
+
+
+def store(key, html):
+    backend = get_backend()
+    if backend is not None:
+        backend.set(key, html, ttl=current_app.config["PAGE_CACHE_TTL"])
+
+
+def clear():
+    backend = get_backend()
+    if backend is not None:
+        backend.clear()
+
+
+def respond(html, key, last_modified=None):
+    """
+    Wraps a rendered page with validators for the cache key, answering
+    If-None-Match / If-Modified-Since with 304 Not Modified.
+    """
+    response = Response(html, mimetype="text/html")
+    response.set_etag(key)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Browsers may keep the page but must revalidate before showing it.
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
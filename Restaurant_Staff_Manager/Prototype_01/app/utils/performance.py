@@ -0,0 +1,112 @@
+# app/utils/performance.py
+
+import datetime
+import logging
+
+from sqlalchemy import func
+
+from app import db
+from app.models import PerformanceLog, PerformanceSummary
+
+log = logging.getLogger(__name__)
+
+# Logs averaged for the rolling rating (one log per month, so ~a quarter).
+ROLLING_WINDOW = 3
+# Logs used for the trend line (~a year).
+TREND_WINDOW = 12
+
+
+def refresh_summaries(employee_ids):
+    """
+    Recomputes PerformanceSummary rows for the given employees in the current
+    session; the caller commits them together with the logs that changed.
+
+    Each employee costs one aggregate query and one query for their most
+    recent TREND_WINDOW logs, however long their history is.
+    """
+    employee_ids = sorted(set(employee_ids))
+    if not employee_ids:
+        return 0
+
+    # Pending log inserts must be visible to the queries below.
+    db.session.flush()
+    totals = {
+        emp_id: (count, avg)
+        for emp_id, count, avg in db.session.execute(
+            db.select(
+                PerformanceLog.employee_id,
+                func.count(PerformanceLog.id),
+                func.avg(PerformanceLog.rating),
+            )
+            .where(PerformanceLog.employee_id.in_(employee_ids))
+            .group_by(PerformanceLog.employee_id)
+        )
+    }
+    existing = {
+        summary.employee_id: summary
+        for summary in db.session.scalars(
+            db.select(PerformanceSummary).where(
+                PerformanceSummary.employee_id.in_(employee_ids)
+            )
+        )
+    }
+
+    now = datetime.datetime.utcnow()
+    for emp_id in employee_ids:
+        count, avg = totals.get(emp_id, (0, None))
+        summary = existing.get(emp_id)
+        if count == 0:
+            if summary is not None:
+                db.session.delete(summary)
+            continue
+        if summary is None:
+            summary = PerformanceSummary(employee_id=emp_id)
+            db.session.add(summary)
+
+        recent = db.session.execute(
+            db.select(PerformanceLog.log_date, PerformanceLog.rating)
+            .where(PerformanceLog.employee_id == emp_id)
+            .order_by(PerformanceLog.log_date.desc(), PerformanceLog.id.desc())
+            .limit(TREND_WINDOW)
+        ).all()
+        rated = [(day, rating) for day, rating in recent if rating is not None]
+
+        summary.log_count = count
+        summary.avg_rating = float(avg) if avg is not None else None
+        summary.last_log_date = recent[0].log_date
+        summary.last_rating = recent[0].rating
+        window = [rating for _, rating in rated[:ROLLING_WINDOW]]
+        summary.rolling_avg_rating = sum(window) / len(window) if window else None
+        summary.trend_slope = _monthly_slope(rated)
+        summary.updated_at = now
+
+    log.info(f"Refreshed performance summaries for {len(employee_ids)} employee(s).")
+    return len(employee_ids)
+
+
+def rebuild_all(batch_size=200):
+    """Recomputes every summary, e.g. after upgrading or a manual data fix."""
+    employee_ids = set(
+        db.session.scalars(db.select(PerformanceLog.employee_id).distinct())
+    )
+    # Summaries whose logs are all gone are removed by refresh_summaries().
+    employee_ids.update(db.session.scalars(db.select(PerformanceSummary.employee_id)))
+    employee_ids = sorted(employee_ids)
+    for i in range(0, len(employee_ids), batch_size):
+        refresh_summaries(employee_ids[i : i + batch_size])
+        db.session.commit()
+    return len(employee_ids)
+
+
+def _monthly_slope(rated):
+    """Least-squares slope of rating over months; None with fewer than 2 points."""
+    if len(rated) < 2:
+        return None
+    xs = [day.year * 12 + day.month + (day.day - 1) / 31 for day, _ in rated]
+    ys = [rating for _, rating in rated]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    if var_x == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var_x
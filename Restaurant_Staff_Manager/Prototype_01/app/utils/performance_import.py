@@ -0,0 +1,201 @@
+# app/utils/performance_import.py
+
+import csv
+import datetime
+import io
+import logging
+from collections import namedtuple
+
+from sqlalchemy import insert, tuple_
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import Employee, PerformanceLog
+from . import performance
+
+log = logging.getLogger(__name__)
+
+REQUIRED_COLUMNS = {"employee", "log_date"}
+RATING_RANGE = (1.0, 5.0)  # same bounds as PerformanceLogForm
+# Rows per set-based duplicate check / insert statement.
+BATCH_SIZE = 500
+
+RowError = namedtuple("RowError", ["line", "employee", "message"])
+ImportReport = namedtuple("ImportReport", ["total_rows", "inserted", "errors"])
+
+
+def import_performance_csv(file_storage):
+    """
+    Imports performance logs from an uploaded CSV file.
+
+    Columns: employee (name or email), log_date (YYYY-MM-DD), rating
+    (optional, 1-5) and notes (optional). The file is read row by row;
+    employees are resolved from one lookup map, the "one log per employee per
+    month" rule is checked with one query per BATCH_SIZE rows, and valid rows
+    are written with batched inserts in a single transaction.
+
+    Args:
+        file_storage: The uploaded file (werkzeug FileStorage).
+
+    Returns:
+        ImportReport: Row count, number inserted and a RowError per rejected row.
+    """
+    text = io.TextIOWrapper(file_storage.stream, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    columns = {c.strip().lower() for c in (reader.fieldnames or [])}
+    missing = REQUIRED_COLUMNS - columns
+    if missing:
+        return ImportReport(
+            0,
+            0,
+            [RowError(1, "", f"Missing column(s): {', '.join(sorted(missing))}.")],
+        )
+
+    try:
+        total, inserted, errors, affected = _import_rows(reader)
+        performance.refresh_summaries(affected)
+        db.session.commit()
+    except IntegrityError as e:
+        # A log for one of these months was added while we were importing.
+        db.session.rollback()
+        log.error(f"Performance import aborted by a concurrent change: {e}")
+        return ImportReport(
+            0,
+            0,
+            [
+                RowError(
+                    0,
+                    "",
+                    "Another change added conflicting logs during the import; nothing was saved. Please upload again.",
+                )
+            ],
+        )
+
+    errors.sort(key=lambda e: e.line)
+    log.info(
+        f"Performance import: {total} rows, {inserted} inserted, {len(errors)} rejected."
+    )
+    return ImportReport(total, inserted, errors)
+
+
+def _import_rows(reader):
+    """Validates and inserts all rows (uncommitted). Returns (total, inserted, errors, affected ids)."""
+    employees = _employee_lookup()
+    errors = []
+    seen = set()  # (employee_id, log_month) already taken within the file
+    pending = []
+    total = 0
+    inserted = 0
+    affected = set()
+
+    for line, raw in enumerate(reader, start=2):
+        total += 1
+        row = {
+            (k or "").strip().lower(): (v or "").strip()
+            for k, v in raw.items()
+            if k is not None
+        }
+        record, error = _validate(row, employees)
+        if error:
+            errors.append(RowError(line, row.get("employee", ""), error))
+            continue
+        key = (record["employee_id"], record["log_month"])
+        if key in seen:
+            errors.append(
+                RowError(
+                    line,
+                    row["employee"],
+                    "Duplicate of an earlier row for the same employee and month.",
+                )
+            )
+            continue
+        seen.add(key)
+        pending.append((line, row["employee"], record))
+
+        if len(pending) >= BATCH_SIZE:
+            inserted += _flush_batch(pending, errors, affected)
+            pending = []
+
+    if pending:
+        inserted += _flush_batch(pending, errors, affected)
+    return total, inserted, errors, affected
+
+
+def _employee_lookup():
+    """Maps lower-cased names and emails to employee ids with one query."""
+    lookup = {}
+    for emp_id, name, email in db.session.execute(
+        db.select(Employee.id, Employee.name, Employee.email)
+    ):
+        if name:
+            lookup[name.lower()] = emp_id
+        if email:
+            lookup[email.lower()] = emp_id
+    return lookup
+
+
+def _validate(row, employees):
+    """Returns (record dict, None) or (None, error message) for one CSV row."""
+    employee = row.get("employee", "")
+    if not employee:
+        return None, "Employee is required."
+    employee_id = employees.get(employee.lower())
+    if employee_id is None:
+        return None, f"Unknown employee '{employee}'."
+
+    try:
+        log_date = datetime.date.fromisoformat(row.get("log_date", ""))
+    except ValueError:
+        return None, f"Invalid log_date '{row.get('log_date', '')}'; use YYYY-MM-DD."
+
+    rating = None
+    if row.get("rating"):
+        try:
+            rating = float(row["rating"])
+        except ValueError:
+            return None, f"Invalid rating '{row['rating']}'."
+        if not RATING_RANGE[0] <= rating <= RATING_RANGE[1]:
+            return None, "Rating must be between 1 and 5."
+
+    return {
+        "employee_id": employee_id,
+        "log_date": log_date,
+        "log_month": log_date.replace(day=1),
+        "rating": rating,
+        "notes": row.get("notes") or None,
+        "recorded_at": datetime.datetime.utcnow(),
+    }, None
+
+
+def _flush_batch(pending, errors, affected):
+    """
+    Drops rows whose employee already has a log that month (one set-based
+    query), then inserts the rest with one executemany. Returns rows inserted.
+    """
+    keys = [(r["employee_id"], r["log_month"]) for _, _, r in pending]
+    taken = {
+        tuple(row)
+        for row in db.session.execute(
+            db.select(PerformanceLog.employee_id, PerformanceLog.log_month).where(
+                tuple_(PerformanceLog.employee_id, PerformanceLog.log_month).in_(keys)
+            )
+        )
+    }
+
+    rows = []
+    for line, employee, record in pending:
+        if (record["employee_id"], record["log_month"]) in taken:
+            errors.append(
+                RowError(
+                    line,
+                    employee,
+                    f"A performance log already exists for {record['log_month'].strftime('%B %Y')}.",
+                )
+            )
+            continue
+        rows.append(record)
+        affected.add(record["employee_id"])
+
+    if rows:
+        db.session.execute(insert(PerformanceLog), rows)
+    return len(rows)
@@ -0,0 +1,263 @@
+# app/utils/roster_import.py
+
+import csv
+import io
+import json
+import logging
+from collections import namedtuple
+
+from email_validator import EmailNotValidError, validate_email
+from sqlalchemy import func, insert, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import Employee
+from . import schedule_version
+
+log = logging.getLogger(__name__)
+
+# Rows per INSERT ... ON CONFLICT statement.
+BATCH_SIZE = 500
+
+RosterConflict = namedtuple("RosterConflict", ["line", "email", "message"])
+RosterReport = namedtuple(
+    "RosterReport", ["total_rows", "created", "updated", "conflicts"]
+)
+
+
+def read_roster_file(file_storage):
+    """
+    Yields (line, record) pairs from an uploaded .csv or .json roster.
+
+    JSON may be a list of objects or {"employees": [...]}; its "line" is the
+    1-based item number. CSV lines are counted with the header as line 1.
+    """
+    filename = (file_storage.filename or "").lower()
+    if filename.endswith(".json"):
+        return iter_json_records(json.load(file_storage.stream))
+    text = io.TextIOWrapper(file_storage.stream, encoding="utf-8-sig", newline="")
+    return (
+        (line, {(k or "").strip().lower(): v for k, v in row.items()})
+        for line, row in enumerate(csv.DictReader(text), start=2)
+    )
+
+
+def iter_json_records(payload):
+    """Yields (item number, record) from a parsed JSON roster payload."""
+    if isinstance(payload, dict):
+        payload = payload.get("employees")
+    if not isinstance(payload, list):
+        raise ValueError('Expected a list of employees or {"employees": [...]}.')
+    for number, item in enumerate(payload, start=1):
+        yield number, item if isinstance(item, dict) else {}
+
+
+def import_roster(records):
+    """
+    Creates or updates employees, matched by email.
+
+    All existing names and emails are prefetched once; every row is checked
+    against them and against the rest of the upload in memory. Rows that
+    pass are written with INSERT ... ON CONFLICT (email) DO UPDATE in
+    batches, all in one transaction.
+
+    Args:
+        records: Iterable of (line, dict) with name, position, email and
+                 optional hourly_rate.
+
+    Returns:
+        RosterReport: Counts of created and updated employees, and a
+                      RosterConflict for every rejected row.
+    """
+    id_by_email, id_by_name, email_by_id = _prefetch()
+    conflicts = []
+    upserts = []
+    seen_emails = {}
+    seen_names = {}
+    total = 0
+    created = 0
+
+    for line, raw in records:
+        total += 1
+        record, error = _validate(raw)
+        email = record["email"] if record else str(raw.get("email") or "").strip()
+        if error:
+            conflicts.append(RosterConflict(line, email, error))
+            continue
+
+        key = email.lower()
+        name_key = record["name"].lower()
+        if key in seen_emails:
+            conflicts.append(
+                RosterConflict(
+                    line, email, f"Email also used on line {seen_emails[key]}."
+                )
+            )
+            continue
+        if name_key in seen_names:
+            conflicts.append(
+                RosterConflict(
+                    line,
+                    email,
+                    f"Name \"{record['name']}\" also used on line {seen_names[name_key]}.",
+                )
+            )
+            continue
+        existing_id = id_by_email.get(key)
+        name_owner = id_by_name.get(name_key)
+        if name_owner is not None and name_owner != existing_id:
+            conflicts.append(
+                RosterConflict(
+                    line,
+                    email,
+                    f"Name \"{record['name']}\" is already used by another employee.",
+                )
+            )
+            continue
+
+        seen_emails[key] = line
+        seen_names[name_key] = line
+        if existing_id is None:
+            created += 1
+        else:
+            # Keep the stored spelling so the unique email index still matches.
+            record["email"] = email_by_id[existing_id]
+        upserts.append(record)
+
+    try:
+        if upserts:
+            # Names feed the calendar exports.
+            schedule_version.bump()
+        for i in range(0, len(upserts), BATCH_SIZE):
+            _upsert(upserts[i : i + BATCH_SIZE])
+        db.session.commit()
+        if upserts:
+            schedule_version.invalidate()
+    except IntegrityError as e:
+        db.session.rollback()
+        log.error(f"Roster import aborted by a concurrent change: {e}")
+        return RosterReport(
+            total,
+            0,
+            0,
+            [
+                RosterConflict(
+                    0,
+                    "",
+                    "Another change added a conflicting employee during the import; nothing was saved. Please upload again.",
+                )
+            ],
+        )
+
+    conflicts.sort(key=lambda c: c.line)
+    updated = len(upserts) - created
+    log.info(
+        f"Roster import: {total} rows, {created} created, {updated} updated, {len(conflicts)} conflicts."
+    )
+    return RosterReport(total, created, updated, conflicts)
+
+
+def _prefetch():
+    """
+    One query for every employee. Returns id by lower-cased email, id by
+    lower-cased name, and the stored email by id.
+    """
+    id_by_email, id_by_name, email_by_id = {}, {}, {}
+    for emp_id, name, email in db.session.execute(
+        db.select(Employee.id, Employee.name, Employee.email)
+    ):
+        if email:
+            id_by_email[email.lower()] = emp_id
+            email_by_id[emp_id] = email
+        if name:
+            id_by_name[name.lower()] = emp_id
+    return id_by_email, id_by_name, email_by_id
+
+
+def _validate(raw):
+    """Returns (record, None) or (None, message) for one roster entry."""
+    name = str(raw.get("name") or "").strip()
+    position = str(raw.get("position") or "").strip()
+    email = str(raw.get("email") or "").strip()
+    rate = raw.get("hourly_rate")
+
+    if not name:
+        return None, "Name is required."
+    if not position:
+        return None, "Position is required."
+    if not email:
+        return None, "Email is required."
+    try:
+        validate_email(email, check_deliverability=False)
+    except EmailNotValidError as e:
+        return None, f"Invalid email: {e}"
+
+    hourly_rate = None
+    if rate not in (None, ""):
+        try:
+            hourly_rate = float(rate)
+        except (TypeError, ValueError):
+            return None, f"Invalid hourly_rate '{rate}'."
+        if hourly_rate < 0:
+            return None, "Hourly rate cannot be negative."
+
+    return {
+        "name": name,
+        "position": position,
+        "email": email,
+        "hourly_rate": hourly_rate,
+    }, None
+
+
+def _upsert(rows):
+    """
+    Writes one batch with the dialect's native upsert. A blank hourly_rate
+    keeps the employee's current rate.
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        module = postgresql if dialect == "postgresql" else sqlite
+        stmt = module.insert(Employee).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Employee.email],
+            set_={
+                "name": stmt.excluded.name,
+                "position": stmt.excluded.position,
+                "hourly_rate": func.coalesce(
+                    stmt.excluded.hourly_rate, Employee.hourly_rate
+                ),
+            },
+        )
+    elif dialect in ("mysql", "mariadb"):
+        stmt = mysql.insert(Employee).values(rows)
+        stmt = stmt.on_duplicate_key_update(
+            name=stmt.inserted.name,
+            position=stmt.inserted.position,
+            hourly_rate=func.coalesce(stmt.inserted.hourly_rate, Employee.hourly_rate),
+        )
+    else:
+        _upsert_generic(rows)
+        return
+    db.session.execute(stmt)
+
+
+def _upsert_generic(rows):
+    """Fallback for other databases: one executemany insert and one update."""
+    existing = dict(
+        db.session.execute(
+            db.select(Employee.email, Employee.id).where(
+                Employee.email.in_([r["email"] for r in rows])
+            )
+        ).all()
+    )
+    new_rows = [r for r in rows if r["email"] not in existing]
+    changed = [
+        {k: v for k, v in dict(r, id=existing[r["email"]]).items() if v is not None}
+        for r in rows
+        if r["email"] in existing
+    ]
+    if new_rows:
+        db.session.execute(insert(Employee), new_rows)
+    if changed:
+        db.session.execute(update(Employee), changed)
@@ -0,0 +1,198 @@
+# app/utils/sales_history.py
+
+import datetime
+import logging
+from collections import namedtuple
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+from flask import current_app
+from sqlalchemy import func, insert, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+from app import db
+from app.models import SalesHistory, SalesHistoryVersion
+
+log = logging.getLogger(__name__)
+
+DEFAULT_LOCATION = "default"
+# Rows per INSERT statement during ingest.
+BATCH_SIZE = 1000
+
+IngestReport = namedtuple("IngestReport", ["rows", "inserted", "skipped"])
+
+
+def read_csv(path):
+    """
+    Reads a sales CSV with fixed dtypes: only the ds and y columns are parsed,
+    ds as ISO dates/datetimes and y as float64. Rows where either is missing
+    or unparseable are dropped.
+
+    Returns:
+        (pandas.DataFrame, int): The ['ds', 'y'] frame and the number of
+                                 rows dropped.
+    """
+    df = pd.read_csv(
+        path, usecols=["ds", "y"], dtype={"ds": "string", "y": "string"}
+    )
+    df["ds"] = pd.to_datetime(df["ds"], format="ISO8601", errors="coerce")
+    df["y"] = pd.to_numeric(df["y"], errors="coerce").astype("float64")
+    valid = df["ds"].notna() & df["y"].notna()
+    return df[valid].reset_index(drop=True), int((~valid).sum())
+
+
+def ingest(df, location=DEFAULT_LOCATION):
+    """
+    Appends sales rows for one location and commits.
+
+    The store is append-only: rows for a (location, ds) already stored, or
+    repeated within the file, are skipped rather than overwritten. When rows
+    were added, the location's SalesHistoryVersion is bumped in the same
+    commit.
+
+    Args:
+        df (pandas.DataFrame): Columns ['ds', 'y'] as returned by read_csv().
+        location (str): Store/location key.
+
+    Returns:
+        IngestReport: Rows offered, inserted and skipped.
+    """
+    total = len(df)
+    df = df.drop_duplicates(subset="ds", keep="first").sort_values("ds")
+    now = datetime.datetime.utcnow()
+    rows = [
+        {
+            "location": location,
+            "ds": ds.to_pydatetime(),
+            "y": float(y),
+            "ingested_at": now,
+        }
+        for ds, y in zip(df["ds"], df["y"])
+    ]
+
+    inserted = 0
+    for i in range(0, len(rows), BATCH_SIZE):
+        inserted += _insert_new(rows[i : i + BATCH_SIZE])
+    if inserted:
+        _bump_version(location)
+    db.session.commit()
+
+    log.info(
+        f"Ingested sales for '{location}': {total} rows, {inserted} new, {total - inserted} already stored."
+    )
+    return IngestReport(total, inserted, total - inserted)
+
+
+def _insert_new(rows):
+    """Inserts one batch, ignoring rows whose (location, ds) exists. Returns rows inserted."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        module = postgresql if dialect == "postgresql" else sqlite
+        stmt = module.insert(SalesHistory).values(rows).on_conflict_do_nothing(
+            index_elements=[SalesHistory.location, SalesHistory.ds]
+        )
+        return db.session.execute(stmt).rowcount
+    if dialect in ("mysql", "mariadb"):
+        stmt = mysql.insert(SalesHistory).values(rows).prefix_with("IGNORE")
+        return db.session.execute(stmt).rowcount
+
+    existing = set(
+        db.session.scalars(
+            db.select(SalesHistory.ds).where(
+                SalesHistory.location == rows[0]["location"],
+                SalesHistory.ds.between(rows[0]["ds"], rows[-1]["ds"]),
+            )
+        )
+    )
+    new_rows = [r for r in rows if r["ds"] not in existing]
+    if new_rows:
+        db.session.execute(insert(SalesHistory), new_rows)
+    return len(new_rows)
+
+
+def _bump_version(location):
+    """Increments the location's revision and refreshes its newest ds (pending until commit)."""
+    now = datetime.datetime.utcnow()
+    newest = latest(location)
+    bumped = db.session.execute(
+        update(SalesHistoryVersion)
+        .where(SalesHistoryVersion.location == location)
+        .values(
+            revision=SalesHistoryVersion.revision + 1,
+            newest_ds=newest,
+            updated_at=now,
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not bumped:
+        db.session.add(
+            SalesHistoryVersion(
+                location=location, revision=1, newest_ds=newest, updated_at=now
+            )
+        )
+
+
+def version(location=None):
+    """
+    The location's SalesHistoryVersion, or None if nothing was ingested since
+    versions were introduced. A single primary-key read.
+    """
+    location = location or current_app.config["SALES_HISTORY_LOCATION"]
+    return db.session.get(SalesHistoryVersion, location)
+
+
+def read_history(location=DEFAULT_LOCATION, start=None, end=None):
+    """
+    Reads the ['ds', 'y'] series for one location, oldest first.
+
+    Only the two columns are selected and the range is filtered in SQL on
+    the (location, ds) primary key, so the cost follows the window, not the
+    size of the table.
+
+    Args:
+        start (datetime.datetime, optional): First ds to include.
+        end (datetime.datetime, optional): Stop before this ds.
+
+    Returns:
+        pandas.DataFrame: ds as datetime64, y as float64 (possibly empty).
+    """
+    stmt = db.select(SalesHistory.ds, SalesHistory.y).where(
+        SalesHistory.location == location
+    )
+    if start is not None:
+        stmt = stmt.where(SalesHistory.ds >= start)
+    if end is not None:
+        stmt = stmt.where(SalesHistory.ds < end)
+    rows = db.session.execute(stmt.order_by(SalesHistory.ds)).all()
+    return pd.DataFrame(
+        {
+            "ds": pd.to_datetime([r[0] for r in rows]),
+            "y": np.fromiter((r[1] for r in rows), dtype="float64", count=len(rows)),
+        }
+    )
+
+
+def latest(location=DEFAULT_LOCATION):
+    """The newest stored ds for a location, or None."""
+    return db.session.scalar(
+        db.select(func.max(SalesHistory.ds)).where(SalesHistory.location == location)
+    )
+
+
+def load_window(location=None, days=None):
+    """
+    The training window for the forecaster: the last `days` days before the
+    newest stored row (FORECAST_HISTORY_DAYS; 0 means everything).
+
+    Returns:
+        pandas.DataFrame or None: None when nothing is stored for the location.
+    """
+    cfg = current_app.config
+    location = location or cfg["SALES_HISTORY_LOCATION"]
+    days = cfg["FORECAST_HISTORY_DAYS"] if days is None else days
+    newest = latest(location)
+    if newest is None:
+        return None
+    start = newest - timedelta(days=days) + timedelta(days=1) if days else None
+    return read_history(location, start=start)
@@ -0,0 +1,98 @@
+# app/utils/schedule_version.py
+
+import datetime
+import logging
+import threading
+import time
+from collections import namedtuple
+
+from flask import current_app
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import ScheduleVersion
+
+log = logging.getLogger(__name__)
+
+ROW_ID = 1
+
+# The version and when it last changed (UTC; None before the first bump).
+VersionStamp = namedtuple("VersionStamp", ["version", "updated_at"])
+
+_lock = threading.Lock()
+_cached = {"stamp": None, "expires": 0.0}
+
+
+def current_version():
+    """The schedule version number; see current_stamp()."""
+    return current_stamp().version
+
+
+def current_stamp():
+    """
+    The schedule VersionStamp, read from an in-process cache.
+
+    The database is asked at most once per SCHEDULE_VERSION_TTL seconds per
+    process, so conditional GETs for unchanged pages cost no query. Changes
+    committed by this process are visible at once (see invalidate()); changes
+    from other processes within the TTL.
+    """
+    now = time.monotonic()
+    with _lock:
+        if _cached["stamp"] is not None and now < _cached["expires"]:
+            return _cached["stamp"]
+
+    row = db.session.execute(
+        db.select(ScheduleVersion.version, ScheduleVersion.updated_at).where(
+            ScheduleVersion.id == ROW_ID
+        )
+    ).first()
+    stamp = VersionStamp(row.version, row.updated_at) if row else VersionStamp(0, None)
+    with _lock:
+        _cached["stamp"] = stamp
+        _cached["expires"] = now + current_app.config["SCHEDULE_VERSION_TTL"]
+    return stamp
+
+
+def bump():
+    """
+    Increments the version in the current session; the caller commits it
+    together with the schedule change, then calls invalidate(). Call it
+    before the transaction's other writes: on SQLite the first-ever call
+    creates the row on a separate connection, which would wait on them.
+    """
+    _ensure_row()
+    db.session.execute(
+        update(ScheduleVersion)
+        .where(ScheduleVersion.id == ROW_ID)
+        .values(
+            version=ScheduleVersion.version + 1,
+            updated_at=datetime.datetime.utcnow(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def invalidate():
+    """Drops this process's cached version so the next read sees the commit."""
+    with _lock:
+        _cached["stamp"] = None
+        _cached["expires"] = 0.0
+
+
+def _ensure_row():
+    # Created on its own connection so a concurrent first insert can't fail
+    # the caller's transaction. No autoflush: the caller's pending writes must
+    # not take the database write lock before this insert (SQLite).
+    with db.session.no_autoflush:
+        exists = db.session.scalar(
+            db.select(ScheduleVersion.id).where(ScheduleVersion.id == ROW_ID)
+        )
+    if exists is not None:
+        return
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(insert(ScheduleVersion).values(id=ROW_ID, version=0))
+    except IntegrityError:
+        pass
@@ -1,14 +1,19 @@
+from flask import current_app
 from app import db
 from app.models import Employee, Shift
-from . import forecasting
-from .notifications import send_schedule_update_email
+from . import forecast_store
+from . import outbox, schedule_version, solvers
+from .availability import AvailabilityIndex
+from .solvers import ShiftSlot
+from .notifications import build_schedule_update_message
 import datetime
 from datetime import timedelta
-import random
+import numpy as np
 import pandas as pd
-from collections import defaultdict
+from collections import defaultdict, namedtuple
 import calendar
 import logging  
+from sqlalchemy import insert, update
 
 log = logging.getLogger(__name__)
 logging.getLogger("cmdstanpy").setLevel(logging.WARNING)  
@@ -54,18 +59,190 @@ HIGH_DEMAND_EXTRA = {
 
 DEMAND_THRESHOLD = 175  # Adjust as needed
 
-def create_schedule(target_date=None):
+# Demand bands, lowest first; a day falls in the last band whose lower bound
+# its predicted demand reaches. HIGH_DEMAND_EXTRA applies to the "High" band.
+DEMAND_BANDS = [("Low", float("-inf")), ("High", DEMAND_THRESHOLD)]
+
+
+def classify_demand(forecast_df, start_date, num_days):
+    """
+    Looks up predicted demand for consecutive days and assigns each a band.
+
+    The forecast is indexed by date once and every day is classified in a
+    single vectorised pass, instead of filtering the frame day by day.
+
+    Args:
+        forecast_df (pandas.DataFrame): Forecast with 'ds' and 'yhat' columns.
+        start_date (datetime.date): First day to classify.
+        num_days (int): Number of consecutive days.
+
+    Returns:
+        tuple: (numpy.ndarray of predicted demand, 0 where the forecast has no
+               row for the day; numpy.ndarray of band names).
+    """
+    days = pd.date_range(start_date, periods=num_days, freq="D")
+    demand_by_day = (
+        pd.Series(
+            forecast_df["yhat"].to_numpy(dtype=float),
+            index=pd.to_datetime(forecast_df["ds"]).dt.normalize(),
+        )
+        .groupby(level=0)
+        .last()
+    )
+    demand = demand_by_day.reindex(days).fillna(0).to_numpy()
+
+    band_names = np.array([name for name, _ in DEMAND_BANDS])
+    lower_bounds = np.array([bound for _, bound in DEMAND_BANDS[1:]])
+    bands = band_names[np.searchsorted(lower_bounds, demand, side="right")]
+    return demand, bands
+
+
+ScheduleDiff = namedtuple(
+    "ScheduleDiff", ["inserts", "updates", "deletes", "changed_employee_ids"]
+)
+
+
+def _slot_key(shift):
+    return (shift.start_time, shift.end_time, shift.required_position)
+
+
+def diff_schedules(existing, proposed):
+    """
+    Works out the minimal writes that turn `existing` shifts into `proposed` ones.
+
+    Shifts are matched per slot (start, end, position). Within a slot, shifts
+    already held by the proposed employee are left alone, remaining existing
+    shifts are reassigned, and any surplus is deleted or inserted.
+
+    Returns:
+        ScheduleDiff: inserts (proposed shifts), updates ((existing shift,
+        new employee_id) pairs), deletes (existing shifts) and the ids of
+        employees who gained or lost a shift.
+    """
+    existing_by_slot = defaultdict(list)
+    for shift in existing:
+        existing_by_slot[_slot_key(shift)].append(shift)
+    proposed_by_slot = defaultdict(list)
+    for shift in proposed:
+        proposed_by_slot[_slot_key(shift)].append(shift)
+
+    inserts, updates, deletes = [], [], []
+    changed = set()
+    for key in existing_by_slot.keys() | proposed_by_slot.keys():
+        existing_left = list(existing_by_slot.get(key, []))
+        proposed_left = []
+        for shift in proposed_by_slot.get(key, []):
+            match = next(
+                (e for e in existing_left if e.employee_id == shift.employee_id), None
+            )
+            if match is not None:
+                existing_left.remove(match)
+            else:
+                proposed_left.append(shift)
+
+        for old, new in zip(existing_left, proposed_left):
+            updates.append((old, new.employee_id))
+            changed.update({old.employee_id, new.employee_id})
+        for old in existing_left[len(proposed_left) :]:
+            deletes.append(old)
+            changed.add(old.employee_id)
+        for new in proposed_left[len(existing_left) :]:
+            inserts.append(new)
+            changed.add(new.employee_id)
+
+    changed.discard(None)
+    return ScheduleDiff(inserts, updates, deletes, changed)
+
+
+def insert_shifts(planned):
+    """
+    Writes planned shifts with one executemany INSERT, skipping the ORM unit of
+    work (no Shift objects, identity map or per-row flush bookkeeping).
+
+    Args:
+        planned (list): PlannedShift tuples.
+
+    Returns:
+        int: Number of rows sent to the database (the caller commits).
+    """
+    if not planned:
+        return 0
+    db.session.execute(insert(Shift), [shift._asdict() for shift in planned])
+    return len(planned)
+
+
+def _apply_diff(diff):
+    """Stages a ScheduleDiff in the session (the caller commits)."""
+    if diff.deletes:
+        Shift.query.filter(Shift.id.in_([s.id for s in diff.deletes])).delete(
+            synchronize_session=False
+        )
+    if diff.updates:
+        db.session.execute(
+            update(Shift),
+            [
+                {"id": shift.id, "employee_id": employee_id}
+                for shift, employee_id in diff.updates
+            ],
+        )
+    insert_shifts(diff.inserts)
+
+
+# Days either side of the month whose shifts constrain it: enough for any ISO
+# week that straddles the month boundary, and for the rest period.
+NEIGHBOUR_DAYS = 7
+
+
+def _neighbouring_shifts(start_of_month, end_of_month_exclusive):
+    """Assigned shifts in the NEIGHBOUR_DAYS before and after the month being planned."""
+    month_start = datetime.datetime.combine(start_of_month, datetime.time())
+    month_end = datetime.datetime.combine(end_of_month_exclusive, datetime.time())
+    margin = timedelta(days=NEIGHBOUR_DAYS)
+    return Shift.query.filter(
+        Shift.employee_id.isnot(None),
+        db.or_(
+            db.and_(
+                Shift.start_time >= month_start - margin,
+                Shift.start_time < month_start,
+            ),
+            db.and_(
+                Shift.start_time >= month_end,
+                Shift.start_time < month_end + margin,
+            ),
+        ),
+    ).all()
+
+
+def _report(progress, phase):
+    """Calls the optional progress callback, never letting it break scheduling."""
+    if progress is None:
+        return
+    try:
+        progress(phase)
+    except Exception as e:
+        log.warning(f"Progress callback failed for phase '{phase}': {e}")
+
+
+def create_schedule(target_date=None, progress=None, incremental=False):
     """
     Generates a position-based, multi-shift schedule for a target month
     based on forecast, creating unassigned shifts if needed, saves shifts
-    to DB, and sends notifications for assigned shifts.
+    to DB, and queues notifications for assigned shifts in the outbox
+    (same commit as the shifts).
+
+    Args:
+        target_date (datetime.date, optional): Any day in the month to schedule.
+        progress (callable, optional): Called with the name of each phase
+            ('forecast', 'employees', 'planning', 'notifying', 'saving').
+        incremental (bool): Keep existing assignments where possible and write
+            only the differences; only employees whose shifts changed are
+            notified. By default the month is wiped and rebuilt.
     """
     log.info("--- Starting Advanced Schedule Generation ---")
     employee_shifts_to_notify = defaultdict(
         list
     )  
-    employees_scheduled_this_run = {}  
-    shifts_to_add_to_session = []  
+    slots = []
 
     try:
         # 1. Determine Target Month
@@ -80,18 +257,20 @@ def create_schedule(target_date=None):
         log.info(f"Targeting schedule generation for: {month_name_str}")
 
         # 2. Get Forecast
+        _report(progress, "forecast")
         days_to_forecast = 60
         log.info(f"Generating forecast for {days_to_forecast} days...")
-        forecast_df = forecasting.generate_forecast(days_to_predict=days_to_forecast)
+        forecast_df = forecast_store.get_forecast(days_to_predict=days_to_forecast)
         if forecast_df is None:
             log.error("Forecast generation failed. Cannot create schedule.")
             return False
-        forecast_df["ds"] = pd.to_datetime(
-            forecast_df["ds"]
-        ).dt.date  # Ensure only date part
         log.info("Forecast generated.")
+        daily_demand, daily_bands = classify_demand(
+            forecast_df, start_of_month, days_in_month
+        )
 
         # 3. Get Employees and Group by Position
+        _report(progress, "employees")
         employees = Employee.query.all()
         employees_by_position = defaultdict(list)
         if employees:
@@ -105,31 +284,33 @@ def create_schedule(target_date=None):
                 log.warning("No employees with positions found.")
         else:
             log.warning("No employees found in the database.")
+        employees_by_id = {emp.id: emp for emp in employees}
 
-        # 4. Clear existing shifts for the target month only
-        log.info(f"Clearing existing shifts for {month_name_str}...")
-        num_deleted = Shift.query.filter(
-            Shift.start_time >= start_of_month,
-            Shift.start_time < end_of_month_exclusive,
-        ).delete(synchronize_session="fetch")
-        log.info(
-            f"{num_deleted} existing shifts cleared from session (pending commit)."
-        )
+        existing_shifts = []
+        current_holders = defaultdict(set)
+        if incremental:
+            existing_shifts = Shift.query.filter(
+                Shift.start_time >= start_of_month,
+                Shift.start_time < end_of_month_exclusive,
+            ).all()
+            for shift in existing_shifts:
+                current_holders[_slot_key(shift)].add(shift.employee_id)
+            log.info(
+                f"Incremental run: {len(existing_shifts)} existing shifts loaded for {month_name_str}."
+            )
 
-        # 5. Loop Through Days and Shifts, Prepare Shift Objects
+        # 4. Loop Through Days and Shifts, Prepare Planned Shifts
+        _report(progress, "planning")
         log.info(f"Preparing new shifts for {month_name_str}...")
         for day_offset in range(days_in_month):
             current_date = start_of_month + timedelta(days=day_offset)
             log.debug(f"\nProcessing Date: {current_date.strftime('%Y-%m-%d (%a)')}")
 
-            # Find forecast for the current day
-            daily_forecast = forecast_df[forecast_df["ds"] == current_date]
-            predicted_demand = (
-                daily_forecast["yhat"].iloc[0] if not daily_forecast.empty else 0
-            )
-            is_high_demand = predicted_demand >= DEMAND_THRESHOLD
+            # Forecast for the current day, classified up front
+            predicted_demand = daily_demand[day_offset]
+            is_high_demand = daily_bands[day_offset] == "High"
             log.debug(
-                f"  Demand (yhat): {predicted_demand:.2f} -> {'High' if is_high_demand else 'Low'} Demand"
+                f"  Demand (yhat): {predicted_demand:.2f} -> {daily_bands[day_offset]} Demand"
             )
 
             # --- Generate Shifts for Each Type (Day, Eve) ---
@@ -158,123 +339,120 @@ def create_schedule(target_date=None):
                 )
                 end_datetime = datetime.datetime.combine(end_date, shift_end_time)
 
-                # --- Fill required positions for this shift ---
+                # --- Record required positions for this shift ---
                 for position, count_needed in needs.items():
-                    if count_needed <= 0:
-                        continue
-
-                    log.debug(f"    Need {count_needed} x {position}")
-                    available_for_pos = employees_by_position.get(position, [])
-
-                    if not available_for_pos:
-                        log.warning(
-                            f"      No employees found for position: {position}. Creating {count_needed} UNASSIGNED shifts."
+                    if count_needed > 0:
+                        slots.append(
+                            ShiftSlot(start_datetime, end_datetime, position, count_needed)
                         )
-                        for i in range(count_needed):
-                            new_shift = Shift(
-                                employee_id=None,
-                                start_time=start_datetime,
-                                end_time=end_datetime,
-                                required_position=position,
-                            )
-                            shifts_to_add_to_session.append(new_shift)
-                        continue  
-
-                    
-                    shuffled_available = random.sample(
-                        available_for_pos, len(available_for_pos)
-                    )
-                    assigned_employee_ids_this_slot_type = set()
 
-                    log.debug(
-                        f"      Available {position}s: {len(shuffled_available)}. Assigning up to: {count_needed}"
-                    )
+        # Assign employees to the needed slots with the configured engine
+        engine = current_app.config["SCHEDULER_ENGINE"]
+        assign = solvers.ENGINES.get(engine)
+        if assign is None:
+            log.warning(f"Unknown SCHEDULER_ENGINE '{engine}'; using 'random'.")
+            engine, assign = "random", solvers.assign_random
+        log.info(
+            f"Assigning {sum(slot.count for slot in slots)} position-shifts with the '{engine}' engine..."
+        )
+        engine_options = {}
+        if assign is solvers.assign_min_cost:
+            engine_options = {
+                "time_budget": current_app.config["SCHEDULER_TIME_BUDGET"],
+                "max_weekly_hours": current_app.config["SCHEDULER_MAX_WEEKLY_HOURS"],
+                "min_rest_hours": current_app.config["SCHEDULER_MIN_REST_HOURS"],
+                "num_workers": current_app.config["SCHEDULER_NUM_WORKERS"],
+                "fixed_shifts": _neighbouring_shifts(
+                    start_of_month, end_of_month_exclusive
+                ),
+            }
+        # Time off and weekly availability, loaded once for the whole month
+        availability = AvailabilityIndex.build(
+            datetime.datetime.combine(start_of_month, datetime.time()),
+            datetime.datetime.combine(
+                end_of_month_exclusive + timedelta(days=1), datetime.time()
+            ),
+        )
+        planned_shifts = assign(
+            slots,
+            employees_by_position,
+            preferred=current_holders,
+            availability=availability,
+            **engine_options,
+        )
+        for planned in planned_shifts:
+            if planned.employee_id is not None:
+                employee_shifts_to_notify[planned.employee_id].append(planned)
 
-                    for i in range(count_needed): 
-                        assigned_employee = None
-                        
-                        for emp in shuffled_available:
-                        
-                        
-                            if emp.id not in assigned_employee_ids_this_slot_type:
-                                assigned_employee = emp
-                                assigned_employee_ids_this_slot_type.add(emp.id)
-                                break  # Found one
-
-                        
-                        new_shift = Shift(
-                            employee_id=assigned_employee.id
-                            if assigned_employee
-                            else None,
-                            start_time=start_datetime,
-                            end_time=end_datetime,
-                            required_position=position,
-                        )
-                        shifts_to_add_to_session.append(
-                            new_shift
-                        ) 
-
-                        if assigned_employee:
-                            log.debug(
-                                f"      -> Assigned {assigned_employee.name} to {position} shift slot {i + 1}."
-                            )
-                            employees_scheduled_this_run[assigned_employee.id] = (
-                                assigned_employee
-                            )
-                            employee_shifts_to_notify[assigned_employee.id].append(
-                                new_shift
-                            ) 
-                        else:
-                            log.warning(
-                                f"      -> No further available {position} found for slot {i + 1}/{count_needed}. Created UNASSIGNED shift."
-                            )
-  
-
-        # 6. Add all prepared shifts and commit
-        if shifts_to_add_to_session:
+        if incremental:
+            diff = diff_schedules(existing_shifts, planned_shifts)
+            employees_to_notify = diff.changed_employee_ids
             log.info(
-                f"\nAttempting to add and commit {len(shifts_to_add_to_session)} new shifts for {month_name_str}..."
+                f"Schedule diff: {len(diff.inserts)} inserts, {len(diff.updates)} updates, "
+                f"{len(diff.deletes)} deletes, {len(employees_to_notify)} employees affected."
             )
-            db.session.add_all(shifts_to_add_to_session)
+        else:
+            employees_to_notify = set(employee_shifts_to_notify)
+
+        # 5. Queue Notifications (only for affected employees) in the outbox.
+        # The outbox dispatcher sends them after the commit below.
+        _report(progress, "notifying")
+        notifications_queued = 0
+        for emp_id in sorted(employees_to_notify):
+            employee = employees_by_id.get(emp_id)
+            if employee is None:
+                continue
+            if not employee.email:
+                log.warning(
+                    f"Cannot notify {employee.name}, missing email address."
+                )
+                continue
+            shifts_list = employee_shifts_to_notify.get(emp_id, [])
+            shifts_list.sort(key=lambda x: x.start_time)
+            msg = build_schedule_update_message(employee, shifts_list)
+            if msg is None:
+                log.error("Schedule emails could not be built; none were queued.")
+                break
+            outbox.enqueue(msg, employee_id=emp_id)
+            notifications_queued += 1
+
+        # 6. Write the month. A full run clears existing shifts for the target
+        # month and adds all prepared shifts; an incremental run applies only
+        # the diff. Done last so the write transaction stays short.
+        _report(progress, "saving")
+        schedule_version.bump()  # committed with the shifts below
+        if incremental:
+            _apply_diff(diff)
             db.session.commit()
-            log.info("Shifts committed successfully.")
-
-            # 7. Send Notifications (only for assigned shifts)
-            log.info("--- Starting Email Notifications ---")
-            notification_success_count = 0
-            notification_fail_count = 0
-            for emp_id, shifts_list in employee_shifts_to_notify.items():
-                employee = employees_scheduled_this_run.get(emp_id)
-                if employee and employee.email:  
-                    log.info(
-                        f"Attempting to send notification to {employee.name} ({employee.email})..."
-                    )
-                    shifts_list.sort(key=lambda x: x.start_time)
-                    if send_schedule_update_email(employee, shifts_list):
-                        notification_success_count += 1
-                    else:
-                        notification_fail_count += 1
-                elif employee:
-                    log.warning(
-                        f"Cannot send email to {employee.name}, missing email address."
-                    )
-                    notification_fail_count += 1
-                else:
-                    log.warning(
-                        f"Could not find employee object for ID {emp_id} during notification."
-                    )
-                    notification_fail_count += 1
             log.info(
-                f"--- Email Notifications Finished: {notification_success_count} succeeded, {notification_fail_count} failed ---"
+                f"Schedule changes committed successfully with {notifications_queued} notification(s) queued."
             )
-
         else:
-           
-            db.session.commit()
+            log.info(f"Clearing existing shifts for {month_name_str}...")
+            num_deleted = Shift.query.filter(
+                Shift.start_time >= start_of_month,
+                Shift.start_time < end_of_month_exclusive,
+            ).delete(synchronize_session=False)
             log.info(
-                f"No new shifts generated for {month_name_str}. Existing shifts for month cleared."
+                f"{num_deleted} existing shifts cleared from session (pending commit)."
             )
 
+            if planned_shifts:
+                log.info(
+                    f"\nAttempting to add and commit {len(planned_shifts)} new shifts for {month_name_str}..."
+                )
+                insert_shifts(planned_shifts)
+                db.session.commit()
+                log.info(
+                    f"Shifts committed successfully with {notifications_queued} notification(s) queued."
+                )
+            else:
+                db.session.commit()
+                log.info(
+                    f"No new shifts generated for {month_name_str}. Existing shifts for month cleared."
+                )
+
+        schedule_version.invalidate()
         return True
 
     except Exception as e:
@@ -0,0 +1,352 @@
+# app/utils/solvers.py
+
+import logging
+import os
+import random
+import time
+from collections import defaultdict, namedtuple
+from datetime import timedelta
+
+log = logging.getLogger(__name__)
+
+# A shift produced by the planner, not yet written to the database. Has the
+# same attribute names as Shift so the diff and email templates take either.
+PlannedShift = namedtuple(
+    "PlannedShift", ["employee_id", "start_time", "end_time", "required_position"]
+)
+
+# `count` people of `position` needed from start_time to end_time.
+ShiftSlot = namedtuple("ShiftSlot", ["start_time", "end_time", "position", "count"])
+
+# Objective weight of leaving one position-slot unfilled, in cents. Far above
+# any shift's labour cost so coverage always wins over saving money.
+UNFILLED_PENALTY = 10_000_000
+
+
+def assign_random(slots, employees_by_position, preferred=None, availability=None):
+    """
+    Fast greedy engine: shuffles each position's staff and takes the first
+    free people for every slot. Ignores pay, weekly hours and rest rules.
+
+    Args:
+        slots (list): ShiftSlot needs, in any order.
+        employees_by_position (dict): position -> list of Employee.
+        preferred (dict, optional): (start, end, position) -> employee ids who
+            should keep that slot if possible (incremental runs).
+        availability (AvailabilityIndex, optional): Skips people on time off,
+            outside their weekly windows or already on an overlapping shift.
+
+    Returns:
+        list: PlannedShift per needed person; employee_id None when unfilled.
+    """
+    preferred = preferred or {}
+    planned = []
+    for slot in slots:
+        log.debug(f"    Need {slot.count} x {slot.position}")
+        available_for_pos = employees_by_position.get(slot.position, [])
+
+        if not available_for_pos:
+            log.warning(
+                f"      No employees found for position: {slot.position}. Creating {slot.count} UNASSIGNED shifts."
+            )
+            planned.extend(_unassigned(slot, slot.count))
+            continue
+
+        shuffled_available = random.sample(available_for_pos, len(available_for_pos))
+        if availability is not None:
+            shuffled_available = [
+                emp
+                for emp in shuffled_available
+                if availability.is_available(emp.id, slot.start_time, slot.end_time)
+            ]
+        holders = preferred.get((slot.start_time, slot.end_time, slot.position))
+        if holders:
+            # Whoever already works this slot keeps it if still eligible
+            shuffled_available.sort(key=lambda emp: emp.id not in holders)
+
+        log.debug(
+            f"      Available {slot.position}s: {len(shuffled_available)}. Assigning up to: {slot.count}"
+        )
+        chosen = shuffled_available[: slot.count]
+        for i, emp in enumerate(chosen):
+            if availability is not None:
+                availability.book(emp.id, slot.start_time, slot.end_time)
+            log.debug(
+                f"      -> Assigned {emp.name} to {slot.position} shift slot {i + 1}."
+            )
+            planned.append(
+                PlannedShift(emp.id, slot.start_time, slot.end_time, slot.position)
+            )
+        if len(chosen) < slot.count:
+            log.warning(
+                f"      -> No further available {slot.position} found for {slot.count - len(chosen)}/{slot.count} slot(s). Created UNASSIGNED shift(s)."
+            )
+            planned.extend(_unassigned(slot, slot.count - len(chosen)))
+    return planned
+
+
+def assign_min_cost(
+    slots,
+    employees_by_position,
+    preferred=None,
+    availability=None,
+    time_budget=20.0,
+    max_weekly_hours=40,
+    min_rest_hours=11,
+    num_workers=None,
+    fixed_shifts=None,
+):
+    """
+    Cost-optimal engine using OR-Tools CP-SAT.
+
+    Minimises labour cost (hours x hourly_rate) while covering every slot it
+    can, subject to: one slot per person at a time, at least `min_rest_hours`
+    between the end of one shift and the start of the next (so overlapping
+    Day/Eve shifts are excluded too), and at most `max_weekly_hours` per
+    person per ISO week. Employees only ever fill their own position, so each
+    position is solved as a separate, smaller model. Shifts already worked
+    (or planned) just outside the month count towards both rules, so a
+    late shift on the previous month's last day still needs its rest before
+    the 1st, and an ISO week that started last month keeps its hours.
+
+    Every position first gets a cheapest-first greedy plan that already obeys
+    those rules. It seeds the solver and is kept as-is when the solver finds
+    nothing better within the position's share of `time_budget`, or when
+    OR-Tools is not installed.
+
+    Args:
+        slots, employees_by_position, preferred, availability: As for
+            assign_random().
+        time_budget (float): Wall-clock seconds for the whole month.
+        max_weekly_hours (float): Weekly hour cap per employee.
+        min_rest_hours (float): Minimum rest between consecutive shifts.
+        num_workers (int, optional): CP-SAT search threads. Defaults to the
+            number of CPUs.
+        fixed_shifts (iterable, optional): Shift-like objects (employee_id,
+            start_time, end_time) outside the slots being planned, usually the
+            neighbouring months' shifts in the weeks around this one.
+
+    Returns:
+        list: PlannedShift per needed person; employee_id None when unfilled.
+    """
+    try:
+        from ortools.sat.python import cp_model
+    except ImportError:
+        log.warning("OR-Tools is not installed; using cheapest-first assignment only.")
+        cp_model = None
+
+    preferred = preferred or {}
+    rules = {
+        "rest": timedelta(hours=min_rest_hours),
+        "max_week_minutes": int(max_weekly_hours * 60),
+        "availability": availability,
+        "num_workers": max(1, num_workers or os.cpu_count() or 1),
+        # employee id -> [(start, end)] and (employee id, ISO week) -> minutes
+        "fixed": defaultdict(list),
+        "fixed_week_minutes": defaultdict(int),
+    }
+    for shift in fixed_shifts or ():
+        if shift.employee_id is None:
+            continue
+        rules["fixed"][shift.employee_id].append((shift.start_time, shift.end_time))
+        rules["fixed_week_minutes"][
+            shift.employee_id, shift.start_time.isocalendar()[:2]
+        ] += _minutes(shift)
+    slots_by_position = defaultdict(list)
+    for slot in slots:
+        slots_by_position[slot.position].append(slot)
+
+    deadline = time.monotonic() + time_budget
+    planned = []
+    positions = sorted(slots_by_position)
+    for index, position in enumerate(positions):
+        position_slots = sorted(slots_by_position[position])
+        employees = employees_by_position.get(position, [])
+        if not employees:
+            log.warning(
+                f"No employees found for position: {position}. Creating UNASSIGNED shifts."
+            )
+            for slot in position_slots:
+                planned.extend(_unassigned(slot, slot.count))
+            continue
+
+        started = time.monotonic()
+        assignment = _cheapest_first(position_slots, employees, preferred, rules)
+        method = "greedy"
+
+        # Split what is left of the budget evenly over the remaining positions.
+        budget = (deadline - time.monotonic()) / (len(positions) - index)
+        if cp_model is not None and budget > 0.05:
+            try:
+                solved = _solve_position(
+                    cp_model,
+                    position_slots,
+                    employees,
+                    preferred,
+                    rules,
+                    budget,
+                    hint=assignment,
+                )
+            except Exception as e:
+                log.error(f"CP-SAT failed for {position}: {e}", exc_info=True)
+                solved = None
+            if solved is not None:
+                assignment, method = solved
+
+        filled = 0
+        for slot, chosen in zip(position_slots, assignment):
+            filled += len(chosen)
+            planned.extend(
+                PlannedShift(employees[e].id, slot.start_time, slot.end_time, position)
+                for e in chosen
+            )
+            planned.extend(_unassigned(slot, slot.count - len(chosen)))
+        log.info(
+            f"Assigned {position}: {method}, {filled}/{sum(sl.count for sl in position_slots)} "
+            f"filled, {len(employees)} staff, {time.monotonic() - started:.2f}s."
+        )
+    return planned
+
+
+def _cheapest_first(slots, employees, preferred, rules):
+    """
+    Greedy plan for one position: walks the slots in start order and gives
+    each to the cheapest staff who are available, rested and under their
+    weekly hours (current holders first). Returns a list of employee indexes
+    per slot.
+    """
+    availability = rules["availability"]
+    rate_order = sorted(
+        range(len(employees)), key=lambda e: employees[e].hourly_rate or 0
+    )
+    last_end = {}
+    week_minutes = defaultdict(int)
+    assignment = []
+    for slot in slots:
+        minutes = int((slot.end_time - slot.start_time).total_seconds() // 60)
+        week = slot.start_time.isocalendar()[:2]
+        holders = preferred.get((slot.start_time, slot.end_time, slot.position))
+        candidates = rate_order
+        if holders:
+            candidates = sorted(rate_order, key=lambda e: employees[e].id not in holders)
+
+        chosen = []
+        for e in candidates:
+            if len(chosen) == slot.count:
+                break
+            emp_id = employees[e].id
+            if e in last_end and slot.start_time < last_end[e] + rules["rest"]:
+                continue
+            if _clashes_with_fixed(slot, rules["fixed"].get(emp_id, ()), rules["rest"]):
+                continue
+            if (
+                week_minutes[e, week]
+                + rules["fixed_week_minutes"].get((emp_id, week), 0)
+                + minutes
+                > rules["max_week_minutes"]
+            ):
+                continue
+            if availability is not None and not availability.is_available(
+                employees[e].id, slot.start_time, slot.end_time
+            ):
+                continue
+            chosen.append(e)
+            last_end[e] = max(last_end.get(e, slot.end_time), slot.end_time)
+            week_minutes[e, week] += minutes
+        assignment.append(chosen)
+    return assignment
+
+
+def _solve_position(cp_model, slots, employees, preferred, rules, budget, hint):
+    """Solves one position with CP-SAT. Returns (assignment, status) or None."""
+    availability = rules["availability"]
+    model = cp_model.CpModel()
+    minutes = [_minutes(slot) for slot in slots]
+
+    x = {}
+    objective = []
+    for s, slot in enumerate(slots):
+        holders = preferred.get((slot.start_time, slot.end_time, slot.position), ())
+        hinted = set(hint[s])
+        assigned = []
+        for e, emp in enumerate(employees):
+            var = model.NewBoolVar(f"x_{e}_{s}")
+            model.AddHint(var, e in hinted)
+            if (
+                availability is not None
+                and not availability.is_available(emp.id, slot.start_time, slot.end_time)
+            ) or _clashes_with_fixed(slot, rules["fixed"].get(emp.id, ()), rules["rest"]):
+                model.Add(var == 0)
+            x[e, s] = var
+            assigned.append(var)
+            # Cost in cents, doubled so keeping a current holder can break ties.
+            cost = round((emp.hourly_rate or 0) * minutes[s] / 60 * 100)
+            objective.append((cost * 2 - (1 if emp.id in holders else 0)) * var)
+        unfilled = model.NewIntVar(0, slot.count, f"unfilled_{s}")
+        model.AddHint(unfilled, slot.count - len(hinted))
+        model.Add(sum(assigned) + unfilled == slot.count)
+        objective.append(UNFILLED_PENALTY * 2 * unfilled)
+
+    # Pairs of slots one person cannot both work: they overlap, or the second
+    # starts before the rest period after the first has passed.
+    conflicts = []
+    for a in range(len(slots)):
+        for b in range(a + 1, len(slots)):
+            if slots[b].start_time >= slots[a].end_time + rules["rest"]:
+                break  # slots are sorted by start time
+            conflicts.append((a, b))
+
+    weeks = defaultdict(list)
+    for s, slot in enumerate(slots):
+        weeks[slot.start_time.isocalendar()[:2]].append(s)
+    max_week_minutes = rules["max_week_minutes"]
+
+    for e, emp in enumerate(employees):
+        for a, b in conflicts:
+            model.AddBoolOr([x[e, a].Not(), x[e, b].Not()])
+        for week, week_slots in weeks.items():
+            cap = max(
+                0, max_week_minutes - rules["fixed_week_minutes"].get((emp.id, week), 0)
+            )
+            if sum(minutes[s] for s in week_slots) > cap:
+                model.Add(sum(minutes[s] * x[e, s] for s in week_slots) <= cap)
+
+    model.Minimize(sum(objective))
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = budget
+    solver.parameters.num_workers = rules["num_workers"]
+    status = solver.Solve(model)
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return None
+
+    assignment = [
+        [e for e in range(len(employees)) if solver.Value(x[e, s])]
+        for s in range(len(slots))
+    ]
+    return assignment, f"cp-sat {solver.StatusName(status).lower()}"
+
+
+def _minutes(shift):
+    return int((shift.end_time - shift.start_time).total_seconds() // 60)
+
+
+def _clashes_with_fixed(slot, fixed, rest):
+    """True if the slot overlaps, or leaves less than `rest` around, any fixed shift."""
+    return any(
+        slot.start_time < end + rest and start < slot.end_time + rest
+        for start, end in fixed
+    )
+
+
+def _unassigned(slot, count):
+    return [
+        PlannedShift(None, slot.start_time, slot.end_time, slot.position)
+        for _ in range(count)
+    ]
+
+
+ENGINES = {
+    "random": assign_random,
+    "cost": assign_min_cost,
+}
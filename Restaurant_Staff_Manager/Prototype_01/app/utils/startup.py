@@ -0,0 +1,103 @@
+# app/utils/startup.py
+
+import logging
+import sys
+import time
+from collections import Counter, namedtuple
+
+log = logging.getLogger(__name__)
+
+# Analytics dependencies that should only load on first use (or in warm()).
+HEAVY_MODULES = ("pandas", "numpy", "prophet", "cmdstanpy", "ortools")
+
+StartupReport = namedtuple(
+    "StartupReport",
+    [
+        "import_seconds",
+        "create_app_seconds",
+        "warm_seconds",
+        "modules_loaded",
+        "top_packages",
+        "heavy_modules",
+    ],
+)
+
+
+def report(app, import_seconds, create_started, modules_before, warm_seconds=0.0):
+    """
+    Records what app startup cost: time spent importing the app package, time
+    in create_app, and the modules loaded since the package started importing.
+
+    The report is kept in app.extensions["startup_report"] and logged. Any of
+    HEAVY_MODULES loaded without WARM_START is logged as a warning, since
+    that is a cold-start regression.
+    """
+    new_modules = [name for name in sys.modules if name not in modules_before]
+    packages = Counter(name.partition(".")[0] for name in new_modules)
+    heavy = [name for name in HEAVY_MODULES if name in sys.modules]
+    result = StartupReport(
+        import_seconds=import_seconds,
+        create_app_seconds=time.perf_counter() - create_started,
+        warm_seconds=warm_seconds,
+        modules_loaded=len(new_modules),
+        top_packages=packages.most_common(5),
+        heavy_modules=heavy,
+    )
+    app.extensions["startup_report"] = result
+
+    top = ", ".join(f"{name} ({count})" for name, count in result.top_packages)
+    print(
+        f"Startup: package import {result.import_seconds * 1000:.0f} ms, "
+        f"create_app {result.create_app_seconds * 1000:.0f} ms "
+        f"(warm-up {result.warm_seconds * 1000:.0f} ms), "
+        f"{result.modules_loaded} modules loaded."
+    )
+    log.info(f"Startup modules by package: {top}.")
+    if heavy and not app.config["WARM_START"]:
+        log.warning(f"Heavy modules imported at startup: {', '.join(heavy)}.")
+    return result
+
+
+def warm(app):
+    """
+    Imports the analytics stack and prepares the configured forecaster.
+
+    With WARM_START under gunicorn.conf.py this runs once in the master
+    (preload_app), so every forked worker starts with pandas, the forecaster
+    and any cached Prophet model already in memory, shared copy-on-write.
+    The history is read from the sales_history table (or the CSV while it is
+    empty), so the connection pool is disposed before returning and the
+    workers never share the master's connections; post_fork in
+    gunicorn.conf.py also disposes whatever a worker inherits.
+
+    Returns:
+        float: Seconds spent warming up.
+    """
+    started = time.perf_counter()
+    with app.app_context():
+        from . import forecasting, scheduling  # noqa: F401
+
+        history = forecasting.load_history()
+        if history is not None:
+            forecaster = forecasting.get_forecaster()
+            try:
+                # Fits (or loads the cached fit of) the model and runs one
+                # prediction, so lazy imports inside the backend happen too.
+                forecaster.forecast(history, 1)
+            except Exception as e:
+                log.warning(f"Forecaster warm-up failed: {e}")
+
+        if app.config["SCHEDULER_ENGINE"] == "cost":
+            try:
+                from ortools.sat.python import cp_model  # noqa: F401
+            except ImportError:
+                log.warning("SCHEDULER_ENGINE=cost but ortools is not installed.")
+
+        from app import db
+
+        db.session.remove()
+        db.engine.dispose()
+
+    seconds = time.perf_counter() - started
+    log.info(f"Warm start finished in {seconds:.2f}s.")
+    return seconds
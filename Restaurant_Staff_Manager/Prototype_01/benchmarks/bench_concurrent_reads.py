@@ -0,0 +1,152 @@
+"""
+Measures read latency on the schedule while a month is being rewritten.
+
+A writer thread repeatedly does what create_schedule's save phase does -
+delete a month of shifts and insert_shifts() a new set in one transaction -
+while reader threads run the /schedule weekly cost rollup in a loop. Each
+engine profile is timed separately.
+
+Usage (from Prototype_01/):
+    python benchmarks/bench_concurrent_reads.py [--rows 20000] [--readers 4]
+        [--seconds 10] [--postgres URL]
+
+SQLite runs against throwaway files with the "plain" and "sqlite-wal"
+profiles; pass --postgres (or set BENCH_POSTGRES_URL) to also run the
+"postgres-pooled" profile against a scratch database: its shift table is
+emptied around each run.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db  # noqa: E402
+from app.models import Shift  # noqa: E402
+from app.utils import costs  # noqa: E402
+from app.utils.scheduling import insert_shifts  # noqa: E402
+from common import MONTH_END, MONTH_START, make_planned  # noqa: E402
+from config import Config  # noqa: E402
+
+
+def rewrite_month(planned):
+    db.session.execute(
+        db.delete(Shift).where(
+            Shift.start_time >= MONTH_START, Shift.start_time < MONTH_END
+        )
+    )
+    insert_shifts(planned)
+    db.session.commit()
+
+
+def writer(app, planned, stop, writes, errors):
+    with app.app_context():
+        while not stop.is_set():
+            try:
+                rewrite_month(planned)
+                writes.append(1)
+            except Exception as e:
+                db.session.rollback()
+                errors.append(f"write: {e.__class__.__name__}")
+        db.session.remove()
+
+
+def reader(app, stop, latencies, errors):
+    with app.app_context():
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                costs.weekly_costs(MONTH_START, MONTH_END)
+                db.session.commit()  # end the read transaction like a request would
+                latencies.append(time.perf_counter() - started)
+            except Exception as e:
+                db.session.rollback()
+                errors.append(f"read: {e.__class__.__name__}")
+        db.session.remove()
+
+
+def bench(label, url, profile, rows, readers, seconds):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = url
+        DB_PROFILE = profile
+
+    app = create_app(BenchConfig)
+    planned = make_planned(rows, MONTH_START, MONTH_END)
+    with app.app_context():
+        db.create_all()
+        db.session.execute(db.delete(Shift))
+        db.session.commit()
+        rewrite_month(planned)
+        db.session.remove()
+
+    stop = threading.Event()
+    latencies, writes, errors = [], [], []
+    threads = [threading.Thread(target=writer, args=(app, planned, stop, writes, errors))]
+    threads += [
+        threading.Thread(target=reader, args=(app, stop, latencies, errors))
+        for _ in range(readers)
+    ]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    with app.app_context():
+        db.session.execute(db.delete(Shift))
+        db.session.commit()
+        db.session.remove()
+        db.engine.dispose()
+
+    if latencies:
+        latencies.sort()
+        p50 = statistics.median(latencies) * 1000
+        p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+        worst = latencies[-1] * 1000
+        print(
+            f"{label:<26} reads {len(latencies):>6}   p50 {p50:8.1f}ms   "
+            f"p95 {p95:8.1f}ms   max {worst:8.1f}ms   "
+            f"writes {len(writes):>3}   errors {len(errors)}"
+        )
+    else:
+        print(f"{label:<26} no successful reads; errors {len(errors)}")
+    if errors:
+        kinds = sorted(set(errors))
+        print(f"{'':<26} error kinds: {', '.join(kinds)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--postgres", default=os.environ.get("BENCH_POSTGRES_URL"))
+    args = parser.parse_args()
+
+    for profile in ("plain", "sqlite-wal"):
+        with tempfile.TemporaryDirectory() as tmp:
+            url = "sqlite:///" + os.path.join(tmp, "bench.db")
+            bench(
+                f"sqlite ({profile})", url, profile, args.rows, args.readers, args.seconds
+            )
+    if args.postgres:
+        bench(
+            "postgres (postgres-pooled)",
+            args.postgres,
+            "postgres-pooled",
+            args.rows,
+            args.readers,
+            args.seconds,
+        )
+    else:
+        print("postgres   skipped (pass --postgres URL or set BENCH_POSTGRES_URL)")
+
+
+if __name__ == "__main__":
+    main()
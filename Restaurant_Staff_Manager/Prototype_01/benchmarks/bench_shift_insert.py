@@ -0,0 +1,103 @@
+"""
+Compares the two ways schedule generation can persist shifts:
+
+  orm   - one Shift object per row through db.session.add_all()
+  core  - scheduling.insert_shifts(), a single executemany INSERT
+
+Usage (from Prototype_01/):
+    python benchmarks/bench_shift_insert.py [--rows 20000] [--postgres URL]
+
+SQLite runs against a throwaway file; pass --postgres (or set
+BENCH_POSTGRES_URL) to also run against a PostgreSQL database. The shift
+table there is cleared before and after each run, so never point it at a
+database with real data.
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db  # noqa: E402
+from app.models import Shift  # noqa: E402
+from app.utils.scheduling import insert_shifts  # noqa: E402
+from common import make_planned  # noqa: E402
+from config import Config  # noqa: E402
+
+START = datetime.datetime(2030, 1, 1, 10, 0)
+
+
+def run_orm(planned):
+    db.session.add_all(
+        [
+            Shift(
+                employee_id=p.employee_id,
+                start_time=p.start_time,
+                end_time=p.end_time,
+                required_position=p.required_position,
+            )
+            for p in planned
+        ]
+    )
+    db.session.commit()
+
+
+def run_core(planned):
+    insert_shifts(planned)
+    db.session.commit()
+
+
+def clear_shifts():
+    db.session.execute(db.delete(Shift))
+    db.session.commit()
+
+
+def bench(label, url, rows, repeat):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = url
+
+    app = create_app(BenchConfig)
+    results = {}
+    with app.app_context():
+        db.create_all()
+        planned = make_planned(rows, START)
+        for name, func in (("orm", run_orm), ("core", run_core)):
+            timings = []
+            for _ in range(repeat):
+                clear_shifts()
+                db.session.expunge_all()
+                started = time.perf_counter()
+                func(planned)
+                timings.append(time.perf_counter() - started)
+            clear_shifts()
+            results[name] = min(timings)
+        db.session.remove()
+
+    orm, core = results["orm"], results["core"]
+    print(
+        f"{label:<10} {rows:>8} rows   orm {orm:8.3f}s   core {core:8.3f}s   "
+        f"speedup x{orm / core:5.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--postgres", default=os.environ.get("BENCH_POSTGRES_URL"))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bench("sqlite", "sqlite:///" + os.path.join(tmp, "bench.db"), args.rows, args.repeat)
+    if args.postgres:
+        bench("postgres", args.postgres, args.rows, args.repeat)
+    else:
+        print("postgres   skipped (pass --postgres URL or set BENCH_POSTGRES_URL)")
+
+
+if __name__ == "__main__":
+    main()
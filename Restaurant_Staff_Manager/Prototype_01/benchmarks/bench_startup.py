@@ -0,0 +1,70 @@
+"""
+Measures cold start: a fresh interpreter importing the app and calling
+create_app(), as each gunicorn worker does without WARM_START.
+
+Usage (from Prototype_01/):
+    python benchmarks/bench_startup.py [--runs 5] [--warm]
+
+Prints the median of create_app's startup report over the runs, and the
+heavy modules that were loaded. Without --warm that list should be empty;
+anything in it is a lazy-import regression.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, time
+started = time.perf_counter()
+from app import create_app
+app = create_app()
+report = app.extensions["startup_report"]._asdict()
+report["total_seconds"] = time.perf_counter() - started
+print("REPORT " + json.dumps(report))
+"""
+
+
+def run_once(warm):
+    env = dict(os.environ, WARM_START="true" if warm else "false")
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    line = next(l for l in output.splitlines() if l.startswith("REPORT "))
+    return json.loads(line[len("REPORT ") :])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warm", action="store_true")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    reports = [run_once(args.warm) for _ in range(args.runs)]
+    for field in ("total_seconds", "import_seconds", "create_app_seconds", "warm_seconds"):
+        values = [r[field] * 1000 for r in reports]
+        print(
+            f"{field:<20} median {statistics.median(values):8.1f}ms"
+            f"   max {max(values):8.1f}ms"
+        )
+    modules = statistics.median(r["modules_loaded"] for r in reports)
+    heavy = ", ".join(reports[-1]["heavy_modules"]) or "none"
+    print(f"{'modules_loaded':<20} median {modules:8.0f}")
+    print(f"{'heavy_modules':<20} {heavy}")
+    print(f"({args.runs} runs in {time.perf_counter() - started:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
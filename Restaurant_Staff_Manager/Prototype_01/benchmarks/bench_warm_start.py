@@ -0,0 +1,97 @@
+"""
+Compares full and warm-started Prophet fits as sales days arrive one by one:
+
+  full  - Prophet().fit(history), what every refit did before
+  warm  - Prophet().fit(history, init=<previous fit's parameters>)
+
+Usage (from Prototype_01/):
+    python benchmarks/bench_warm_start.py [--history-days 730] [--new-days 14]
+
+The series is synthetic (trend, weekly pattern, noise). For each new day the
+history grows by one row; both fits are timed and scored on the following
+7 days, so the accuracy cost of warm starts (if any) shows next to the time.
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.forecasting import (  # noqa: E402
+    PROPHET_SETTINGS,
+    _stan_init,
+    _warm_start_params,
+)
+
+HORIZON = 7
+
+
+def make_series(days, seed=7):
+    rng = np.random.default_rng(seed)
+    t = np.arange(days)
+    weekly = np.array([0.0, -10.0, -6.0, 0.0, 12.0, 30.0, 22.0])
+    y = 150 + 0.03 * t + weekly[t % 7] + rng.normal(0, 8, days)
+    return pd.DataFrame({"ds": pd.date_range("2023-01-01", periods=days), "y": y})
+
+
+def fit(history, init=None):
+    from prophet import Prophet
+
+    m = Prophet(**PROPHET_SETTINGS)
+    started = time.perf_counter()
+    if init is None:
+        m.fit(history)
+    else:
+        m.fit(history, init=init)
+    return m, time.perf_counter() - started
+
+
+def mae(m, actual):
+    predicted = m.predict(actual[["ds"]])["yhat"].to_numpy()
+    return float(np.mean(np.abs(actual["y"].to_numpy() - predicted)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--history-days", type=int, default=730)
+    parser.add_argument("--new-days", type=int, default=14)
+    args = parser.parse_args()
+    import prophet  # noqa: F401  (configures cmdstanpy's logger on import)
+
+    logging.getLogger("cmdstanpy").disabled = True
+
+    series = make_series(args.history_days + args.new_days + HORIZON)
+    first = series.iloc[: args.history_days]
+    previous, _ = fit(first)
+
+    results = {"full": ([], []), "warm": ([], [])}
+    for day in range(1, args.new_days + 1):
+        end = args.history_days + day
+        history = series.iloc[:end]
+        actual = series.iloc[end : end + HORIZON]
+
+        full, full_seconds = fit(history)
+        warm, warm_seconds = fit(history, _stan_init(_warm_start_params(previous)))
+        for name, m, seconds in (("full", full, full_seconds), ("warm", warm, warm_seconds)):
+            results[name][0].append(seconds)
+            results[name][1].append(mae(m, actual))
+        # Chain warm starts the way daily refits would.
+        previous = warm
+
+    print(f"{args.history_days} days of history, {args.new_days} daily appends:")
+    for name, (seconds, errors) in results.items():
+        print(
+            f"  {name}: median fit {statistics.median(seconds) * 1000:.0f} ms, "
+            f"mean {statistics.mean(seconds) * 1000:.0f} ms, next-{HORIZON}-day MAE {statistics.mean(errors):.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
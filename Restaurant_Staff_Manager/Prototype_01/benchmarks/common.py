@@ -0,0 +1,26 @@
+"""Helpers shared by the benchmark scripts. Import after the sys.path setup."""
+
+import datetime
+from datetime import timedelta
+
+from app.utils.solvers import PlannedShift
+
+MONTH_START = datetime.datetime(2030, 1, 1)
+MONTH_END = datetime.datetime(2030, 2, 1)
+
+
+def make_planned(rows, start=MONTH_START, end=None):
+    """
+    `rows` unassigned 8-hour Server shifts from `start`: one per hour, or
+    spread evenly up to `end` when given.
+    """
+    step = (end - start) / rows if end is not None else timedelta(hours=1)
+    return [
+        PlannedShift(
+            employee_id=None,
+            start_time=start + step * i,
+            end_time=start + step * i + timedelta(hours=8),
+            required_position="Server",
+        )
+        for i in range(rows)
+    ]
@@ -14,6 +14,20 @@ class Config:
     ) or "sqlite:///" + os.path.join(basedir, "instance", "database.db")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Engine profile (app/utils/db_profiles.py): "auto" picks "sqlite-wal" or
+    # "postgres-pooled" from the URI; "plain" leaves SQLAlchemy's defaults
+    DB_PROFILE = os.environ.get("DB_PROFILE") or "auto"
+    SQLITE_JOURNAL_MODE = os.environ.get("SQLITE_JOURNAL_MODE") or "WAL"
+    SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS") or "NORMAL"
+    SQLITE_BUSY_TIMEOUT = int(
+        os.environ.get("SQLITE_BUSY_TIMEOUT") or 30000
+    )  # milliseconds
+    # Per process: total connections = gunicorn workers x (size + overflow)
+    DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE") or 5)
+    DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW") or 10)
+    DB_POOL_TIMEOUT = int(os.environ.get("DB_POOL_TIMEOUT") or 30)  # seconds
+    DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE") or 1800)  # seconds
+
     MAIL_SERVER = os.environ.get("MAIL_SERVER")
     MAIL_PORT = int(os.environ.get("MAIL_PORT") or 587)
     MAIL_USE_TLS = os.environ.get("MAIL_USE_TLS", "true").lower() in ["true", "1", "t"]
@@ -23,4 +37,102 @@ class Config:
     MAIL_DEFAULT_SENDER = os.environ.get(
         "MAIL_DEFAULT_SENDER"
     )  # This will be your verified email
+    MAIL_POOL_SIZE = int(
+        os.environ.get("MAIL_POOL_SIZE") or 4
+    )  # concurrent SMTP connections for batch sends
     ADMINS = [os.environ.get("ADMIN_EMAIL") or "some-default-admin@example.com"]
+
+    # Notification outbox dispatcher
+    OUTBOX_BATCH_SIZE = int(os.environ.get("OUTBOX_BATCH_SIZE") or 100)
+    OUTBOX_RATE_LIMIT = float(
+        os.environ.get("OUTBOX_RATE_LIMIT") or 10
+    )  # emails per second
+    OUTBOX_MAX_ATTEMPTS = int(os.environ.get("OUTBOX_MAX_ATTEMPTS") or 6)
+    OUTBOX_BACKOFF_BASE = int(os.environ.get("OUTBOX_BACKOFF_BASE") or 30)  # seconds
+    OUTBOX_BACKOFF_MAX = int(os.environ.get("OUTBOX_BACKOFF_MAX") or 3600)  # seconds
+    OUTBOX_CLAIM_TIMEOUT = int(
+        os.environ.get("OUTBOX_CLAIM_TIMEOUT") or 10 * 60
+    )  # seconds before a crashed dispatcher's claim is released
+    OUTBOX_POLL_INTERVAL = int(os.environ.get("OUTBOX_POLL_INTERVAL") or 10)  # seconds
+
+    # Forecasting engine: "prophet" (most accurate; slow to import and fit) or
+    # one of the NumPy backends "seasonal_naive", "holt_winters" and
+    # "weekly_regression" (milliseconds, no Prophet/cmdstan needed)
+    FORECAST_BACKEND = os.environ.get("FORECAST_BACKEND") or "prophet"
+
+    # Import pandas/Prophet/OR-Tools and warm the forecaster inside create_app.
+    # gunicorn.conf.py then preloads the app, so this happens once in the
+    # master and the workers share it copy-on-write
+    WARM_START = os.environ.get("WARM_START", "false").lower() in ["true", "1", "t"]
+
+    # Training data: the sales_history table (filled by ingest_sales.py) for
+    # this location, limited to the most recent FORECAST_HISTORY_DAYS (0 = all)
+    SALES_HISTORY_LOCATION = os.environ.get("SALES_HISTORY_LOCATION") or "default"
+    FORECAST_HISTORY_DAYS = int(os.environ.get("FORECAST_HISTORY_DAYS") or 730)
+
+    # Prophet warm starts: refit from the last parameters when new days were
+    # only appended. A full refit runs every FORECAST_FULL_REFIT_DAYS, or when
+    # the new days miss the last forecast by more than FORECAST_DRIFT_THRESHOLD
+    # times the full fit's in-sample RMSE
+    FORECAST_WARM_START = os.environ.get("FORECAST_WARM_START", "true").lower() in [
+        "true",
+        "1",
+        "t",
+    ]
+    FORECAST_FULL_REFIT_DAYS = float(os.environ.get("FORECAST_FULL_REFIT_DAYS") or 7)
+    FORECAST_DRIFT_THRESHOLD = float(os.environ.get("FORECAST_DRIFT_THRESHOLD") or 3.0)
+
+    # Fitted forecast models, shared by all workers through the filesystem
+    FORECAST_MODEL_CACHE_DIR = os.environ.get(
+        "FORECAST_MODEL_CACHE_DIR"
+    ) or os.path.join(basedir, "instance", "model_cache")
+    FORECAST_MODEL_CACHE_MAX_ENTRIES = int(
+        os.environ.get("FORECAST_MODEL_CACHE_MAX_ENTRIES") or 16
+    )
+    FORECAST_MODEL_CACHE_MAX_BYTES = int(
+        os.environ.get("FORECAST_MODEL_CACHE_MAX_BYTES") or 50 * 1024 * 1024
+    )
+    FORECAST_MODEL_CACHE_MAX_AGE = int(
+        os.environ.get("FORECAST_MODEL_CACHE_MAX_AGE") or 7 * 24 * 3600
+    )  # seconds
+
+    # How long a stored forecast frame is served before the forecaster is asked again
+    FORECAST_RESULT_TTL = int(os.environ.get("FORECAST_RESULT_TTL") or 6 * 3600)
+
+    # Background schedule generation: a month lock older than this is stale
+    SCHEDULE_JOB_LOCK_TIMEOUT = int(
+        os.environ.get("SCHEDULE_JOB_LOCK_TIMEOUT") or 15 * 60
+    )  # seconds
+
+    # Scheduling engine: "random" (fast greedy) or "cost" (OR-Tools CP-SAT,
+    # minimises labour cost under the hour and rest rules below)
+    SCHEDULER_ENGINE = os.environ.get("SCHEDULER_ENGINE") or "random"
+    SCHEDULER_TIME_BUDGET = float(
+        os.environ.get("SCHEDULER_TIME_BUDGET") or 20
+    )  # seconds per month
+    SCHEDULER_MAX_WEEKLY_HOURS = float(
+        os.environ.get("SCHEDULER_MAX_WEEKLY_HOURS") or 40
+    )
+    SCHEDULER_MIN_REST_HOURS = float(os.environ.get("SCHEDULER_MIN_REST_HOURS") or 11)
+    SCHEDULER_NUM_WORKERS = int(
+        os.environ.get("SCHEDULER_NUM_WORKERS") or os.cpu_count() or 1
+    )  # CP-SAT search threads; lower it when gunicorn workers share the host
+
+    # Per-employee calendar feeds: how long each process trusts its cached
+    # schedule version before checking the database again
+    SCHEDULE_VERSION_TTL = float(
+        os.environ.get("SCHEDULE_VERSION_TTL") or 30
+    )  # seconds
+    CALENDAR_FEED_PAST_DAYS = int(os.environ.get("CALENDAR_FEED_PAST_DAYS") or 30)
+    CALENDAR_FEED_FUTURE_DAYS = int(os.environ.get("CALENDAR_FEED_FUTURE_DAYS") or 90)
+
+    # Rendered /schedule pages: "memory" (per-process LRU), "redis" (shared,
+    # needs the redis package and PAGE_CACHE_URL) or "none"
+    PAGE_CACHE_BACKEND = os.environ.get("PAGE_CACHE_BACKEND") or "memory"
+    PAGE_CACHE_URL = os.environ.get("PAGE_CACHE_URL") or "redis://localhost:6379/0"
+    PAGE_CACHE_MAX_ENTRIES = int(os.environ.get("PAGE_CACHE_MAX_ENTRIES") or 64)
+    PAGE_CACHE_TTL = int(os.environ.get("PAGE_CACHE_TTL") or 3600)  # seconds
+
+    # JSON API (/api/v1) page sizes
+    API_PAGE_SIZE = int(os.environ.get("API_PAGE_SIZE") or 100)
+    API_MAX_PAGE_SIZE = int(os.environ.get("API_MAX_PAGE_SIZE") or 1000)
@@ -0,0 +1,13 @@
+import sys
+
+from app import create_app
+from app.utils import outbox
+
+app = create_app()
+
+with app.app_context():
+    once = "--once" in sys.argv[1:]
+    print(f"Starting outbox dispatcher{' (single pass)' if once else ''}...")
+    result = outbox.run_dispatcher(once=once)
+    if once:
+        print(f"Outbox dispatcher finished: {result}")
@@ -0,0 +1,32 @@
+# gunicorn.conf.py
+#
+#   gunicorn -c gunicorn.conf.py run:app
+#
+# With WARM_START=true the app is imported and warmed (pandas, the
+# forecaster, any cached Prophet model) once in the master before the
+# workers are forked, so they boot instantly and share those pages
+# copy-on-write.
+
+import gc
+import os
+
+bind = os.environ.get("GUNICORN_BIND") or "0.0.0.0:5001"
+workers = int(os.environ.get("WEB_CONCURRENCY") or 1)
+timeout = int(os.environ.get("GUNICORN_TIMEOUT") or 120)
+preload_app = os.environ.get("WARM_START", "false").lower() in ["true", "1", "t"]
+
+
+def when_ready(server):
+    if preload_app:
+        # Move everything loaded so far out of the GC's reach, so collections
+        # in the workers don't write to (and un-share) the preloaded objects.
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        from app import db
+
+        # Never reuse a pooled connection opened in the master.
+        with server.app.wsgi().app_context():
+            db.engine.dispose(close=False)
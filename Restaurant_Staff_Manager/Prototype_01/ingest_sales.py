@@ -0,0 +1,40 @@
+"""
+Appends daily (or hourly) sales to the sales_history table.
+
+    python ingest_sales.py data/historical_sales.csv [more.csv ...] [--location downtown]
+
+Each CSV needs ds (ISO date or datetime) and y columns; other columns are
+ignored. Days already stored for the location are skipped, so re-running
+an export that overlaps the last ingest is safe.
+"""
+
+import argparse
+
+from app import create_app, db
+
+parser = argparse.ArgumentParser(
+    description="Append sales CSVs to the sales_history table."
+)
+parser.add_argument("files", nargs="+", help="CSV files with ds and y columns.")
+parser.add_argument(
+    "--location",
+    default=None,
+    help="Location key (default: SALES_HISTORY_LOCATION).",
+)
+args = parser.parse_args()
+
+app = create_app()
+
+with app.app_context():
+    from app.utils import sales_history  # pandas; imported after the startup report
+
+    db.create_all()  # creates sales_history on databases that predate it
+    location = args.location or app.config["SALES_HISTORY_LOCATION"]
+    for path in args.files:
+        df, dropped = sales_history.read_csv(path)
+        report = sales_history.ingest(df, location)
+        print(
+            f"{path}: {report.rows} rows, {report.inserted} added, "
+            f"{report.skipped} already stored, {dropped} invalid."
+        )
+    print(f"Latest sales row for '{location}': {sales_history.latest(location)}")
@@ -0,0 +1,9 @@
+from app import create_app
+from app.utils import performance
+
+app = create_app()
+
+with app.app_context():
+    print("Rebuilding performance summaries...")
+    count = performance.rebuild_all()
+    print(f"Rebuilt performance summaries for {count} employee(s).")
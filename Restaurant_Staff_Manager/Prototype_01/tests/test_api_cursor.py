@@ -0,0 +1,88 @@
+import datetime
+
+import pytest
+
+from app import db
+from app.api.routes import (
+    EMPLOYEES,
+    PERFORMANCE_LOGS,
+    SHIFTS,
+    ApiError,
+    _decode_cursor,
+    _encode_cursor,
+)
+from app.models import Employee, Shift
+
+
+@pytest.mark.parametrize(
+    "resource, values",
+    [
+        (EMPLOYEES, [42]),
+        (SHIFTS, [datetime.datetime(2030, 1, 1, 16, 30), 7]),
+        (PERFORMANCE_LOGS, [datetime.date(2030, 1, 31), 3]),
+    ],
+    ids=["employees", "shifts", "performance_logs"],
+)
+def test_cursor_round_trips_typed_sort_keys(resource, values):
+    cursor = _encode_cursor(values)
+    assert "=" not in cursor  # padding is stripped to keep URLs clean
+    assert _decode_cursor(cursor, resource) == values
+
+
+def test_missing_cursor_means_first_page():
+    assert _decode_cursor(None, SHIFTS) is None
+    assert _decode_cursor("", SHIFTS) is None
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        _encode_cursor([1]),  # wrong number of keys for SHIFTS
+        _encode_cursor(["yesterday", 1]),
+        "eyJhIjogMX0",  # {"a": 1}
+    ],
+)
+def test_invalid_cursors_are_rejected(cursor):
+    with pytest.raises(ApiError):
+        _decode_cursor(cursor, SHIFTS)
+
+
+def test_pages_follow_the_cursor_without_gaps_or_repeats(app):
+    employee = Employee(name="Ana", position="Server", email="ana@example.com")
+    db.session.add(employee)
+    start = datetime.datetime(2030, 1, 1, 10)
+    # Pairs of shifts share a start time, so the id breaks the tie.
+    db.session.add_all(
+        Shift(
+            employee=employee,
+            start_time=start + datetime.timedelta(hours=i // 2),
+            end_time=start + datetime.timedelta(hours=i // 2 + 8),
+            required_position="Server",
+        )
+        for i in range(7)
+    )
+    db.session.commit()
+
+    client = app.test_client()
+    seen, cursor, pages = [], None, 0
+    while True:
+        query = {"limit": 3, "fields": "id"}
+        if cursor:
+            query["cursor"] = cursor
+        body = client.get("/api/v1/shifts", query_string=query).get_json()
+        seen += [row["id"] for row in body["data"]]
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    expected = db.session.scalars(
+        db.select(Shift.id).order_by(Shift.start_time, Shift.id)
+    ).all()
+    assert seen == expected
+    assert pages == 3
+
+    bad = client.get("/api/v1/shifts", query_string={"cursor": "garbage"})
+    assert bad.status_code == 400
+    assert bad.get_json() == {"error": "Invalid cursor."}
@@ -0,0 +1,68 @@
+import datetime
+from types import SimpleNamespace
+
+from app.utils.scheduling import diff_schedules
+from app.utils.solvers import PlannedShift
+
+DAY = (datetime.datetime(2030, 1, 1, 10), datetime.datetime(2030, 1, 1, 18))
+EVE = (datetime.datetime(2030, 1, 1, 16), datetime.datetime(2030, 1, 2, 0))
+
+
+def existing(shift_id, employee_id, times=DAY, position="Server"):
+    return SimpleNamespace(
+        id=shift_id,
+        employee_id=employee_id,
+        start_time=times[0],
+        end_time=times[1],
+        required_position=position,
+    )
+
+
+def planned(employee_id, times=DAY, position="Server"):
+    return PlannedShift(employee_id, times[0], times[1], position)
+
+
+def test_identical_schedules_need_no_writes():
+    old = [existing(1, 10), existing(2, 11), existing(3, None, EVE)]
+    new = [planned(11), planned(10), planned(None, EVE)]
+
+    diff = diff_schedules(old, new)
+    assert (diff.inserts, diff.updates, diff.deletes) == ([], [], [])
+    assert diff.changed_employee_ids == set()
+
+
+def test_reassignment_updates_the_existing_shift():
+    old = [existing(1, 10), existing(2, 11)]
+    new = [planned(10), planned(12)]
+
+    diff = diff_schedules(old, new)
+    assert diff.inserts == [] and diff.deletes == []
+    assert [(shift.id, employee_id) for shift, employee_id in diff.updates] == [(2, 12)]
+    assert diff.changed_employee_ids == {11, 12}
+
+
+def test_surplus_shifts_are_inserted_or_deleted_per_slot():
+    old = [existing(1, 10), existing(2, 11), existing(3, 12, EVE)]
+    new = [planned(10), planned(13, EVE), planned(14, EVE)]
+
+    diff = diff_schedules(old, new)
+    assert [s.id for s in diff.deletes] == [2]
+    assert [(s.id, e) for s, e in diff.updates] == [(3, 13)]
+    assert diff.inserts == [planned(14, EVE)]
+    assert diff.changed_employee_ids == {11, 12, 13, 14}
+
+
+def test_slots_differ_by_position():
+    old = [existing(1, 10, position="Server")]
+    new = [planned(10, position="Bartender")]
+
+    diff = diff_schedules(old, new)
+    assert [s.id for s in diff.deletes] == [1]
+    assert diff.inserts == new
+    assert diff.changed_employee_ids == {10}
+
+
+def test_unassigned_shifts_are_not_reported_as_changed_employees():
+    diff = diff_schedules([existing(1, None)], [planned(None), planned(None)])
+    assert diff.inserts == [planned(None)]
+    assert diff.changed_employee_ids == set()
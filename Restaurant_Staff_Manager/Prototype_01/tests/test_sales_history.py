@@ -0,0 +1,79 @@
+import datetime
+
+import pandas as pd
+
+from app.models import SalesHistory
+from app.utils import sales_history
+
+
+def sales(start, days, y=100.0):
+    return pd.DataFrame(
+        {
+            "ds": pd.date_range(start, periods=days, freq="D"),
+            "y": [y + i for i in range(days)],
+        }
+    )
+
+
+def test_reingesting_overlapping_rows_inserts_nothing_new(app):
+    first = sales_history.ingest(sales("2025-01-01", 10))
+    assert (first.inserted, first.skipped) == (10, 0)
+
+    again = sales_history.ingest(sales("2025-01-01", 10))
+    assert (again.inserted, again.skipped) == (0, 10)
+
+    # Days 6-10 overlap; only 11-15 are new, and stored values are kept.
+    overlap = sales_history.ingest(sales("2025-01-06", 10, y=999.0))
+    assert (overlap.rows, overlap.inserted, overlap.skipped) == (10, 5, 5)
+
+    stored = sales_history.read_history()
+    assert len(stored) == 15
+    assert stored.loc[stored["ds"] == "2025-01-06", "y"].item() == 105.0
+    assert stored.loc[stored["ds"] == "2025-01-11", "y"].item() == 999.0 + 5
+
+
+def test_reingest_without_new_rows_keeps_the_version(app):
+    sales_history.ingest(sales("2025-01-01", 5))
+    assert sales_history.version().revision == 1
+
+    sales_history.ingest(sales("2025-01-01", 5))
+    assert sales_history.version().revision == 1
+
+    sales_history.ingest(sales("2025-01-05", 3))
+    version = sales_history.version()
+    assert version.revision == 2
+    assert version.newest_ds == datetime.datetime(2025, 1, 7)
+
+
+def test_load_window_returns_only_the_newest_days(app):
+    app.config["FORECAST_HISTORY_DAYS"] = 30
+    sales_history.ingest(sales("2025-01-01", 100))
+    sales_history.ingest(sales("2025-01-01", 5), location="other")
+
+    window = sales_history.load_window()
+    assert len(window) == 30
+    assert window["ds"].min() == pd.Timestamp("2025-03-12")
+    assert window["ds"].max() == pd.Timestamp("2025-04-10")
+    assert window["ds"].is_monotonic_increasing
+
+    assert len(sales_history.load_window(days=0)) == 100
+    assert len(sales_history.load_window(location="other")) == 5
+    assert sales_history.load_window(location="nowhere") is None
+
+
+def test_read_csv_drops_invalid_rows(tmp_path):
+    path = tmp_path / "sales.csv"
+    path.write_text("ds,y,extra\n2025-01-01,10,a\nnot-a-date,11,b\n2025-01-03,,c\n\n")
+
+    df, dropped = sales_history.read_csv(path)
+    assert list(df.columns) == ["ds", "y"]
+    assert len(df) == 1
+    assert dropped == 2
+    assert str(df["y"].dtype) == "float64"
+
+
+def test_ingest_drops_duplicate_days_within_a_file(app):
+    df = pd.concat([sales("2025-01-01", 3), sales("2025-01-02", 1, y=500.0)])
+    report = sales_history.ingest(df)
+    assert (report.rows, report.inserted, report.skipped) == (4, 3, 1)
+    assert SalesHistory.query.count() == 3
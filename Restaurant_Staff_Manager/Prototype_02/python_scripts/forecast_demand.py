@@ -1,71 +1,417 @@
 import pandas as pd
 from prophet import Prophet
 import sys
+import io
+import os
 import json
+import time
+import hashlib
 import argparse
 import logging
+import threading
 import warnings
+import socketserver
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import sales_store
 
-warnings.simplefilter("ignore") 
+warnings.simplefilter("ignore")
 logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
 logging.getLogger('prophet').setLevel(logging.WARNING)
-logging.basicConfig(level=logging.WARNING) 
+logging.basicConfig(level=logging.WARNING)
 
-def run_forecast(data_path, periods_to_predict):
+# Fitted models kept in memory by a server process (one per distinct data file content).
+MODEL_SLOTS = 4
+
+def load_history(data_path):
+    """
+    Reads and validates the historical sales CSV.
+    Returns (DataFrame with 'ds' and 'y', sha256 of the file) or raises ValueError.
+    """
+    try:
+        with open(data_path, 'rb') as f:
+            raw = f.read()
+    except FileNotFoundError:
+        raise ValueError(f"Data file not found at: {data_path}")
+    except Exception as e:
+        raise ValueError(f"Error reading CSV file: {e}")
+
+    try:
+        df = pd.read_csv(io.BytesIO(raw))
+    except Exception as e:
+        raise ValueError(f"Error reading CSV file: {e}")
+
+    if 'ds' not in df.columns or 'y' not in df.columns:
+        raise ValueError("CSV input must contain 'ds' and 'y' columns.")
+
+    try:
+        df['ds'] = pd.to_datetime(df['ds'])
+    except Exception as e:
+        raise ValueError(f"Error converting 'ds' column to datetime: {e}")
+
+    try:
+        df['y'] = pd.to_numeric(df['y'])
+    except Exception as e:
+         raise ValueError(f"Error converting 'y' column to numeric: {e}")
+
+    if len(df) < 2:
+        raise ValueError("Need at least 2 data points for forecasting.")
+
+    return df, hashlib.sha256(raw).hexdigest()
+
+def load_series(source):
+    """
+    Loads the training series described by `source`: {"data": csv path} or
+    {"store": sqlite path, "location": ..., "window_days": ...} for the sales history store.
+    Returns (DataFrame, key identifying its content) or raises ValueError.
+    """
+    store_path = source.get('store')
+    if not store_path:
+        if not source.get('data'):
+            raise ValueError("'data' (CSV path) or 'store' (sales history store) is required.")
+        return load_history(source['data'])
+
+    location = source.get('location') or sales_store.DEFAULT_LOCATION
+    window_days = source.get('window_days')
+    if window_days is not None and (not isinstance(window_days, int) or window_days < 0):
+        raise ValueError("'window_days' must be a non-negative integer.")
+    if not os.path.exists(store_path):
+        raise ValueError(f"Sales history store not found at: {store_path}")
+    df, fingerprint = sales_store.read_history(store_path, location, window_days)
+    if len(df) < 2:
+        raise ValueError(f"Need at least 2 data points for forecasting (location '{location}').")
+    key = hashlib.sha256(f"{os.path.abspath(store_path)}|{location}|{fingerprint}".encode('utf-8')).hexdigest()
+    return df, key
+
+def fit_model(df):
+    m = Prophet()
+    m.fit(df)
+    return m
+
+def predict(m, periods_to_predict):
+    """Forecasts `periods_to_predict` days past the history; returns the ds/yhat/yhat_lower/yhat_upper frame."""
+    future = m.make_future_dataframe(periods=periods_to_predict)
+    forecast = m.predict(future)
+
+    forecast_output = forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].copy()
+    forecast_output['ds'] = forecast_output['ds'].dt.strftime('%Y-%m-%d')
+    return forecast_output
+
+def check_periods(periods_to_predict):
+    if not isinstance(periods_to_predict, int) or isinstance(periods_to_predict, bool) or periods_to_predict <= 0:
+        raise ValueError("Periods to predict must be a positive integer.")
+
+def run_forecast(source, periods_to_predict):
     """
     Reads historical data, runs Prophet forecast, and prints results as JSON to stdout.
     Prints errors as JSON to stderr.
     """
     try:
-        if not isinstance(periods_to_predict, int) or periods_to_predict <= 0:
-            raise ValueError("Periods to predict must be a positive integer.")
+        check_periods(periods_to_predict)
+        df, _ = load_series(source)
+        m = fit_model(df)
+        forecast_output = predict(m, periods_to_predict)
 
-        try:
-            df = pd.read_csv(data_path)
-        except FileNotFoundError:
-            raise ValueError(f"Data file not found at: {data_path}")
-        except Exception as e:
-            raise ValueError(f"Error reading CSV file: {e}")
+        print(forecast_output.to_json(orient='records', date_format='iso'))
+        sys.stdout.flush()
+
+    except Exception as e:
+        error_output = json.dumps({"error": str(e)})
+        print(error_output, file=sys.stderr)
+        sys.stderr.flush()
+        sys.exit(1)
 
-        if 'ds' not in df.columns or 'y' not in df.columns:
-            raise ValueError("CSV input must contain 'ds' and 'y' columns.")
 
+class ForecastServer:
+    """
+    Answers newline-delimited JSON requests, one object per line:
+
+        {"id": 1, "op": "forecast", "data": "/app/data/historical_sales.csv", "days": 30}
+        {"id": 2, "op": "forecast", "store": "/app/data/sales_history.db", "location": "default", "days": 30}
+        {"id": 3, "op": "health"}
+        {"id": 4, "op": "shutdown"}
+
+    Each reply echoes the id: {"id": 1, "ok": true, "forecast": [...]} or
+    {"id": 1, "ok": false, "error": "..."}. Fitted models are kept by the
+    content of the series (the sha256 of a data file, or the store window's
+    fingerprint), so a forecast only refits when the history changed.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.models = OrderedDict()
+        # Prophet fits are CPU bound and not thread safe; one forecast at a time.
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.fits = 0
+        self.cache_hits = 0
+        self.last_fit_seconds = None
+        self.busy = False
+        self.stopping = False
+
+    def handle_line(self, line):
         try:
-            df['ds'] = pd.to_datetime(df['ds'])
-        except Exception as e:
-            raise ValueError(f"Error converting 'ds' column to datetime: {e}")
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object.")
+        except ValueError as e:
+            self.errors += 1
+            return {"id": None, "ok": False, "error": f"Invalid request: {e}"}
+        return self.handle(request)
 
+    def handle(self, request):
+        request_id = request.get('id')
+        op = request.get('op', 'forecast')
+        self.requests += 1
         try:
-            df['y'] = pd.to_numeric(df['y'])
+            if op == 'forecast':
+                records = self.forecast(request, request.get('days'))
+                return {"id": request_id, "ok": True, "forecast": records}
+            if op == 'health':
+                return dict(self.health(), id=request_id, ok=True)
+            if op == 'shutdown':
+                self.stopping = True
+                return {"id": request_id, "ok": True}
+            raise ValueError(f"Unknown op '{op}'.")
         except Exception as e:
-             raise ValueError(f"Error converting 'y' column to numeric: {e}")
+            self.errors += 1
+            return {"id": request_id, "ok": False, "error": str(e)}
 
-        if len(df) < 2:
-            raise ValueError("Need at least 2 data points for forecasting.")
+    def forecast(self, source, periods_to_predict):
+        check_periods(periods_to_predict)
+        with self.lock:
+            self.busy = True
+            try:
+                df, digest = load_series(source)
+                m = self.models.get(digest)
+                if m is None:
+                    started = time.time()
+                    m = fit_model(df)
+                    self.last_fit_seconds = round(time.time() - started, 3)
+                    self.fits += 1
+                    self.models[digest] = m
+                    while len(self.models) > MODEL_SLOTS:
+                        self.models.popitem(last=False)
+                else:
+                    self.cache_hits += 1
+                    self.models.move_to_end(digest)
+                forecast_output = predict(m, periods_to_predict)
+            finally:
+                self.busy = False
+        return json.loads(forecast_output.to_json(orient='records', date_format='iso'))
 
-        m = Prophet()
-        m.fit(df)
+    def health(self):
+        return {
+            "status": "stopping" if self.stopping else ("busy" if self.busy else "ok"),
+            "pid": os.getpid(),
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "errors": self.errors,
+            "fits": self.fits,
+            "cache_hits": self.cache_hits,
+            "models_cached": len(self.models),
+            "last_fit_seconds": self.last_fit_seconds,
+        }
 
-        future = m.make_future_dataframe(periods=periods_to_predict)
-        forecast = m.predict(future)
 
-        forecast_output = forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].copy()
-        forecast_output['ds'] = forecast_output['ds'].dt.strftime('%Y-%m-%d')
+def serve_stdio(server):
+    """Reads requests from stdin and writes replies to stdout until EOF or shutdown."""
+    out = sys.stdout
+    # Anything a library prints must not end up in the reply stream.
+    sys.stdout = sys.stderr
+    out.write(json.dumps({"event": "ready", "pid": os.getpid()}) + "\n")
+    out.flush()
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        out.write(json.dumps(server.handle_line(line)) + "\n")
+        out.flush()
+        if server.stopping:
+            break
 
-        print(forecast_output.to_json(orient='records', date_format='iso'))
-        sys.stdout.flush() 
+def serve_socket(server, socket_path):
+    """Serves the same protocol on a Unix socket; each connection may send many requests."""
+    sys.stdout = sys.stderr
 
-    except Exception as e:
-        error_output = json.dumps({"error": str(e)})
-        print(error_output, file=sys.stderr)
-        sys.stderr.flush() 
-        sys.exit(1) 
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                reply = server.handle_line(line.decode('utf-8'))
+                self.wfile.write((json.dumps(reply) + "\n").encode('utf-8'))
+                self.wfile.flush()
+                if server.stopping:
+                    threading.Thread(target=unix_server.shutdown, daemon=True).start()
+                    return
+
+    class ThreadingUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)  # left over from a previous run
+    unix_server = ThreadingUnixServer(socket_path, Handler)
+    print(json.dumps({"event": "ready", "pid": os.getpid(), "socket": socket_path}), file=sys.stderr)
+    try:
+        unix_server.serve_forever()
+    finally:
+        unix_server.server_close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+def read_manifest(manifest_path):
+    """
+    Reads a batch manifest: a JSON list, {"series": [...]}, or one JSON object per line
+    (NDJSON); '-' reads stdin. Each entry is {"id": ..., "data": "sales.csv", "days": 30} or
+    {"id": ..., "store": "sales_history.db", "location": ..., "window_days": ..., "days": 30}.
+    Relative paths are resolved against the manifest's directory.
+    """
+    if manifest_path == '-':
+        text, base_dir = sys.stdin.read(), os.getcwd()
+    else:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        base_dir = os.path.dirname(os.path.abspath(manifest_path))
+
+    stripped = text.strip()
+    try:
+        entries = json.loads(stripped)
+    except json.JSONDecodeError:
+        # Not a single JSON document: one entry per line.
+        entries = [json.loads(line) for line in stripped.splitlines() if line.strip()]
+    else:
+        if isinstance(entries, dict):
+            # {"series": [...]}, or NDJSON that happens to have a single line.
+            entries = entries['series'] if 'series' in entries else [entries]
+    if not isinstance(entries, list):
+        raise ValueError('Manifest must be a list of series, {"series": [...]} or NDJSON.')
+
+    series = []
+    for number, entry in enumerate(entries, start=1):
+        if not isinstance(entry, dict):
+            entry = {}
+        source = {k: entry[k] for k in ('data', 'store', 'location', 'window_days') if entry.get(k) is not None}
+        for k in ('data', 'store'):
+            if k in source and not os.path.isabs(source[k]):
+                source[k] = os.path.join(base_dir, source[k])
+        series.append({
+            "id": entry.get('id', number),
+            "source": source,
+            "days": entry.get('days'),
+        })
+    return series
+
+def forecast_file(source, horizons):
+    """
+    Process-pool task: fits one series once and predicts every requested horizon.
+    Returns (fit_seconds, {horizon: records}); errors are raised to the parent.
+    """
+    df, _ = load_series(source)
+    started = time.time()
+    m = fit_model(df)
+    fit_seconds = round(time.time() - started, 3)
+    # One prediction to the longest horizon; shorter ones are its prefix.
+    forecast_output = predict(m, max(horizons))
+    history_rows = len(df)
+    return fit_seconds, {
+        days: json.loads(forecast_output.iloc[:history_rows + days].to_json(orient='records', date_format='iso'))
+        for days in horizons
+    }
+
+def run_batch(manifest_path, workers=None):
+    """
+    Forecasts every series in a manifest across a process pool, printing one NDJSON line
+    per series as soon as its history is fitted: {"id", "ok", "source", "days", "fit_seconds",
+    "forecast"} or {"id", "ok": false, "error"}. Series that share the same history share
+    one fit. Returns the number of failed series.
+    """
+    started = time.time()
+    series = read_manifest(manifest_path)
+
+    def emit(line):
+        sys.stdout.write(json.dumps(line) + "\n")
+        sys.stdout.flush()
+
+    failed = 0
+    by_history = OrderedDict()
+    for entry in series:
+        try:
+            check_periods(entry['days'])
+            if not entry['source'].get('data') and not entry['source'].get('store'):
+                raise ValueError("'data' (CSV path) or 'store' (sales history store) is required.")
+        except ValueError as e:
+            emit({"id": entry['id'], "ok": False, "error": str(e)})
+            failed += 1
+            continue
+        by_history.setdefault(json.dumps(entry['source'], sort_keys=True), []).append(entry)
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=min(workers, max(len(by_history), 1))) as pool:
+        futures = {
+            pool.submit(forecast_file, entries[0]['source'], sorted({e['days'] for e in entries})): entries
+            for entries in by_history.values()
+        }
+        for future in as_completed(futures):
+            entries = futures[future]
+            try:
+                fit_seconds, forecasts = future.result()
+            except Exception as e:
+                for entry in entries:
+                    emit({"id": entry['id'], "ok": False, "source": entry['source'], "error": str(e)})
+                failed += len(entries)
+                continue
+            for entry in entries:
+                emit({
+                    "id": entry['id'],
+                    "ok": True,
+                    "source": entry['source'],
+                    "days": entry['days'],
+                    "fit_seconds": fit_seconds,
+                    "forecast": forecasts[entry['days']],
+                })
+
+    print(json.dumps({
+        "event": "batch_done",
+        "series": len(series),
+        "histories": len(by_history),
+        "failed": failed,
+        "workers": workers,
+        "seconds": round(time.time() - started, 3),
+    }), file=sys.stderr)
+    return failed
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Generate forecast using Prophet.')
-    parser.add_argument('--data', required=True, help='Path to the historical data CSV file.')
-    parser.add_argument('--days', required=True, type=int, help='Number of days to predict.')
+    parser.add_argument('--data', help='Path to the historical data CSV file.')
+    parser.add_argument('--days', type=int, help='Number of days to predict.')
+    parser.add_argument('--store', help='Read history from this sales history store (see sales_store.py) instead of --data.')
+    parser.add_argument('--location', default=sales_store.DEFAULT_LOCATION, help='With --store, the location to forecast.')
+    parser.add_argument('--window-days', type=int, help='With --store, train on only the most recent N days.')
+    parser.add_argument('--serve', action='store_true',
+                        help='Stay running and answer newline-delimited JSON requests (stdin/stdout by default).')
+    parser.add_argument('--socket', help='With --serve, listen on this Unix socket path instead of stdin/stdout.')
+    parser.add_argument('--batch', metavar='MANIFEST',
+                        help="Forecast every series in a JSON/NDJSON manifest ('-' for stdin) and stream NDJSON results.")
+    parser.add_argument('--workers', type=int, help='With --batch, number of worker processes (default: CPU count).')
 
     args = parser.parse_args()
 
-    run_forecast(args.data, args.days)
\ No newline at end of file
+    if args.batch:
+        try:
+            failed = run_batch(args.batch, args.workers)
+        except Exception as e:
+            print(json.dumps({"error": str(e)}), file=sys.stderr)
+            sys.exit(1)
+        sys.exit(1 if failed else 0)
+    elif args.serve:
+        server = ForecastServer()
+        if args.socket:
+            serve_socket(server, args.socket)
+        else:
+            serve_stdio(server)
+    else:
+        if (args.data is None and args.store is None) or args.days is None:
+            parser.error('--data (or --store) and --days are required unless --serve or --batch is given.')
+        run_forecast({"data": args.data, "store": args.store, "location": args.location,
+                      "window_days": args.window_days}, args.days)
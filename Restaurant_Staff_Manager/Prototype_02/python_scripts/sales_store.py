@@ -0,0 +1,134 @@
+import pandas as pd
+import numpy as np
+import sys
+import json
+import sqlite3
+import argparse
+import datetime
+
+# Append-only sales history: one row per location and day (or hour).
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sales_history (
+    location TEXT NOT NULL,
+    ds TEXT NOT NULL,            -- 'YYYY-MM-DD HH:MM:SS', so text order is time order
+    y REAL NOT NULL,
+    ingested_at TEXT NOT NULL,
+    PRIMARY KEY (location, ds)
+) WITHOUT ROWID;
+"""
+DS_FORMAT = '%Y-%m-%d %H:%M:%S'
+DEFAULT_LOCATION = 'default'
+
+def connect(store_path):
+    conn = sqlite3.connect(store_path, timeout=30)
+    # Readers (forecasts) keep working while an ingest is writing.
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.executescript(SCHEMA)
+    return conn
+
+def read_csv(csv_path):
+    """
+    Reads only the ds and y columns with fixed dtypes. Returns (DataFrame, rows dropped
+    because ds or y was missing or unparseable).
+    """
+    df = pd.read_csv(csv_path, usecols=['ds', 'y'], dtype={'ds': 'string', 'y': 'string'})
+    df['ds'] = pd.to_datetime(df['ds'], format='ISO8601', errors='coerce')
+    df['y'] = pd.to_numeric(df['y'], errors='coerce').astype('float64')
+    valid = df['ds'].notna() & df['y'].notna()
+    return df[valid], int((~valid).sum())
+
+def ingest(store_path, csv_path, location=DEFAULT_LOCATION):
+    """
+    Appends a CSV's rows for one location. Rows whose (location, ds) is already stored are
+    skipped, never overwritten. Returns {"rows", "inserted", "skipped", "invalid"}.
+    """
+    df, invalid = read_csv(csv_path)
+    now = datetime.datetime.utcnow().strftime(DS_FORMAT)
+    rows = [
+        (location, ds, float(y), now)
+        for ds, y in zip(df['ds'].dt.strftime(DS_FORMAT), df['y'])
+    ]
+    conn = connect(store_path)
+    try:
+        with conn:
+            before = conn.total_changes
+            conn.executemany(
+                'INSERT OR IGNORE INTO sales_history (location, ds, y, ingested_at) VALUES (?, ?, ?, ?)',
+                rows,
+            )
+            inserted = conn.total_changes - before
+    finally:
+        conn.close()
+    return {"rows": len(rows), "inserted": inserted, "skipped": len(rows) - inserted, "invalid": invalid}
+
+def window_start(conn, location, window_days):
+    """First ds of the last `window_days` days before the newest row, or None for all rows."""
+    if not window_days:
+        return None
+    newest = conn.execute(
+        'SELECT max(ds) FROM sales_history WHERE location = ?', (location,)
+    ).fetchone()[0]
+    if newest is None:
+        return None
+    start = datetime.datetime.strptime(newest, DS_FORMAT) - datetime.timedelta(days=window_days - 1)
+    return start.replace(hour=0, minute=0, second=0).strftime(DS_FORMAT)
+
+def read_history(store_path, location=DEFAULT_LOCATION, window_days=None):
+    """
+    Reads the ['ds', 'y'] series for one location, oldest first: only those two columns,
+    filtered to the window in SQL on the primary key. ds is datetime64, y float64.
+    Also returns a fingerprint (row count, first and last ds) of exactly the rows read,
+    which changes whenever the window's content does because the store is append-only.
+    """
+    conn = connect(store_path)
+    try:
+        start = window_start(conn, location, window_days)
+        sql = 'SELECT ds, y FROM sales_history WHERE location = ?'
+        params = [location]
+        if start is not None:
+            sql += ' AND ds >= ?'
+            params.append(start)
+        rows = conn.execute(sql + ' ORDER BY ds', params).fetchall()
+    finally:
+        conn.close()
+
+    df = pd.DataFrame({
+        'ds': pd.to_datetime([r[0] for r in rows], format=DS_FORMAT),
+        'y': np.fromiter((r[1] for r in rows), dtype='float64', count=len(rows)),
+    })
+    fingerprint = f"{len(rows)}:{rows[0][0] if rows else ''}:{rows[-1][0] if rows else ''}"
+    return df, fingerprint
+
+def stats(store_path):
+    conn = connect(store_path)
+    try:
+        return [
+            {"location": location, "rows": count, "first": first, "last": last}
+            for location, count, first, last in conn.execute(
+                'SELECT location, count(*), min(ds), max(ds) FROM sales_history GROUP BY location'
+            )
+        ]
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Append-only sales history store (SQLite).')
+    parser.add_argument('command', choices=['ingest', 'stats'])
+    parser.add_argument('files', nargs='*', help='With ingest: CSV files with ds and y columns.')
+    parser.add_argument('--store', required=True, help='Path to the SQLite store (created if missing).')
+    parser.add_argument('--location', default=DEFAULT_LOCATION, help='Location key for ingested rows.')
+
+    args = parser.parse_intermixed_args()
+
+    try:
+        if args.command == 'ingest':
+            if not args.files:
+                parser.error('ingest needs at least one CSV file.')
+            for csv_path in args.files:
+                print(json.dumps(dict(ingest(args.store, csv_path, args.location), file=csv_path, location=args.location)))
+        else:
+            for row in stats(args.store):
+                print(json.dumps(row))
+    except Exception as e:
+        print(json.dumps({"error": str(e)}), file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,55 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import forecast_demand  # noqa: E402
+
+ENTRIES = [
+    {"id": "downtown", "data": "downtown.csv", "days": 14},
+    {"id": "airport", "store": "sales.db", "location": "airport", "window_days": 90},
+]
+
+
+def write_manifest(tmp_path, text):
+    path = tmp_path / "manifest.json"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        json.dumps(ENTRIES),
+        json.dumps(ENTRIES, indent=2),
+        json.dumps({"series": ENTRIES}),
+        json.dumps({"series": ENTRIES}, indent=2),
+        "\n".join(json.dumps(entry) for entry in ENTRIES) + "\n",
+    ],
+    ids=["list", "pretty-list", "object", "pretty-object", "ndjson"],
+)
+def test_read_manifest_forms(tmp_path, text):
+    series = forecast_demand.read_manifest(write_manifest(tmp_path, text))
+
+    assert [s["id"] for s in series] == ["downtown", "airport"]
+    assert series[0]["source"] == {"data": str(tmp_path / "downtown.csv")}
+    assert series[0]["days"] == 14
+    assert series[1]["source"] == {
+        "store": str(tmp_path / "sales.db"),
+        "location": "airport",
+        "window_days": 90,
+    }
+    assert series[1]["days"] is None
+
+
+def test_read_manifest_single_ndjson_line(tmp_path):
+    series = forecast_demand.read_manifest(write_manifest(tmp_path, json.dumps(ENTRIES[0])))
+    assert [s["id"] for s in series] == ["downtown"]
+
+
+def test_read_manifest_rejects_other_json(tmp_path):
+    with pytest.raises(ValueError):
+        forecast_demand.read_manifest(write_manifest(tmp_path, '"not a manifest"'))
@@ -14,7 +14,14 @@ const config = {
   emailSecure: process.env.EMAIL_SECURE === 'true', 
   emailUser: process.env.EMAIL_USER || '',          
   emailPass: process.env.EMAIL_PASS || '',          
-  emailFrom: process.env.EMAIL_FROM || '"No Reply" <noreply@example.com>'
+  emailFrom: process.env.EMAIL_FROM || '"No Reply" <noreply@example.com>',
+  pythonExecutable: process.env.PYTHON_EXECUTABLE || 'python3',
+  forecastMode: process.env.FORECAST_MODE || 'worker',   // 'worker' (one long-lived Python process) or 'spawn' (a process per forecast)
+  forecastSocket: process.env.FORECAST_SOCKET || '',      // Unix socket of a running `forecast_demand.py --serve --socket`; empty = start our own worker
+  forecastTimeoutMs: parseInt(process.env.FORECAST_TIMEOUT_MS || '120000', 10),
+  salesStore: process.env.SALES_STORE || '',                  // SQLite sales history (python_scripts/sales_store.py); empty = data/historical_sales.csv
+  salesLocation: process.env.SALES_LOCATION || 'default',
+  forecastWindowDays: parseInt(process.env.FORECAST_WINDOW_DAYS || '730', 10)  // train on the newest N days of the store (0 = all)
 };
 
 if (!config.emailUser || !config.emailPass || !config.emailFrom.includes('@')) {
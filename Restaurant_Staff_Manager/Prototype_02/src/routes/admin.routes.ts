@@ -239,6 +239,17 @@ adminRouter.get('/test-forecast', async (req: Request, res: Response, next: Next
 });
 
 
+// --- Forecast Worker Health (GET /admin/forecast-health) --- //
+adminRouter.get('/forecast-health', async (req: Request, res: Response, next: NextFunction) => {
+  try {
+      res.json(await forecastingService.getForecastWorkerHealth());
+  } catch (error: any) {
+      console.error("[Route] Error in /admin/forecast-health:", error);
+      res.status(503).json({ status: 'unavailable', error: error.message || String(error) });
+  }
+});
+
+
 // --- Generate Schedule Route (POST /admin/generate-schedule) --- // 
 adminRouter.post('/generate-schedule', async (req: Request, res: Response, next: NextFunction) => {
 
@@ -1,5 +1,8 @@
-import { spawn } from 'child_process'; 
-import path from 'path';               
+import { spawn, ChildProcess } from 'child_process';
+import net from 'net';
+import path from 'path';
+import readline from 'readline';
+import config from '../config';
 
 
 interface ForecastResult {
@@ -9,25 +12,206 @@ interface ForecastResult {
     yhat_upper: number;
 }
 
+interface WorkerReply {
+    id: number | null;
+    ok: boolean;
+    error?: string;
+    forecast?: ForecastResult[];
+    [key: string]: any; // health fields
+}
+
+interface PendingRequest {
+    resolve: (reply: WorkerReply) => void;
+    reject: (error: Error) => void;
+    timer: NodeJS.Timeout;
+}
+
+const scriptPath = path.join('/app', 'python_scripts', 'forecast_demand.py');
+const dataPath = path.join('/app', 'data', 'historical_sales.csv');
+
+/** Where the worker reads history: the sales store when SALES_STORE is set, otherwise the CSV. */
+const historySource = (): object => config.salesStore
+    ? { store: config.salesStore, location: config.salesLocation, window_days: config.forecastWindowDays }
+    : { data: dataPath };
+
+const historyArgs = (): string[] => config.salesStore
+    ? [ '--store', config.salesStore, '--location', config.salesLocation, '--window-days', String(config.forecastWindowDays) ]
+    : [ '--data', dataPath ];
+
+/**
+ * A long-lived `forecast_demand.py --serve` process. Requests and replies are
+ * newline-delimited JSON matched by id, so the interpreter start, the pandas and
+ * Prophet imports and (while the data file is unchanged) the model fit are paid
+ * once instead of on every forecast. With FORECAST_SOCKET set, it connects to an
+ * already running worker instead of starting one.
+ */
+class ForecastWorker {
+    private child: ChildProcess | null = null;
+    private socket: net.Socket | null = null;
+    private input: NodeJS.WritableStream | null = null;
+    private pending = new Map<number, PendingRequest>();
+    private nextId = 1;
+    private starts = 0;
+
+    request(payload: object): Promise<WorkerReply> {
+        const input = this.connect();
+        const id = this.nextId++;
+        return new Promise((resolve, reject) => {
+            const timer = setTimeout(() => {
+                this.pending.delete(id);
+                reject(new Error(`Forecast worker did not answer within ${config.forecastTimeoutMs} ms.`));
+                // A stuck worker would hold up every later request; the next one starts a fresh worker.
+                this.stop('request timed out');
+            }, config.forecastTimeoutMs);
+            this.pending.set(id, { resolve, reject, timer });
+            input.write(JSON.stringify({ ...payload, id }) + '\n');
+        });
+    }
+
+    get startCount(): number {
+        return this.starts;
+    }
+
+    stop(reason: string): void {
+        const child = this.child;
+        const socket = this.socket;
+        this.reset(new Error(`Forecast worker stopped: ${reason}.`));
+        if (child) child.kill();
+        if (socket) socket.destroy();
+    }
+
+    private connect(): NodeJS.WritableStream {
+        if (this.input) return this.input;
+        this.starts++;
+        let output: NodeJS.ReadableStream;
+
+        if (config.forecastSocket) {
+            console.log(`[Forecasting Service] Connecting to forecast worker at ${config.forecastSocket}`);
+            const socket = net.createConnection(config.forecastSocket);
+            socket.on('error', (error) => {
+                if (this.socket === socket) this.reset(new Error(`Forecast worker socket error: ${error.message}`));
+            });
+            socket.on('close', () => {
+                if (this.socket === socket) this.reset(new Error('Forecast worker closed the connection.'));
+            });
+            this.socket = socket;
+            this.input = socket;
+            output = socket;
+        } else {
+            const args = [ scriptPath, '--serve' ];
+            console.log(`[Forecasting Service] Starting forecast worker: ${config.pythonExecutable} ${args.join(' ')}`);
+            const child = spawn(config.pythonExecutable, args, { stdio: ['pipe', 'pipe', 'pipe'] });
+            child.stderr!.on('data', (data) => {
+                console.error(`[Forecast Worker STDERR]: ${data.toString()}`);
+            });
+            child.stdin!.on('error', (error) => {
+                console.error('[Forecasting Service] Could not write to forecast worker:', error.message);
+            });
+            child.on('error', (error) => {
+                if (this.child === child) this.reset(new Error(`Failed to start forecast worker: ${error.message}`));
+            });
+            child.on('exit', (code, signal) => {
+                console.warn(`[Forecasting Service] Forecast worker ${child.pid} exited (code ${code}, signal ${signal}).`);
+                if (this.child === child) this.reset(new Error(`Forecast worker exited with code ${code}.`));
+            });
+            this.child = child;
+            this.input = child.stdin!;
+            output = child.stdout!;
+        }
+
+        const lines = readline.createInterface({ input: output });
+        lines.on('line', (line) => this.onLine(line));
+        return this.input;
+    }
+
+    private onLine(line: string): void {
+        let reply: WorkerReply;
+        try {
+            reply = JSON.parse(line);
+        } catch (parseError: any) {
+            console.error('[Forecasting Service] Unparseable line from forecast worker:', line);
+            return;
+        }
+        if (reply.event === 'ready') {
+            console.log(`[Forecasting Service] Forecast worker ${reply.pid} ready.`);
+            return;
+        }
+        const pending = reply.id !== null ? this.pending.get(reply.id) : undefined;
+        if (!pending) {
+            console.warn('[Forecasting Service] Reply for an unknown request:', line.slice(0, 200));
+            return;
+        }
+        clearTimeout(pending.timer);
+        this.pending.delete(reply.id as number);
+        pending.resolve(reply);
+    }
+
+    /** Forgets the current process/connection and fails everything still waiting on it. */
+    private reset(error: Error): void {
+        this.child = null;
+        this.socket = null;
+        this.input = null;
+        for (const pending of this.pending.values()) {
+            clearTimeout(pending.timer);
+            pending.reject(error);
+        }
+        this.pending.clear();
+    }
+}
+
+const forecastWorker = new ForecastWorker();
+process.once('exit', () => forecastWorker.stop('server exiting'));
+
 /**
- * Calls the Python Prophet script to generate a forecast.
+ * Generates a forecast through the persistent worker (FORECAST_MODE=worker, the default)
+ * or a one-off Python process (FORECAST_MODE=spawn).
  * @param daysToPredict Number of days into the future to forecast.
  * @returns A Promise that resolves with an array of ForecastResult objects or rejects with an error.
  */
-export const generateForecast = (daysToPredict: number): Promise<ForecastResult[]> => {
+export const generateForecast = async (daysToPredict: number): Promise<ForecastResult[]> => {
+    if (config.forecastMode === 'spawn') {
+        return generateForecastOneShot(daysToPredict);
+    }
+    console.log(`[Forecasting Service] Requesting forecast for ${daysToPredict} days from the forecast worker...`);
+    const reply = await forecastWorker.request({ op: 'forecast', ...historySource(), days: daysToPredict });
+    if (!reply.ok) {
+        throw new Error(`Forecast worker error: ${reply.error}`);
+    }
+    const forecastResults = reply.forecast || [];
+    console.log(`[Forecasting Service] Forecast received (${forecastResults.length} records).`);
+    return forecastResults;
+};
+
+/**
+ * Reports the forecast worker's health: its own counters (requests, fits, cached models,
+ * last fit time) plus how many times this server has had to start it.
+ */
+export const getForecastWorkerHealth = async (): Promise<object> => {
+    if (config.forecastMode === 'spawn') {
+        return { mode: 'spawn', status: 'ok' };
+    }
+    const reply = await forecastWorker.request({ op: 'health' });
+    const { id, ok, ...health } = reply;
+    return { mode: 'worker', socket: config.forecastSocket || null, starts: forecastWorker.startCount, ...health };
+};
+
+/**
+ * Calls the Python Prophet script once, in a new process, to generate a forecast.
+ * @param daysToPredict Number of days into the future to forecast.
+ * @returns A Promise that resolves with an array of ForecastResult objects or rejects with an error.
+ */
+const generateForecastOneShot = (daysToPredict: number): Promise<ForecastResult[]> => {
     console.log(`[Forecasting Service] Requesting forecast for ${daysToPredict} days...`);
 
-    const pythonExecutable = 'python3';
-    const scriptPath = path.join('/app', 'python_scripts', 'forecast_demand.py');
-    const dataPath = path.join('/app', 'data', 'historical_sales.csv');
-    
+    const pythonExecutable = config.pythonExecutable;
+
     return new Promise((resolve, reject) => {
-        const args = [ scriptPath, '--data', dataPath, '--days', String(daysToPredict) ];
+        const args = [ scriptPath, ...historyArgs(), '--days', String(daysToPredict) ];
         console.log(`[Forecasting Service] Spawning: ${pythonExecutable} ${args.join(' ')}`);
         const pythonProcess = spawn(pythonExecutable, args);
 
-        let stdoutData = ''; 
-        let stderrData = ''; 
+        let stdoutData = '';
+        let stderrData = '';
 
         pythonProcess.stdout.on('data', (data) => {
             stdoutData += data.toString();
@@ -41,18 +225,18 @@ export const generateForecast = (daysToPredict: number): Promise<ForecastResult[
 
         pythonProcess.on('close', (code) => {
             console.log(`[Forecasting Service] Python script exited with code ${code}`);
-            if (code === 0) { 
+            if (code === 0) {
                 try {
-                    console.log("[Forecasting Service] Raw stdout:", stdoutData); 
+                    console.log("[Forecasting Service] Raw stdout:", stdoutData);
                     const forecastResults: ForecastResult[] = JSON.parse(stdoutData);
                     console.log(`[Forecasting Service] Forecast parsed successfully (${forecastResults.length} records).`);
-                    resolve(forecastResults); 
+                    resolve(forecastResults);
                 } catch (parseError: any) {
                     console.error('[Forecasting Service] Error parsing Python script JSON output:', parseError);
-                    console.error('[Forecasting Service] Raw stdout received:', stdoutData); 
+                    console.error('[Forecasting Service] Raw stdout received:', stdoutData);
                     reject(new Error(`Failed to parse forecast JSON output: ${parseError.message}`));
                 }
-            } else { 
+            } else {
                 console.error(`[Forecasting Service] Python script failed (code ${code}). STDERR: ${stderrData}`);
                 let errorMessage = `Python script failed with code ${code}.`;
                 try {
@@ -65,7 +249,7 @@ export const generateForecast = (daysToPredict: number): Promise<ForecastResult[
                 } catch (e) {
                     errorMessage += ` stderr: ${stderrData || '(No stderr output - and stderr not JSON)'}`;
                 }
-                reject(new Error(errorMessage)); 
+                reject(new Error(errorMessage));
             }
         });
 
@@ -74,4 +258,4 @@ export const generateForecast = (daysToPredict: number): Promise<ForecastResult[
             reject(new Error(`Failed to start Python script: ${error.message}`));
         });
     });
-};
\ No newline at end of file
+};